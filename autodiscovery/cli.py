@@ -5,7 +5,19 @@ import click
 from autodiscovery import commands
 from autodiscovery import config
 from autodiscovery import reports
+from autodiscovery.common.autoload_scheduler import AutoloadScheduler
+from autodiscovery.common.cs_attributes_batcher import CloudShellAttributesBatcher
+from autodiscovery.common.cli_connection_limiter import CLIConnectionLimiter
+from autodiscovery.common.consts import ExistingResourceActions
+from autodiscovery.common.cs_api_throttler import CloudShellAPIThrottler
+from autodiscovery.common.discovery_cache import DiscoveryCache
+from autodiscovery.common.discovery_journal import DiscoveryJournal
+from autodiscovery.common.prescan import PreScanner
+from autodiscovery.common.snmp_community_cache import SNMPCommunityCache
+from autodiscovery.common.snmp_prober import AsyncSNMPProber
 from autodiscovery.common.cs_session_manager import CloudShellSessionManager
+from autodiscovery.common.utils import ensure_dir_exists
+from autodiscovery.common.utils import get_cache_path
 from autodiscovery.common.utils import get_logger
 from autodiscovery.data_processors import JsonDataProcessor
 from autodiscovery.output import ConsoleOutput
@@ -13,6 +25,133 @@ from autodiscovery.parsers.config_data_parsers import get_config_data_parser
 from autodiscovery.parsers.input_data_parsers import get_input_data_parser
 
 
+def background_autoload_options(func):
+    """Add options for the background Autoload to the command"""
+    options = (click.option("--background-autoload", is_flag=True,
+                            help="Autoload created resources in the background instead of waiting for each "
+                                 "Autoload before the next upload"),
+               click.option("--autoload-workers", type=click.IntRange(min=1), default=config.AUTOLOAD_WORKERS,
+                            help="Max number of resources that will be autoloaded concurrently in the background"),
+               click.option("--autoload-timeout", type=click.IntRange(min=1), default=config.AUTOLOAD_TIMEOUT,
+                            help="Time in seconds to wait for the Autoload of each resource in the background"))
+
+    for option in reversed(options):
+        func = option(func)
+
+    return func
+
+
+def attributes_batch_options(func):
+    """Add options for setting resources attributes in batches to the command"""
+    options = (click.option("--attributes-batch-size", type=click.IntRange(min=1),
+                            default=config.CS_ATTRIBUTES_BATCH_SIZE,
+                            help="Max number of resources which attributes are set with one CloudShell API call. "
+                                 "By default attributes of each resource are set separately. Attributes are set "
+                                 "in batches only without Autoload or with background Autoload, e.g. 50"),
+               click.option("--attributes-batch-interval", type=float, default=config.CS_ATTRIBUTES_BATCH_INTERVAL,
+                            help="Max time in seconds the attributes of the resource wait for the full batch"))
+
+    for option in reversed(options):
+        func = option(func)
+
+    return func
+
+
+def existing_resources_option(func):
+    """Add option for the devices that already have resources on the CloudShell to the command"""
+    return click.option("--existing-resources", type=click.Choice(ExistingResourceActions.ALL),
+                        default=ExistingResourceActions.CREATE,
+                        help="What to do with the device if the resource with its address already exists on the "
+                             "CloudShell: create one more resource with a unique name, skip the device or update "
+                             "attributes and driver of the existing resource")(func)
+
+
+def validate_cs_api_rate(ctx, param, value):
+    """Check that CloudShell API calls rate isn't lower than the min rate"""
+    if value < config.CS_API_MIN_RATE:
+        raise click.BadParameter("should be greater than or equal to {}".format(config.CS_API_MIN_RATE))
+
+    return value
+
+
+def cs_api_options(func):
+    """Add options for the CloudShell API calls rate limit and retries to the command"""
+    options = (click.option("--cs-api-rate", type=float, default=config.CS_API_MAX_RATE,
+                            callback=validate_cs_api_rate,
+                            help="Max number of CloudShell API calls per second. The rate is lowered automatically "
+                                 "while the CloudShell server returns transient errors"),
+               click.option("--cs-api-retries", type=click.IntRange(min=0), default=config.CS_API_RETRIES,
+                            help="Number of retries for the CloudShell API call that failed with a transient error"),
+               click.option("--cs-api-retry-code", type=str, multiple=True, default=config.CS_API_RETRYABLE_ERROR_CODES,
+                            help="CloudShell API error code that will be retried with a backoff. "
+                                 "Can be used several times. Read-only API calls that failed with the timeout "
+                                 "or server busy error are always retried"))
+
+    for option in reversed(options):
+        func = option(func)
+
+    return func
+
+
+def get_cs_session_manager(input_data_model, cs_api_rate, cs_api_retries, cs_api_retry_codes, logger):
+    """Get CloudShell sessions manager which API calls are rate limited and retried
+
+    :param autodiscovery.models.InputDataModel input_data_model:
+    :param float cs_api_rate:
+    :param int cs_api_retries:
+    :param cs_api_retry_codes: CloudShell API error codes that will be retried
+    :param logging.Logger logger:
+    :rtype: CloudShellSessionManager
+    """
+    api_throttler = CloudShellAPIThrottler(max_rate=cs_api_rate,
+                                           min_rate=config.CS_API_MIN_RATE,
+                                           retries=cs_api_retries,
+                                           backoff=config.CS_API_BACKOFF,
+                                           max_backoff=config.CS_API_MAX_BACKOFF,
+                                           retryable_error_codes=cs_api_retry_codes,
+                                           retryable_error_messages=config.CS_API_RETRYABLE_ERROR_MESSAGES,
+                                           logger=logger)
+
+    return CloudShellSessionManager(cs_ip=input_data_model.cs_ip,
+                                    cs_user=input_data_model.cs_user,
+                                    cs_password=input_data_model.cs_password,
+                                    logger=logger,
+                                    api_throttler=api_throttler)
+
+
+def get_autoload_scheduler(background_autoload, cs_session_manager, workers, timeout, logger):
+    """Get scheduler for the background Autoload if it was requested
+
+    :param bool background_autoload:
+    :param CloudShellSessionManager cs_session_manager:
+    :param int workers:
+    :param int timeout:
+    :param logging.Logger logger:
+    :rtype: AutoloadScheduler
+    """
+    if background_autoload:
+        return AutoloadScheduler(cs_session_manager=cs_session_manager,
+                                 workers=workers,
+                                 timeout=timeout,
+                                 logger=logger)
+
+
+def get_attributes_batcher(batch_size, flush_interval, cs_session_manager, logger):
+    """Get batcher for the resources attributes if more than one resource can be in the batch
+
+    :param int batch_size:
+    :param float flush_interval:
+    :param CloudShellSessionManager cs_session_manager:
+    :param logging.Logger logger:
+    :rtype: CloudShellAttributesBatcher
+    """
+    if batch_size > 1:
+        return CloudShellAttributesBatcher(cs_session_manager=cs_session_manager,
+                                           batch_size=batch_size,
+                                           flush_interval=flush_interval,
+                                           logger=logger)
+
+
 @click.group()
 def cli():
     pass
@@ -83,11 +222,55 @@ def echo_excel_connections_template(save_to_file):
 @click.option("--report-file", help="File name for generated report")
 @click.option("--report-type", type=click.Choice(reports.discovery.REPORT_TYPES),
               default=reports.discovery.DEFAULT_REPORT_TYPE,
-              help="Type for generated report")
+              help="Type for generated report. 'csv', 'jsonl' and 'excel-stream' reports write each finished "
+                   "device right away, so the memory usage doesn't grow with the number of devices")
 @click.option("--offline", is_flag=True, help="Generate report without creation of any Resource on the CloudShell")
 @click.option('--autoload/--no-autoload', help="Whether autoload discovered resource on the CloudShell or not",
               default=True)
-def run(input_file, config_file, log_file, report_file, report_type, offline, autoload):
+@click.option("--workers", type=click.IntRange(min=1), default=1,
+              help="Number of devices that will be discovered concurrently")
+@click.option("--upload-workers", type=click.IntRange(min=1), default=1,
+              help="Number of discovered devices that will be uploaded on the CloudShell concurrently")
+@click.option("--prescan", is_flag=True, help="Skip devices that don't answer on any of the TCP ports {} before "
+                                              "the SNMP discovery".format(config.PRESCAN_PORTS))
+@click.option("--prescan-timeout", type=float, default=config.PRESCAN_TIMEOUT,
+              help="Time in seconds to wait for the device answer during the pre-scan")
+@click.option("--async-snmp", is_flag=True, help="Get SNMP data from all devices at once before the discovery "
+                                                 "with a single SNMP GET request per device")
+@click.option("--concurrent-snmp-communities", is_flag=True,
+              help="Try all SNMP community strings of the device concurrently instead of one by one. The first "
+                   "community string that responds is used instead of the first valid one in the input order")
+@click.option("--community-prefix-length", type=click.IntRange(min=0, max=32),
+              default=config.SNMP_COMMUNITY_PREFIX_LENGTH,
+              help="Subnet prefix length for which valid SNMP community string will be tried first")
+@click.option("--discovery-cache", is_flag=True, help="Reuse devices discovered on previous runs if their "
+                                                      "SNMP sysObjectID wasn't changed")
+@click.option("--cache-ttl", type=click.IntRange(min=0), default=config.DISCOVERY_CACHE_TTL,
+              help="Time in hours after which cached device will be discovered again")
+@click.option("--invalidate-cache", is_flag=True, help="Remove all devices from the discovery cache before the run. "
+                                                       "Works without --discovery-cache too")
+@click.option("--invalidate-cache-ip", multiple=True, help="Remove device with the given IP from the discovery cache "
+                                                           "before the run. Can be used several times")
+@click.option("--cli-connections", type=click.IntRange(min=1), default=config.CLI_MAX_CONNECTIONS,
+              help="Max number of CLI connections opened at the same time to all devices")
+@click.option("--cli-connections-per-device", type=click.IntRange(min=1), default=config.CLI_MAX_DEVICE_CONNECTIONS,
+              help="Max number of CLI connections opened at the same time to one device")
+@background_autoload_options
+@existing_resources_option
+@attributes_batch_options
+@cs_api_options
+@click.option("--cli-port-probe", is_flag=True, help="Probe CLI ports {} on all devices before the discovery and try "
+                                                     "only CLI sessions for the open ports. Uses --prescan-timeout"
+              .format([config.CLI_SSH_PORT, config.CLI_TELNET_PORT]))
+@click.option("--resume", is_flag=True, help="Resume the interrupted run with the same report file. Devices finished "
+                                             "by the interrupted run are taken from the journal file '<report file>{}' "
+                                             "and are not discovered again"
+              .format(config.DISCOVERY_JOURNAL_FILE_EXTENSION))
+def run(input_file, config_file, log_file, report_file, report_type, offline, autoload, workers, upload_workers,
+        prescan, prescan_timeout, async_snmp, concurrent_snmp_communities, community_prefix_length, discovery_cache,
+        cache_ttl, invalidate_cache, invalidate_cache_ip, cli_connections, cli_connections_per_device,
+        background_autoload, autoload_workers, autoload_timeout, existing_resources, attributes_batch_size,
+        attributes_batch_interval, cs_api_rate, cs_api_retries, cs_api_retry_code, cli_port_probe, resume):
     """Run Auto discovery command with given arguments from the input file"""
     input_data_parser = get_input_data_parser(input_file)
     input_data_model = input_data_parser.parse(input_file)
@@ -100,11 +283,54 @@ def run(input_file, config_file, log_file, report_file, report_type, offline, au
         additional_vendors_data = config_data_parser.parse(config_file)
 
     report = reports.discovery.get_report(report_file=report_file, report_type=report_type)
+    discovery_journal = DiscoveryJournal(file_path=report.file_name + config.DISCOVERY_JOURNAL_FILE_EXTENSION,
+                                         logger=logger)
+
+    if prescan:
+        prescanner = PreScanner(ports=config.PRESCAN_PORTS,
+                                timeout=prescan_timeout,
+                                workers=config.PRESCAN_WORKERS,
+                                logger=logger)
+    else:
+        prescanner = None
+
+    if cli_port_probe:
+        cli_ports_prescanner = PreScanner(ports=[config.CLI_SSH_PORT, config.CLI_TELNET_PORT],
+                                          timeout=prescan_timeout,
+                                          workers=config.PRESCAN_WORKERS,
+                                          logger=logger)
+    else:
+        cli_ports_prescanner = None
 
-    cs_session_manager = CloudShellSessionManager(cs_ip=input_data_model.cs_ip,
-                                                  cs_user=input_data_model.cs_user,
-                                                  cs_password=input_data_model.cs_password,
-                                                  logger=logger)
+    if async_snmp:
+        snmp_prober = AsyncSNMPProber(timeout=config.SNMP_TIMEOUT,
+                                      retries=config.SNMP_RETRIES,
+                                      max_requests=config.SNMP_MAX_REQUESTS,
+                                      logger=logger)
+    else:
+        snmp_prober = None
+
+    if discovery_cache or invalidate_cache or invalidate_cache_ip:
+        discovery_cache_path = get_cache_path(config.DISCOVERY_CACHE_FILE)
+        ensure_dir_exists(discovery_cache_path)
+        cache = DiscoveryCache(file_path=discovery_cache_path,
+                               ttl=cache_ttl * 60 * 60,
+                               logger=logger)
+        # cache is invalidated even if it isn't used by this run
+        if invalidate_cache:
+            cache.invalidate()
+        elif invalidate_cache_ip:
+            cache.invalidate(ips=invalidate_cache_ip)
+
+        discovery_cache = cache if discovery_cache else None
+    else:
+        discovery_cache = None
+
+    cs_session_manager = get_cs_session_manager(input_data_model=input_data_model,
+                                                cs_api_rate=cs_api_rate,
+                                                cs_api_retries=cs_api_retries,
+                                                cs_api_retry_codes=cs_api_retry_code,
+                                                logger=logger)
 
     auto_discover_command = commands.RunCommand(data_processor=JsonDataProcessor(logger=logger),
                                                 report=report,
@@ -112,12 +338,39 @@ def run(input_file, config_file, log_file, report_file, report_type, offline, au
                                                 cs_session_manager=cs_session_manager,
                                                 output=ConsoleOutput(),
                                                 offline=offline,
-                                                autoload=autoload)
+                                                autoload=autoload,
+                                                workers=workers,
+                                                upload_workers=upload_workers,
+                                                prescanner=prescanner,
+                                                snmp_prober=snmp_prober,
+                                                snmp_community_cache=SNMPCommunityCache(
+                                                    prefix_length=community_prefix_length),
+                                                discovery_cache=discovery_cache,
+                                                cli_connection_limiter=CLIConnectionLimiter(
+                                                    max_connections=cli_connections,
+                                                    max_device_connections=cli_connections_per_device),
+                                                cli_ports_prescanner=cli_ports_prescanner,
+                                                autoload_scheduler=get_autoload_scheduler(
+                                                    background_autoload=background_autoload,
+                                                    cs_session_manager=cs_session_manager,
+                                                    workers=autoload_workers,
+                                                    timeout=autoload_timeout,
+                                                    logger=logger),
+                                                existing_resource_action=existing_resources,
+                                                attributes_batcher=get_attributes_batcher(
+                                                    batch_size=attributes_batch_size,
+                                                    flush_interval=attributes_batch_interval,
+                                                    cs_session_manager=cs_session_manager,
+                                                    logger=logger),
+                                                discovery_journal=discovery_journal,
+                                                resume=resume,
+                                                concurrent_snmp_communities=concurrent_snmp_communities)
 
     auto_discover_command.execute(devices_ips=input_data_model.devices_ips,
                                   snmp_comunity_strings=input_data_model.snmp_community_strings,
                                   vendor_settings=input_data_model.vendor_settings,
                                   additional_vendors_data=additional_vendors_data)
+    cs_session_manager.log_api_stats()
 
 
 @cli.command(name="run-from-report")
@@ -129,7 +382,13 @@ def run(input_file, config_file, log_file, report_file, report_type, offline, au
 @click.option("--report-file", required=True, help="File name of the report to run from")
 @click.option('--autoload/--no-autoload', help="Whether autoload discovered resource on the CloudShell or not",
               default=True)
-def run_from_report(input_file, config_file, log_file, report_file, autoload):
+@background_autoload_options
+@existing_resources_option
+@attributes_batch_options
+@cs_api_options
+def run_from_report(input_file, config_file, log_file, report_file, autoload, background_autoload, autoload_workers,
+                    autoload_timeout, existing_resources, attributes_batch_size, attributes_batch_interval,
+                    cs_api_rate, cs_api_retries, cs_api_retry_code):
     """Create and autoload CloudShell resources from the generated report"""
     input_data_parser = get_input_data_parser(input_file)
     input_data_model = input_data_parser.parse(input_file)
@@ -141,25 +400,40 @@ def run_from_report(input_file, config_file, log_file, report_file, autoload):
         config_data_parser = get_config_data_parser(config_file)
         additional_vendors_data = config_data_parser.parse(config_file)
 
-    report = reports.discovery.get_report(report_file=report_file)
+    report_type = reports.discovery.get_report_type(report_file)
+    report = reports.discovery.get_report(report_file=report_file, report_type=report_type)
     parsed_entries = report.parse_entries_from_file(report_file)
 
-    cs_session_manager = CloudShellSessionManager(cs_ip=input_data_model.cs_ip,
-                                                  cs_user=input_data_model.cs_user,
-                                                  cs_password=input_data_model.cs_password,
-                                                  logger=logger)
+    cs_session_manager = get_cs_session_manager(input_data_model=input_data_model,
+                                                cs_api_rate=cs_api_rate,
+                                                cs_api_retries=cs_api_retries,
+                                                cs_api_retry_codes=cs_api_retry_code,
+                                                logger=logger)
 
     command = commands.RunFromReportCommand(data_processor=JsonDataProcessor(logger=logger),
                                             report=reports.discovery.get_report(
                                                 report_file=report_file,
-                                                report_type=reports.discovery.DEFAULT_REPORT_TYPE),
+                                                report_type=report_type),
                                             logger=logger,
                                             cs_session_manager=cs_session_manager,
                                             output=ConsoleOutput(),
-                                            autoload=autoload)
+                                            autoload=autoload,
+                                            autoload_scheduler=get_autoload_scheduler(
+                                                background_autoload=background_autoload,
+                                                cs_session_manager=cs_session_manager,
+                                                workers=autoload_workers,
+                                                timeout=autoload_timeout,
+                                                logger=logger),
+                                            existing_resource_action=existing_resources,
+                                            attributes_batcher=get_attributes_batcher(
+                                                batch_size=attributes_batch_size,
+                                                flush_interval=attributes_batch_interval,
+                                                cs_session_manager=cs_session_manager,
+                                                logger=logger))
 
     command.execute(parsed_entries=parsed_entries,
                     additional_vendors_data=additional_vendors_data)
+    cs_session_manager.log_api_stats()
 
 
 @cli.command(name="connect-ports")
@@ -175,27 +449,34 @@ def run_from_report(input_file, config_file, log_file, report_file, autoload):
               default=reports.connections.DEFAULT_REPORT_TYPE,
               help="Type for generated report")
 @click.option("--log-file", help="File name for logs")
+@click.option("--workers", type=click.IntRange(min=1), default=1,
+              help="Number of resources and ports that will be processed concurrently. "
+                   "Report order doesn't depend on the number of workers")
+@cs_api_options
 def connect_ports(input_file, resources_names, domain, offline, connections_report_file,
-                  connections_report_type, log_file):
+                  connections_report_type, log_file, workers, cs_api_rate, cs_api_retries, cs_api_retry_code):
     """Create connections between CloudShell Port resources based on the "Adjacent" attributes"""
     input_data_parser = get_input_data_parser(input_file)
     input_data_model = input_data_parser.parse(input_file)
     logger = get_logger(log_file)
 
-    cs_session_manager = CloudShellSessionManager(cs_ip=input_data_model.cs_ip,
-                                                  cs_user=input_data_model.cs_user,
-                                                  cs_password=input_data_model.cs_password,
-                                                  logger=logger)
+    cs_session_manager = get_cs_session_manager(input_data_model=input_data_model,
+                                                cs_api_rate=cs_api_rate,
+                                                cs_api_retries=cs_api_retries,
+                                                cs_api_retry_codes=cs_api_retry_code,
+                                                logger=logger)
 
     command = commands.ConnectPortsCommand(cs_session_manager=cs_session_manager,
                                            report=reports.connections.get_report(report_file=connections_report_file,
                                                                                  report_type=connections_report_type),
                                            offline=offline,
                                            logger=logger,
-                                           output=ConsoleOutput())
+                                           output=ConsoleOutput(),
+                                           workers=workers)
 
     resources_names = [name.strip() for name in resources_names.split(",")]
     command.execute(resources_names=resources_names, domain=domain)
+    cs_session_manager.log_api_stats()
 
 
 @cli.command(name="connect-ports-from-report")
@@ -204,24 +485,36 @@ def connect_ports(input_file, resources_names, domain, offline, connections_repo
 @click.option("--connections-report-file", required=True, help="File with port connections data. Can be generated with "
                                                                "'echo-excel-connections-report-template' command")
 @click.option("--log-file", help="File name for logs")
-def connect_ports_from_report(input_file, connections_report_file, log_file):
+@click.option("--workers", type=click.IntRange(min=1), default=1,
+              help="Number of connections in the same domain that will be processed concurrently")
+@click.option("--dry-run", is_flag=True, help="Only check that all ports from the connections file exist on the "
+                                              "CloudShell without creation of any connections")
+@cs_api_options
+def connect_ports_from_report(input_file, connections_report_file, log_file, workers, dry_run, cs_api_rate,
+                              cs_api_retries, cs_api_retry_code):
     """Create connections between CloudShell Port resources specified in the connection file"""
     input_data_parser = get_input_data_parser(input_file)
     input_data_model = input_data_parser.parse(input_file)
     logger = get_logger(log_file)
 
-    report = reports.connections.get_report(report_file=connections_report_file)
+    report_type = reports.connections.get_report_type(connections_report_file)
+    report = reports.connections.get_report(report_file=connections_report_file, report_type=report_type)
     parsed_entries = report.parse_entries_from_file(connections_report_file)
 
-    cs_session_manager = CloudShellSessionManager(cs_ip=input_data_model.cs_ip,
-                                                  cs_user=input_data_model.cs_user,
-                                                  cs_password=input_data_model.cs_password,
-                                                  logger=logger)
+    cs_session_manager = get_cs_session_manager(input_data_model=input_data_model,
+                                                cs_api_rate=cs_api_rate,
+                                                cs_api_retries=cs_api_retries,
+                                                cs_api_retry_codes=cs_api_retry_code,
+                                                logger=logger)
 
     command = commands.ConnectPortsFromReportCommand(cs_session_manager=cs_session_manager,
                                                      report=reports.connections.get_report(
-                                                         report_file=connections_report_file),
+                                                         report_file=connections_report_file,
+                                                         report_type=report_type),
                                                      logger=logger,
-                                                     output=ConsoleOutput())
+                                                     output=ConsoleOutput(),
+                                                     workers=workers,
+                                                     dry_run=dry_run)
 
     command.execute(parsed_entries=parsed_entries)
+    cs_session_manager.log_api_stats()
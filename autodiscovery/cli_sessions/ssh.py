@@ -1,3 +1,5 @@
+import socket
+
 import paramiko
 
 from cloudshell.cli.session.ssh_session import SSHSession
@@ -7,11 +9,51 @@ from autodiscovery.exceptions import AutoDiscoveryException
 
 
 class SSHDiscoverySession(SSHSession, AbstractDiscoverySession):
+    BANNER_TIMEOUT = 30
+
     def __init__(self, host, port=None):
         super(SSHDiscoverySession, self).__init__(host=host, port=port, username=None, password=None)
-        self._handler = paramiko.SSHClient()
-        self._handler.load_system_host_keys()
-        self._handler.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+
+    def _connect(self):
+        """Open SSH transport to the device without authentication
+
+        :rtype: paramiko.Transport
+        """
+        sock = socket.create_connection((self.host, self.port), timeout=self._timeout)
+        transport = paramiko.Transport(sock)
+        transport.banner_timeout = self.BANNER_TIMEOUT
+
+        try:
+            transport.start_client(timeout=self._timeout)
+        except Exception:
+            transport.close()
+            raise
+
+        return transport
+
+    def _authenticate(self, credentials, logger):
+        """Authenticate on the device reusing opened SSH transport for all credentials
+
+        Transport is reopened only if the device has closed it (after too many failed attempts, etc.)
+
+        :param autodiscovery.models.CLICredentials credentials:
+        :param logging.Logger logger:
+        """
+        if self._handler is None:
+            self._handler = self._connect()
+
+        try:
+            self._handler.auth_password(credentials.user, credentials.password)
+        except paramiko.AuthenticationException:
+            raise
+        except paramiko.SSHException:
+            if self._handler.is_active():
+                raise
+
+            logger.info("SSH connection to the device {} was closed, reconnecting".format(self.host))
+            self._handler.close()
+            self._handler = self._connect()
+            self._handler.auth_password(credentials.user, credentials.password)
 
     def check_credentials(self, cli_credentials, default_prompt, enable_prompt, logger):
         """Connect to device through SSH
@@ -22,16 +64,18 @@ class SSHDiscoverySession(SSHSession, AbstractDiscoverySession):
         :param logging.Logger logger:
         :rtype: autodiscovery.models.CLICredentials
         """
-        for credentials in cli_credentials.cli_credentials:
-            try:
-                self._handler.connect(self.host,
-                                      self.port,
-                                      credentials.user,
-                                      credentials.password,
-                                      timeout=self._timeout,
-                                      banner_timeout=30, allow_agent=False, look_for_keys=False)
-
-                self._current_channel = self._handler.invoke_shell()
+        try:
+            for credentials in cli_credentials.cli_credentials:
+                try:
+                    self._authenticate(credentials=credentials, logger=logger)
+                except paramiko.AuthenticationException:
+                    logger.warning("Credentials {}/{} aren't valid for the device {} for SSH connection"
+                                   .format(credentials.user, credentials.password, self.host))
+                    continue
+
+                self._current_channel = self._handler.open_session()
+                self._current_channel.get_pty()
+                self._current_channel.invoke_shell()
                 self._current_channel.settimeout(self._timeout)
 
                 re_prompts = "|".join([prompt for prompt in (default_prompt, enable_prompt) if prompt])
@@ -46,12 +90,8 @@ class SSHDiscoverySession(SSHSession, AbstractDiscoverySession):
                                                           output_str=output_str,
                                                           logger=logger)
                 return valid_creds
-
-            except paramiko.AuthenticationException:
-                logger.warning("Credentials {}/{} aren't valid for the device {} for SSH connection"
-                               .format(credentials.user, credentials.password, self.host))
-            finally:
-                self._handler.close()
+        finally:
+            self.disconnect()
 
         raise AutoDiscoveryException("All given credentials aren't valid for the device {} for SSH connection"
                                      .format(self.host))
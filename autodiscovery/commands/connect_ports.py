@@ -1,16 +1,21 @@
-from cloudshell.api.cloudshell_api import AttributeNameValue
+import threading
 
+from autodiscovery.common.consts import ResourceModelsAttributes
+from autodiscovery.common.cs_resources_details_cache import CloudShellResourcesDetailsCache
+from autodiscovery.common.cs_system_names_index import CloudShellSystemNamesIndex
+from autodiscovery.common.utils import parallel_imap
 from autodiscovery.exceptions import ReportableException
 from autodiscovery.output import EmptyOutput
 
 
 ADJACENT_PORT_ATTRIBUTE = "Adjacent"
-SYSTEM_NAME_PORT_ATTRIBUTE = "System Name"
+SYSTEM_NAME_PORT_ATTRIBUTE = ResourceModelsAttributes.SYSTEM_NAME
 PORT_FAMILY = "CS_Port"
 
 
 class ConnectPortsCommand(object):
-    def __init__(self, cs_session_manager, report, offline, logger, output=None):
+    def __init__(self, cs_session_manager, report, offline, logger, output=None, cs_system_names_index=None,
+                 cs_resources_details_cache=None, workers=1):
         """
 
         :param cs_session_manager:
@@ -18,15 +23,31 @@ class ConnectPortsCommand(object):
         :param offline:
         :param logger:
         :param output:
+        :param CloudShellSystemNamesIndex cs_system_names_index: resources found by the "System Name" attribute
+        :param CloudShellResourcesDetailsCache cs_resources_details_cache: resources details loaded from the CloudShell
+        :param int workers: number of resources and ports that will be processed concurrently,
+            each of them uses its own CloudShell API session from the pool
         """
         if output is None:
             output = EmptyOutput()
 
+        if cs_system_names_index is None:
+            cs_system_names_index = CloudShellSystemNamesIndex(logger=logger)
+
+        if cs_resources_details_cache is None:
+            cs_resources_details_cache = CloudShellResourcesDetailsCache()
+
         self.cs_session_manager = cs_session_manager
         self.report = report
         self.offline = offline
         self.output = output
         self.logger = logger
+        self.cs_system_names_index = cs_system_names_index
+        self.cs_resources_details_cache = cs_resources_details_cache
+        self.workers = workers
+        # ports of each resource are walked only once, {resource full name: {normalized port name: port}}
+        self._ports_maps = {}
+        self._ports_maps_lock = threading.Lock()
 
     def _get_resource_attribute_value(self, resource, attribute_name):
         """
@@ -75,27 +96,46 @@ class ConnectPortsCommand(object):
         :param sys_name:
         :return:
         """
-        resources = []
-        families = set([res.ResourceFamilyName for res in cs_session.GetResourceList().Resources])
-
-        for family, sys_attr in [("", SYSTEM_NAME_PORT_ATTRIBUTE)] + [(family, "{}.{}".format(
-                family, SYSTEM_NAME_PORT_ATTRIBUTE)) for family in families]:
-
-            for res in cs_session.FindResources(resourceFamily=family,
-                                                includeSubResources=False,
-                                                attributeValues=[AttributeNameValue(Name=sys_attr,
-                                                                                    Value=sys_name)]).Resources:
-                # response may contain an empty result
-                if res.ResourceFamilyName:
-                    resources.append(res)
+        resources = self.cs_system_names_index.find_resources(cs_session=cs_session, sys_name=sys_name)
 
         if not resources:
             raise ReportableException("Unable to find resource with 'System Name' attribute: '{}'".format(sys_name))
         elif len(resources) > 1:
             raise ReportableException("Found several resources: {} with the same 'System Name' attribute: '{}'"
-                                      .format([resource.Name for resource in resources], sys_name))
+                                      .format(resources, sys_name))
+
+        return self.cs_resources_details_cache.get_resource_details(cs_session=cs_session,
+                                                                    resource_name=resources[0])
+
+    def _normalize_port_name(self, port_name):
+        """Convert port name from the "Adjacent" attribute to the name of the port resource on the CloudShell
+
+        :param str port_name: port name, e.g. "Eth 2/1"
+        :return: port resource name, e.g. "Eth 2-1"
+        :rtype: str
+        """
+        return port_name.replace(".", "-").replace("/", "-")
 
-        return cs_session.GetResourceDetails(resources[0].FullName)
+    def _get_ports_map(self, resource):
+        """Get all ports of the resource by their names, ports tree of each resource is walked only once
+
+        :param cloudshell.api.cloudshell_api.ResourceInfo resource:
+        :return: dictionary {port name: port resource}
+        :rtype: dict
+        """
+        with self._ports_maps_lock:
+            ports_map = self._ports_maps.get(resource.Name)
+
+        if ports_map is None:
+            ports_map = {}
+            for port in self._find_ports(resource):
+                # the first port with the same name is used
+                ports_map.setdefault(port.Name.split("/")[-1], port)
+
+            with self._ports_maps_lock:
+                ports_map = self._ports_maps.setdefault(resource.Name, ports_map)
+
+        return ports_map
 
     def _find_port_by_adjacent_name(self, adjacent_resource, adjacent_port_name):
         """
@@ -104,74 +144,113 @@ class ConnectPortsCommand(object):
         :param str adjacent_port_name:
         :return:
         """
-        adjacent_port_name = adjacent_port_name.replace(".", "-").replace("/", "-")
+        adjacent_port_name = self._normalize_port_name(adjacent_port_name)
+        port = self._get_ports_map(adjacent_resource).get(adjacent_port_name)
 
-        for port in self._find_ports(adjacent_resource):
-            port_name = port.Name.split("/")[-1]
-            if port_name == adjacent_port_name:
-                return port
+        if port is None:
+            raise ReportableException("Unable to find Adjacent port '{}'".format(adjacent_port_name))
 
-        raise ReportableException("Unable to find Adjacent port '{}'".format(adjacent_port_name))
+        return port
 
-    def execute(self, resources_names, domain):
-        """
+    def _get_resource_adjacent_ports(self, resource_name, domain):
+        """Get ports of the resource that have the "Adjacent" attribute
 
-        :param list[str] resources_names:
+        :param str resource_name:
         :param str domain:
-        :return:
+        :return: list of tuples with port name and its adjacent or None if the resource details can't be loaded
+        :rtype: list[(str, str)]
         """
-        cs_session = self.cs_session_manager.get_session(cs_domain=domain)
+        msg = "Updating physical connections for the resource '{}': ".format(resource_name)
+        self.output.send(msg)
+        self.logger.info(msg)
 
-        for resource_name in resources_names:
-            msg = "Updating physical connections for the resource '{}': ".format(resource_name)
-            self.output.send(msg)
-            self.logger.info(msg)
+        try:
+            with self.cs_session_manager.session(cs_domain=domain) as cs_session:
+                resource = self.cs_resources_details_cache.get_resource_details(cs_session=cs_session,
+                                                                                resource_name=resource_name)
+            return self._find_adjacent_ports(resource)
+
+        except Exception:
+            self.output.send("Failed to update physical connections for the resource '{}'. "
+                             "See log for the details".format(resource_name), error=True)
+            self.logger.exception("Failed to update physical connections due to:")
 
-            try:
-                resource = cs_session.GetResourceDetails(resource_name)
-                for port, adjacent in self._find_adjacent_ports(resource):
-                    self.output.send("\t- Updating physical connection for the port '{}' ".format(port))
-                    self.logger.info("Processing port '{}' with adjacent '{}'".format(port, adjacent))
+    def _connect_port(self, port_data):
+        """Find adjacent port and update physical connection between it and the given port
 
-                    try:
-                        with self.report.add_entry(resource_name=resource_name,
-                                                   source_port=port,
-                                                   adjacent=adjacent,
-                                                   target_port="",
-                                                   domain=domain,
-                                                   offline=self.offline) as entry:
+        :param tuple port_data: tuple with port name, its adjacent and report Entry
+        :return:
+        """
+        port, adjacent, report_entry = port_data
+        self.output.send("\t- Updating physical connection for the port '{}' ".format(port))
+        self.logger.info("Processing port '{}' with adjacent '{}'".format(port, adjacent))
 
-                            adjacent_sys_name, adjacent_port_name = [x.strip() for x in adjacent.split("through")]
-                            adjacent_resource = self._find_resource_by_sys_name(cs_session=cs_session,
-                                                                                sys_name=adjacent_sys_name)
+        try:
+            with report_entry as entry, self.cs_session_manager.session(cs_domain=entry.domain) as cs_session:
+                adjacent_sys_name, adjacent_port_name = [x.strip() for x in adjacent.split("through")]
+                adjacent_resource = self._find_resource_by_sys_name(cs_session=cs_session,
+                                                                    sys_name=adjacent_sys_name)
 
-                            adjacent_port = self._find_port_by_adjacent_name(adjacent_resource=adjacent_resource,
-                                                                             adjacent_port_name=adjacent_port_name)
+                adjacent_port = self._find_port_by_adjacent_name(adjacent_resource=adjacent_resource,
+                                                                 adjacent_port_name=adjacent_port_name)
 
-                            entry.target_port = adjacent_port.Name
+                entry.target_port = adjacent_port.Name
 
-                            if not self.offline:
-                                cs_session.UpdatePhysicalConnection(resourceAFullPath=entry.source_port,
-                                                                    resourceBFullPath=entry.target_port)
+                if not self.offline:
+                    cs_session.UpdatePhysicalConnection(resourceAFullPath=entry.source_port,
+                                                        resourceBFullPath=entry.target_port)
 
-                    except ReportableException as e:
-                        self.output.send("\t- Failed to update physical connection for the port '{}'. {}"
-                                         .format(port, e), error=True)
-                        self.logger.exception("Failed to update physical connection due to:")
+        except ReportableException as e:
+            self.output.send("\t- Failed to update physical connection for the port '{}'. {}"
+                             .format(port, e), error=True)
+            self.logger.exception("Failed to update physical connection due to:")
 
-                    except Exception:
-                        self.output.send("\t- Failed to update physical connection for the port '{}' ".format(port),
-                                         error=True)
-                        self.logger.exception("Failed to update physical connection due to:")
+        except Exception:
+            self.output.send("\t- Failed to update physical connection for the port '{}' ".format(port),
+                             error=True)
+            self.logger.exception("Failed to update physical connection due to:")
 
-            except Exception:
-                self.output.send("Failed to update physical connections for the resource '{}'. See log for the details"
-                                 .format(resource_name), error=True)
-                self.logger.exception("Failed to update physical connections due to:")
+        finally:
+            self.report.finish_entry(report_entry)
 
-            else:
-                msg = "Physical connections for the resource '{}' were updated".format(resource_name)
-                self.output.send(msg)
-                self.logger.info(msg)
+    def execute(self, resources_names, domain):
+        """
+
+        :param list[str] resources_names:
+        :param str domain:
+        :return:
+        """
+        resources_adjacent_ports = parallel_imap(
+            lambda resource_name: (resource_name, self._get_resource_adjacent_ports(resource_name=resource_name,
+                                                                                    domain=domain)),
+            resources_names,
+            workers=self.workers)
+
+        updated_resources = []
+        ports_data = []
+
+        # entries are added to the report before the ports are processed, so the report order doesn't
+        # depend on the number of workers
+        for resource_name, adjacent_ports in resources_adjacent_ports:
+            if adjacent_ports is None:
+                continue
+
+            updated_resources.append(resource_name)
+            for port, adjacent in adjacent_ports:
+                report_entry = self.report.add_entry(resource_name=resource_name,
+                                                     source_port=port,
+                                                     adjacent=adjacent,
+                                                     target_port="",
+                                                     domain=domain,
+                                                     offline=self.offline)
+                ports_data.append((port, adjacent, report_entry))
+
+        for _ in parallel_imap(self._connect_port, ports_data, workers=self.workers):
+            pass
+
+        for resource_name in updated_resources:
+            msg = "Physical connections for the resource '{}' were updated".format(resource_name)
+            self.output.send(msg)
+            self.logger.info(msg)
 
         self.report.generate()
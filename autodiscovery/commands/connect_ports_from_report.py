@@ -1,68 +1,219 @@
+import collections
+import threading
+
+from autodiscovery.common.cs_resources_details_cache import CloudShellResourcesDetailsCache
+from autodiscovery.common.utils import parallel_imap
 from autodiscovery.exceptions import ReportableException
 from autodiscovery.output import EmptyOutput
 
 
 class ConnectPortsFromReportCommand(object):
-    def __init__(self, cs_session_manager, report, logger, output=None):
+    def __init__(self, cs_session_manager, report, logger, output=None, workers=1, dry_run=False,
+                 cs_resources_details_cache=None):
         """
 
         :param cs_session_manager:
         :param report:
         :param logger:
         :param output:
+        :param int workers: number of connections in the same domain that will be updated concurrently,
+            each of them uses its own CloudShell API session from the pool
+        :param bool dry_run: only check that all ports exist on the CloudShell without creation of any connections
+        :param CloudShellResourcesDetailsCache cs_resources_details_cache: resources details loaded from the CloudShell
         """
         if output is None:
             output = EmptyOutput()
 
+        if cs_resources_details_cache is None:
+            cs_resources_details_cache = CloudShellResourcesDetailsCache()
+
         self.cs_session_manager = cs_session_manager
         self.report = report
         self.output = output
         self.logger = logger
+        self.workers = workers
+        self.dry_run = dry_run
+        self.cs_resources_details_cache = cs_resources_details_cache
+        # full names of each root resource and all its sub-resources, {(domain, root name): set of names}
+        self._resources_names = {}
+        self._resources_names_lock = threading.Lock()
+
+    def _get_port_key(self, domain, port):
+        """Get key that identifies the port on the CloudShell
+
+        :param str domain:
+        :param str port: port full name
+        :rtype: tuple
+        """
+        return domain, port.lower()
 
-    def execute(self, parsed_entries):
+    def _find_duplicate_ports(self, entries):
+        """Find ports that are used in several connections, a port can have only one physical connection
+
+        :param list[autodiscovery.reports.connections.base.Entry] entries:
+        :return: set of port keys
+        :rtype: set
         """
+        ports_counter = collections.Counter(self._get_port_key(entry.domain, port)
+                                            for entry in entries
+                                            for port in (entry.source_port, entry.target_port) if port)
 
-        :param list[autodiscovery.reports.connections.base.Entry] parsed_entries:
+        return set(port_key for port_key, count in ports_counter.iteritems() if count > 1)
+
+    def _get_resource_names(self, cs_session, root_name):
+        """Get full names of the root resource and all its sub-resources, resource tree is loaded only once
+
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
+        :param str root_name:
+        :return: set of lower-case full names, empty if the root resource doesn't exist
+        :rtype: set
+        """
+        key = self._get_port_key(cs_session.domain, root_name)
+
+        with self._resources_names_lock:
+            names = self._resources_names.get(key)
+
+        if names is None:
+            names = set()
+
+            try:
+                resource = self.cs_resources_details_cache.get_resource_details(cs_session=cs_session,
+                                                                                resource_name=root_name)
+            except Exception:
+                self.logger.warning("Unable to load details of the resource {}".format(root_name), exc_info=True)
+            else:
+                resources = [resource]
+                while resources:
+                    resource = resources.pop()
+                    names.add(resource.Name.lower())
+                    resources.extend(resource.ChildResources)
+
+            with self._resources_names_lock:
+                names = self._resources_names.setdefault(key, names)
+
+        return names
+
+    def _validate_entry(self, report_entry):
+        """Check that both ports of the connection exist on the CloudShell
+
+        :param autodiscovery.reports.connections.base.Entry report_entry:
         :return:
         """
-        for parsed_entry in parsed_entries:
-            self.logger.info("Processing connection between port {} and {}".format(parsed_entry.source_port,
-                                                                                   parsed_entry.target_port))
+        with report_entry as entry, self.cs_session_manager.session(cs_domain=entry.domain) as cs_session:
+            for port in (entry.source_port, entry.target_port):
+                root_name = port.split("/")[0]
+                if port.lower() not in self._get_resource_names(cs_session=cs_session, root_name=root_name):
+                    raise ReportableException("Port '{}' doesn't exist on the CloudShell".format(port))
 
+    def _connect_entry(self, report_entry):
+        """Update physical connection between the ports
+
+        :param autodiscovery.reports.connections.base.Entry report_entry:
+        :return:
+        """
+        with report_entry as entry:
+            entry.status = entry.SUCCESS_STATUS
+            with self.cs_session_manager.session(cs_domain=entry.domain) as cs_session:
+                cs_session.UpdatePhysicalConnection(resourceAFullPath=entry.source_port,
+                                                    resourceBFullPath=entry.target_port)
+
+    def _process_entry(self, report_entry):
+        """Validate or update connection and send the result to the output and to the logs
+
+        :param autodiscovery.reports.connections.base.Entry report_entry:
+        :return:
+        """
+        self.logger.info("Processing connection between port {} and {}".format(report_entry.source_port,
+                                                                               report_entry.target_port))
+        try:
+            if self.dry_run:
+                self._validate_entry(report_entry)
+            else:
+                self._connect_entry(report_entry)
+
+        except Exception as e:
+            self._report_entry_failure(report_entry=report_entry, error=e)
+
+        else:
+            if self.dry_run:
+                msg = "Connection between port '{}' and port '{}' is valid"
+            else:
+                msg = "Connection between port '{}' and port '{}' was successfully processed"
+
+            msg = msg.format(report_entry.source_port, report_entry.target_port)
+            self.output.send(msg)
+            self.logger.info(msg)
+
+        finally:
+            self.report.finish_entry(report_entry)
+
+    def _report_entry_failure(self, report_entry, error):
+        """Send message about the failed connection to the output and to the logs
+
+        Should be called from the "except" block
+
+        :param autodiscovery.reports.connections.base.Entry report_entry:
+        :param Exception error:
+        :return:
+        """
+        if isinstance(error, ReportableException):
+            self.output.send("Failed to connect port '{}' and '{}'. {}".format(report_entry.source_port,
+                                                                               report_entry.target_port,
+                                                                               str(error)), error=True)
+        else:
+            self.output.send("Failed to connect port '{}' and '{}'. See log for details".format(
+                report_entry.source_port,
+                report_entry.target_port), error=True)
+
+        self.logger.exception("Failed to connect ports due to:")
+
+    def _get_domains_entries(self, report_entries):
+        """Check entries without any API calls and group entries that should be processed by the domain
+
+        :param list[autodiscovery.reports.connections.base.Entry] report_entries:
+        :return: ordered dictionary {domain: list of entries}
+        :rtype: collections.OrderedDict
+        """
+        duplicate_ports = self._find_duplicate_ports(report_entries)
+        domains_entries = collections.OrderedDict()
+
+        for report_entry in report_entries:
             try:
-                with self.report.edit_entry(entry=parsed_entry) as entry:
+                with report_entry as entry:
 
-                    if entry.status == entry.SUCCESS_STATUS:
+                    if entry.status == entry.SUCCESS_STATUS and not self.dry_run:
+                        self.report.finish_entry(entry)
                         continue
 
-                    if not all([entry.source_port, parsed_entry.target_port]):
+                    if not all([entry.source_port, entry.target_port]):
                         raise ReportableException("'Source Port Full Name' and 'Target Port Full Name' fields "
                                                   "cannot be empty")
 
-                    entry.status = entry.SUCCESS_STATUS
-                    cs_session = self.cs_session_manager.get_session(cs_domain=entry.domain)
+                    for port in (entry.source_port, entry.target_port):
+                        if self._get_port_key(entry.domain, port) in duplicate_ports:
+                            raise ReportableException("Port '{}' is used in several connections".format(port))
 
-                    cs_session.UpdatePhysicalConnection(resourceAFullPath=parsed_entry.source_port,
-                                                        resourceBFullPath=parsed_entry.target_port)
+            except Exception as e:
+                self._report_entry_failure(report_entry=report_entry, error=e)
+                self.report.finish_entry(report_entry)
 
-            except ReportableException as e:
-                self.output.send("Failed to connect port '{}' and '{}'. {}".format(parsed_entry.source_port,
-                                                                                   parsed_entry.target_port,
-                                                                                   str(e)), error=True)
-                self.logger.exception("Failed to connect ports due to:")
+            else:
+                domains_entries.setdefault(report_entry.domain, []).append(report_entry)
 
-            except Exception:
-                self.output.send("Failed to connect port '{}' and '{}'. See log for details".format(
-                    parsed_entry.source_port,
-                    parsed_entry.target_port), error=True)
-                self.logger.exception("Failed to connect ports due to:")
+        return domains_entries
 
-            else:
-                msg = "Connection between port '{}' and port '{}' was successfully processed".format(
-                    parsed_entry.source_port,
-                    parsed_entry.target_port)
+    def execute(self, parsed_entries):
+        """
+
+        :param list[autodiscovery.reports.connections.base.Entry] parsed_entries:
+        :return:
+        """
+        report_entries = [self.report.edit_entry(entry=parsed_entry) for parsed_entry in parsed_entries]
+
+        for domain, domain_entries in self._get_domains_entries(report_entries).iteritems():
+            self.logger.info("Processing {} connections in the domain {}".format(len(domain_entries), domain))
 
-                self.output.send(msg)
-                self.logger.info(msg)
+            for _ in parallel_imap(self._process_entry, domain_entries, workers=self.workers):
+                pass
 
         self.report.generate()
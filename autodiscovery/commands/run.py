@@ -1,9 +1,23 @@
 import re
+import threading
 import uuid
+from multiprocessing.pool import ThreadPool
 
 from cloudshell.snmp.quali_snmp import QualiSnmp
 from cloudshell.snmp.snmp_parameters import SNMPV2Parameters
 
+from autodiscovery import config
+from autodiscovery.common.cli_connection_limiter import CLIConnectionLimiter
+from autodiscovery.common.consts import ExistingResourceActions
+from autodiscovery.common.consts import ResourceModelsAttributes
+from autodiscovery.common.cs_folders_cache import CloudShellFoldersCache
+from autodiscovery.common.cs_resources_index import CloudShellResourcesIndex
+from autodiscovery.common.cs_shells_cache import CloudShellShellsCache
+from autodiscovery.common.snmp_community_cache import SNMPCommunityCache
+from autodiscovery.common.snmp_prober import AsyncSNMPProber
+from autodiscovery.common.snmp_prober import SNMPSystemInfo
+from autodiscovery.common.utils import parallel_first
+from autodiscovery.common.utils import parallel_pipeline
 from autodiscovery.exceptions import ReportableException
 from autodiscovery.handlers import NetworkingTypeHandler
 from autodiscovery.handlers import Layer1TypeHandler
@@ -13,7 +27,9 @@ from autodiscovery.output import EmptyOutput
 
 
 class AbstractRunCommand(object):
-    def __init__(self, data_processor, report, logger, cs_session_manager, output=None, autoload=True):
+    def __init__(self, data_processor, report, logger, cs_session_manager, output=None, autoload=True,
+                 cli_connection_limiter=None, autoload_scheduler=None,
+                 existing_resource_action=ExistingResourceActions.CREATE, attributes_batcher=None):
         """
 
         :param autodiscovery.data_processors.JsonDataProcessor data_processor:
@@ -22,6 +38,13 @@ class AbstractRunCommand(object):
         :param cs_session_manager:
         :param autodiscovery.output.AbstractOutput output:
         :param bool autoload:
+        :param CLIConnectionLimiter cli_connection_limiter: limits CLI connections opened at the same time
+        :param autodiscovery.common.autoload_scheduler.AutoloadScheduler autoload_scheduler: runs Autoload in the
+            background, Autoload is run right after the resource creation if it is None
+        :param str existing_resource_action: what to do with the device that already has a resource with its address
+            on the CloudShell, one of the ExistingResourceActions
+        :param autodiscovery.common.cs_attributes_batcher.CloudShellAttributesBatcher attributes_batcher: sets
+            attributes of many resources with one API call, attributes are set right after the upload if it is None
         """
         self.data_processor = data_processor
         self.report = report
@@ -31,20 +54,102 @@ class AbstractRunCommand(object):
         if output is None:
             output = EmptyOutput()
         self.output = output
+        self.autoload_scheduler = autoload_scheduler
+        self.attributes_batcher = attributes_batcher
+        # uploaded entries which result can still be changed by the background Autoload or attributes update
+        self._unfinished_entries = []
+        self._unfinished_entries_lock = threading.Lock()
+
+        # CLI connections limit and CloudShell folders, resources and shells caches are shared between all handlers
+        if cli_connection_limiter is None:
+            cli_connection_limiter = CLIConnectionLimiter(max_connections=config.CLI_MAX_CONNECTIONS,
+                                                          max_device_connections=config.CLI_MAX_DEVICE_CONNECTIONS)
+
+        handler_kwargs = dict(logger=logger,
+                              autoload=autoload,
+                              cli_connection_limiter=cli_connection_limiter,
+                              autoload_scheduler=autoload_scheduler,
+                              cs_folders_cache=CloudShellFoldersCache(),
+                              cs_resources_index=CloudShellResourcesIndex(logger=logger),
+                              existing_resource_action=existing_resource_action,
+                              cs_shells_cache=CloudShellShellsCache(),
+                              attributes_batcher=attributes_batcher)
 
         self.vendor_type_handlers_map = {
-            "networking": NetworkingTypeHandler(logger=logger, autoload=autoload),
-            "layer1": Layer1TypeHandler(logger=logger, autoload=autoload),
-            "traffic_generator": TrafficGeneratorTypeHandler(logger=logger, autoload=autoload),
-            "pdu": PDUTypeHandler(logger=logger, autoload=autoload),
+            "networking": NetworkingTypeHandler(**handler_kwargs),
+            "layer1": Layer1TypeHandler(**handler_kwargs),
+            "traffic_generator": TrafficGeneratorTypeHandler(**handler_kwargs),
+            "pdu": PDUTypeHandler(**handler_kwargs),
         }
 
     def execute(self, *args, **kwargs):
         raise NotImplementedError("Class {} must implement method 'execute'".format(type(self)))
 
+    def _finish_entry(self, entry, uploaded=False):
+        """Mark Entry as finished in the report, so the stream report can write it right away
+
+        Result of the uploaded device can still be changed by the background Autoload or by the batched
+        attributes update, so such Entry is finished only when all background stages are done
+
+        :param autodiscovery.reports.discovery.base.Entry entry:
+        :param bool uploaded: whether the device was uploaded on the CloudShell
+        :return: whether Entry was finished
+        :rtype: bool
+        """
+        if uploaded and (self.autoload_scheduler is not None or self.attributes_batcher is not None):
+            with self._unfinished_entries_lock:
+                self._unfinished_entries.append(entry)
+            return False
+
+        self.report.finish_entry(entry)
+        return True
+
+    def _finish_unfinished_entries(self):
+        """Mark all uploaded entries as finished, should be called when all background stages are done
+
+        :return:
+        """
+        with self._unfinished_entries_lock:
+            entries, self._unfinished_entries = self._unfinished_entries, []
+
+        for entry in entries:
+            self._finish_entry(entry)
+
+    def _wait_for_attributes(self):
+        """Set attributes collected in the batches and wait until all of them are set
+
+        :return:
+        """
+        if self.attributes_batcher is None:
+            return
+
+        for entry, resource_name, error in self.attributes_batcher.wait():
+            self.output.send("Failed to set attributes for the resource {} of the {} device. {}".format(
+                resource_name, entry.ip, error), error=True)
+
+    def _wait_for_autoload(self):
+        """Wait until Autoload of all resources scheduled in the background is finished
+
+        :return:
+        """
+        if self.autoload_scheduler is None:
+            return
+
+        self.output.send("Waiting for the Autoload of the created resources")
+
+        for entry, resource_name, error in self.autoload_scheduler.wait():
+            self.output.send("Failed to autoload resource {} for the {} device. {}".format(resource_name,
+                                                                                          entry.ip,
+                                                                                          error), error=True)
+
 
 class RunCommand(AbstractRunCommand):
-    def __init__(self, data_processor, report, logger, cs_session_manager, output=None, autoload=True, offline=False):
+    def __init__(self, data_processor, report, logger, cs_session_manager, output=None, autoload=True, offline=False,
+                 workers=1, prescanner=None, snmp_prober=None, snmp_community_cache=None, discovery_cache=None,
+                 cli_connection_limiter=None, cli_ports_prescanner=None, upload_workers=1,
+                 upload_queue_size=config.UPLOAD_QUEUE_SIZE, autoload_scheduler=None,
+                 existing_resource_action=ExistingResourceActions.CREATE, attributes_batcher=None,
+                 discovery_journal=None, resume=False, concurrent_snmp_communities=False):
         """
 
         :param autodiscovery.data_processors.JsonDataProcessor data_processor:
@@ -54,9 +159,67 @@ class RunCommand(AbstractRunCommand):
         :param autodiscovery.output.AbstractOutput output:
         :param bool autoload:
         :param bool offline:
+        :param int workers: number of devices that will be discovered concurrently
+        :param autodiscovery.common.prescan.PreScanner prescanner: drops dead hosts before the SNMP discovery
+        :param autodiscovery.common.snmp_prober.AsyncSNMPProber snmp_prober: gets SNMP data from all devices at once
+        :param SNMPCommunityCache snmp_community_cache: valid SNMP community strings learned per subnet
+        :param autodiscovery.common.discovery_cache.DiscoveryCache discovery_cache: devices discovered on previous runs
+        :param CLIConnectionLimiter cli_connection_limiter: limits CLI connections opened at the same time
+        :param autodiscovery.common.prescan.PreScanner cli_ports_prescanner: finds open CLI ports before the discovery
+        :param int upload_workers: number of discovered devices that will be uploaded on the CloudShell concurrently
+        :param int upload_queue_size: max number of discovered devices waiting for the upload
+        :param autodiscovery.common.autoload_scheduler.AutoloadScheduler autoload_scheduler: runs Autoload in the
+            background, Autoload is run right after the resource creation if it is None
+        :param str existing_resource_action: what to do with the device that already has a resource with its address
+            on the CloudShell, one of the ExistingResourceActions
+        :param autodiscovery.common.cs_attributes_batcher.CloudShellAttributesBatcher attributes_batcher: sets
+            attributes of many resources with one API call, attributes are set right after the upload if it is None
+        :param autodiscovery.common.discovery_journal.DiscoveryJournal discovery_journal: records finished devices,
+            so the interrupted run can be resumed
+        :param bool resume: whether to skip devices recorded in the journal by the interrupted run
+        :param bool concurrent_snmp_communities: whether to try SNMP community strings of the device concurrently,
+            the first community string that responds is used then instead of the first valid one in the input order
         """
-        super(RunCommand, self).__init__(data_processor, report, logger, cs_session_manager, output, autoload)
+        super(RunCommand, self).__init__(data_processor, report, logger, cs_session_manager, output, autoload,
+                                         cli_connection_limiter, autoload_scheduler, existing_resource_action,
+                                         attributes_batcher)
         self.offline = offline
+        self.workers = workers
+        self.prescanner = prescanner
+        self.snmp_prober = snmp_prober
+
+        if snmp_community_cache is None:
+            snmp_community_cache = SNMPCommunityCache(prefix_length=config.SNMP_COMMUNITY_PREFIX_LENGTH)
+        self.snmp_community_cache = snmp_community_cache
+        self.discovery_cache = discovery_cache
+        self.cli_ports_prescanner = cli_ports_prescanner
+        self.upload_workers = upload_workers
+        self.upload_queue_size = upload_queue_size
+        self.discovery_journal = discovery_journal
+        self.resume = resume
+        self.concurrent_snmp_communities = concurrent_snmp_communities
+        # SNMP community strings of all devices are tried in one shared pool, so the number of
+        # concurrent SNMP sessions doesn't grow with the number of workers
+        self._snmp_community_pool = None
+        self._snmp_community_pool_lock = threading.Lock()
+
+    def _finish_entry(self, entry, uploaded=False):
+        """Mark Entry as finished in the report and record it into the discovery journal
+
+        Uploaded device is recorded right away, even if its background stages aren't done yet, so the created
+        resource isn't uploaded again on the resume. The record is updated when the Entry is finished
+
+        :param autodiscovery.reports.discovery.base.Entry entry:
+        :param bool uploaded: whether the device was uploaded on the CloudShell
+        :return: whether Entry was finished
+        :rtype: bool
+        """
+        finished = super(RunCommand, self)._finish_entry(entry=entry, uploaded=uploaded)
+
+        if (finished or uploaded) and self.discovery_journal is not None:
+            self.discovery_journal.record(entry)
+
+        return finished
 
     def _parse_vendor_number(self, sys_obj_id):
         """Get device vendor number from SNMPv2 mib
@@ -69,25 +232,82 @@ class RunCommand(AbstractRunCommand):
         if match_name:
             return match_name.group("vendor")
 
+    def _get_snmp_handler_for_community(self, device_ip, snmp_community):
+        """Get SNMP Handler for the device if the given community string is valid
+
+        :param str device_ip:
+        :param str snmp_community:
+        :return: tuple with QualiSnmp instance and valid SNMP community string or None
+        :rtype: (QualiSnmp, str)
+        """
+        self.logger.info("Trying community string '{}' for device with IP {}".format(snmp_community, device_ip))
+        snmp_parameters = SNMPV2Parameters(ip=device_ip, snmp_community=snmp_community)
+
+        try:
+            return QualiSnmp(snmp_parameters, self.logger), snmp_community
+        except Exception:
+            self.logger.warning("SNMP Community string '{}' is not valid for device with IP {}"
+                                .format(snmp_community, device_ip))
+
+    def _get_snmp_community_pool(self):
+        """Get pool of threads for trying SNMP community strings, pool is created on the first use
+
+        :rtype: ThreadPool
+        """
+        with self._snmp_community_pool_lock:
+            if self._snmp_community_pool is None:
+                self._snmp_community_pool = ThreadPool(processes=config.SNMP_COMMUNITY_WORKERS)
+
+            return self._snmp_community_pool
+
+    def _close_snmp_community_pool(self):
+        """Stop accepting new tasks in the SNMP community strings pool, still running tries are not waited for
+
+        :return:
+        """
+        with self._snmp_community_pool_lock:
+            pool, self._snmp_community_pool = self._snmp_community_pool, None
+
+        if pool is not None:
+            pool.close()
+
     def _get_snmp_handler(self, device_ip, snmp_comunity_strings):
         """Get SNMP Handler and valid community string for the device
 
+        Community string that was valid for the neighbour devices is tried first, all other community strings
+        are tried one by one in the given order or concurrently if concurrent SNMP communities are enabled
+
         :param str device_ip:
         :param list[str] snmp_comunity_strings:
         :return: tuple with QualiSnmp instance and valid SNMP community string
         :rtype: (QualiSnmp, str)
         """
-        for snmp_community in snmp_comunity_strings:
-            self.logger.info("Trying community string '{}' for device with IP {}".format(snmp_community, device_ip))
-            snmp_parameters = SNMPV2Parameters(ip=device_ip, snmp_community=snmp_community)
+        snmp_comunity_strings = list(snmp_comunity_strings)
+        learned_community = self.snmp_community_cache.get(device_ip)
+        result = None
+
+        if learned_community in snmp_comunity_strings:
+            snmp_comunity_strings.remove(learned_community)
+            result = self._get_snmp_handler_for_community(device_ip=device_ip, snmp_community=learned_community)
+
+        if result is None and self.concurrent_snmp_communities:
+            result = parallel_first(lambda snmp_community: self._get_snmp_handler_for_community(
+                device_ip=device_ip,
+                snmp_community=snmp_community), snmp_comunity_strings, pool=self._get_snmp_community_pool())
+
+        elif result is None:
+            for snmp_community in snmp_comunity_strings:
+                result = self._get_snmp_handler_for_community(device_ip=device_ip, snmp_community=snmp_community)
+                if result is not None:
+                    break
+
+        if result is None:
+            raise ReportableException("SNMP timeout - no resource detected")
 
-            try:
-                return QualiSnmp(snmp_parameters, self.logger), snmp_community
-            except Exception:
-                self.logger.warning("SNMP Community string '{}' is not valid for device with IP {}"
-                                    .format(snmp_community, device_ip))
+        snmp_handler, snmp_community = result
+        self.snmp_community_cache.learn(device_ip=device_ip, snmp_community=snmp_community)
 
-        raise ReportableException("SNMP timeout - no resource detected")
+        return snmp_handler, snmp_community
 
     def _generate_device_name(self, vendor_name):
         """Generate name for the device model on CloudShell based on vendor name
@@ -98,26 +318,42 @@ class RunCommand(AbstractRunCommand):
         vendor_name = re.sub("[^a-zA-Z0-9 .-]", "", vendor_name)
         return "{}-{}".format(vendor_name, uuid.uuid4())
 
-    def _discover_device(self, entry, snmp_comunity_strings):
+    def _get_system_info(self, device_ip, snmp_comunity_strings):
+        """Get device system information via SNMP
+
+        :param str device_ip:
+        :param list snmp_comunity_strings: list of possible SNMP read community strings for the given devices
+        :rtype: SNMPSystemInfo
+        """
+        snmp_handler, snmp_community = self._get_snmp_handler(device_ip=device_ip,
+                                                              snmp_comunity_strings=snmp_comunity_strings)
+        return SNMPSystemInfo(snmp_community=snmp_community,
+                              sys_object_id=snmp_handler.get_property('SNMPv2-MIB', 'sysObjectID', '0'),
+                              description=snmp_handler.get_property('SNMPv2-MIB', 'sysDescr', '0'),
+                              sys_name=snmp_handler.get_property('SNMPv2-MIB', 'sysName', '0'))
+
+    def _discover_device(self, entry, snmp_comunity_strings, snmp_system_data=None):
         """Discover device attributes via SNMP
 
         :param autodiscovery.reports.base.Entry entry:
         :param list snmp_comunity_strings: list of possible SNMP read community strings for the given devices
+        :param dict snmp_system_data: system information {IP: SNMPSystemInfo} that was already received from devices
         :rtype: autodiscovery.reports.base.Entry
         """
-        snmp_handler, snmp_community = self._get_snmp_handler(device_ip=entry.ip,
-                                                              snmp_comunity_strings=snmp_comunity_strings)
-        # set valid SNMP string to be first in the list
-        snmp_comunity_strings.remove(snmp_community)
-        snmp_comunity_strings.insert(0, snmp_community)
+        if snmp_system_data is None:
+            system_info = self._get_system_info(device_ip=entry.ip, snmp_comunity_strings=snmp_comunity_strings)
+        elif entry.ip in snmp_system_data:
+            system_info = snmp_system_data[entry.ip]
+        else:
+            raise ReportableException("SNMP timeout - no resource detected")
 
         vendor_enterprise_numbers = self.data_processor.load_vendor_enterprise_numbers()
-        entry.snmp_community = snmp_community
-        entry.sys_object_id = snmp_handler.get_property('SNMPv2-MIB', 'sysObjectID', '0')
+        entry.snmp_community = system_info.snmp_community
+        entry.sys_object_id = system_info.sys_object_id
         vendor_number = self._parse_vendor_number(entry.sys_object_id)
         entry.vendor = vendor_enterprise_numbers[vendor_number]
-        entry.description = snmp_handler.get_property('SNMPv2-MIB', 'sysDescr', '0')
-        sys_name = snmp_handler.get_property('SNMPv2-MIB', 'sysName', '0')
+        entry.description = system_info.description
+        sys_name = system_info.sys_name
 
         if not sys_name:
             sys_name = self._generate_device_name(vendor_name=entry.vendor)
@@ -125,53 +361,409 @@ class RunCommand(AbstractRunCommand):
         entry.device_name = sys_name
         return entry
 
-    def execute(self, devices_ips, snmp_comunity_strings, vendor_settings, additional_vendors_data):
-        """Execute Auto-discovery command
+    def _get_entries(self, devices_ips, journaled_entries=None):
+        """Add Entry to the report for each device IP in the order they were given
+
+        Devices finished by the interrupted run are added to the report as they are and are not returned
 
         :param list[autodiscovery.models.DeviceIPRange] devices_ips: list of devices IPs to discover
-        :param list snmp_comunity_strings: list of possible SNMP read community strings for the given devices
+        :param dict journaled_entries: devices finished by the interrupted run {IP: Entry}
+        :rtype: collections.Iterable[autodiscovery.reports.discovery.base.Entry]
+        """
+        for devices_ip_range in devices_ips:
+            for device_ip in devices_ip_range.ip_range:
+                if journaled_entries and device_ip in journaled_entries:
+                    entry = self.report.edit_entry(entry=journaled_entries.pop(device_ip))
+                    self.report.finish_entry(entry)
+                    continue
+
+                yield self.report.add_entry(ip=device_ip, domain=devices_ip_range.domain, offline=self.offline)
+
+    def _get_journaled_entries(self, vendor_config, vendor_settings):
+        """Get devices finished by the interrupted run and start recording of the current run into the journal
+
+        Failed devices are discovered again. Passwords aren't stored in the journal, device is discovered again
+        if they can't be restored
+
+        :param autodiscovery.models.VendorDefinitionCollection vendor_config:
         :param autodiscovery.models.vendor.VendorSettingsCollection vendor_settings: additional vendor settings
-        :param list[dict] additional_vendors_data: additional vendors configuration
-        :return:
+        :return: dictionary {IP: Entry}
+        :rtype: dict
         """
-        vendor_config = self.data_processor.load_vendor_config(additional_vendors_data=additional_vendors_data)
+        journaled_entries = {}
+
+        if self.discovery_journal is None:
+            return journaled_entries
+
+        if self.resume:
+            for device_ip, entry_data in self.discovery_journal.load().iteritems():
+                entry = self.report.entry_class(**entry_data)
+
+                if entry.status == entry.FAILED_STATUS:
+                    self.logger.info("Journaled device with IP {} was failed, discovering it again".format(device_ip))
+                    continue
+
+                if any(attr_name in entry.attributes for attr_name in self.discovery_journal.SECRET_ATTRIBUTES):
+                    vendor = vendor_config.get_vendor(vendor_name=entry.vendor)
 
+                    if vendor is None or not self._apply_vendor_settings(entry=entry,
+                                                                         vendor=vendor,
+                                                                         vendor_settings=vendor_settings):
+                        self.logger.info("CLI credentials of the journaled device with IP {} weren't found in the "
+                                         "input file, discovering it again".format(device_ip))
+                        continue
+
+                journaled_entries[device_ip] = entry
+
+            self.output.send("{} devices were finished by the interrupted run".format(len(journaled_entries)))
+
+        self.discovery_journal.start(resume=self.resume)
+        return journaled_entries
+
+    def _iter_devices_ips(self, devices_ips, skip_ips=None, only_ips=None):
+        """Iterate over all IPs in the given IP ranges
+
+        :param list[autodiscovery.models.DeviceIPRange] devices_ips: list of devices IPs to discover
+        :param skip_ips: IPs that should be skipped
+        :param only_ips: only these IPs will be returned if it is not None
+        :rtype: collections.Iterable[str]
+        """
         for devices_ip_range in devices_ips:
-            cs_domain = devices_ip_range.domain
             for device_ip in devices_ip_range.ip_range:
-                self.logger.info("Discovering device with IP {}".format(device_ip))
-                self.output.send("Discovering device with IP {}".format(device_ip))
-                try:
-                    with self.report.add_entry(ip=device_ip, domain=cs_domain, offline=self.offline) as entry:
-                        entry = self._discover_device(entry=entry, snmp_comunity_strings=snmp_comunity_strings)
-                        vendor = vendor_config.get_vendor(vendor_name=entry.vendor)
+                if skip_ips and device_ip in skip_ips:
+                    continue
 
-                        if vendor is None:
-                            raise ReportableException("Unsupported vendor {}".format(entry.vendor))
+                if only_ips is None or device_ip in only_ips:
+                    yield device_ip
 
-                        try:
-                            handler = self.vendor_type_handlers_map[vendor.vendor_type.lower()]
-                        except KeyError:
-                            raise ReportableException(
-                                "Invalid vendor type '{}'. Possible values are: {}".format(
-                                    vendor.vendor_type, self.vendor_type_handlers_map.keys()))
+    def _prescan_devices(self, devices_ips, skip_ips=None):
+        """Find all alive devices in the given IP ranges
 
-                        discovered_entry = handler.discover(entry=entry, vendor=vendor, vendor_settings=vendor_settings)
+        :param list[autodiscovery.models.DeviceIPRange] devices_ips: list of devices IPs to discover
+        :param skip_ips: IPs of devices that shouldn't be scanned
+        :return: dictionary {IP: {port: port state}} for all alive devices
+        :rtype: dict
+        """
+        self.output.send("Pre-scanning devices for the liveness")
+        alive_hosts = self.prescanner.find_alive_hosts(self._iter_devices_ips(devices_ips, skip_ips=skip_ips))
+        self.output.send("Found {} alive devices".format(len(alive_hosts)))
+        self.logger.info("Found alive devices: {}".format(sorted(alive_hosts)))
+
+        return alive_hosts
+
+    def _get_cached_entries_data(self, devices_ips, alive_hosts=None, skip_ips=None):
+        """Get data of the devices discovered on previous runs if the devices weren't changed since then
+
+        Device is considered unchanged if its current sysObjectID is the same as the cached one
+
+        :param list[autodiscovery.models.DeviceIPRange] devices_ips: list of devices IPs to discover
+        :param dict alive_hosts: devices found by the pre-scan, all devices are considered alive if it is None
+        :param skip_ips: IPs of devices that shouldn't be taken from the cache
+        :return: dictionary {IP: {Entry attribute name: value}}
+        :rtype: dict
+        """
+        entries_data = self.discovery_cache.get_entries_data(self._iter_devices_ips(devices_ips,
+                                                                                     skip_ips=skip_ips,
+                                                                                     only_ips=alive_hosts))
+        if not entries_data:
+            return {}
+
+        snmp_prober = self.snmp_prober
+        if snmp_prober is None:
+            snmp_prober = AsyncSNMPProber(timeout=config.SNMP_TIMEOUT,
+                                          retries=config.SNMP_RETRIES,
+                                          max_requests=config.SNMP_MAX_REQUESTS,
+                                          logger=self.logger)
+
+        self.output.send("Checking {} devices from the discovery cache".format(len(entries_data)))
+        sys_object_ids = snmp_prober.get_sys_object_ids(devices={ip: entry_data["snmp_community"]
+                                                                 for ip, entry_data in entries_data.iteritems()})
+
+        unchanged_entries_data = {ip: entry_data for ip, entry_data in entries_data.iteritems()
+                                  if sys_object_ids.get(ip) == entry_data["sys_object_id"]}
+        self.output.send("{} devices will be taken from the discovery cache".format(len(unchanged_entries_data)))
 
-                        if not self.offline:
-                            cs_session = self.cs_session_manager.get_session(cs_domain=cs_domain)
-                            handler.upload(entry=discovered_entry, vendor=vendor, cs_session=cs_session)
+        return unchanged_entries_data
 
-                except ReportableException as e:
-                    self.output.send("Failed to discover {} device. {}".format(device_ip, str(e)), error=True)
-                    self.logger.exception("Failed to discover {} device due to:".format(device_ip))
+    def _probe_devices(self, devices_ips, snmp_comunity_strings, alive_hosts=None, skip_ips=None):
+        """Get SNMP system information from all devices in the given IP ranges at once
+
+        :param list[autodiscovery.models.DeviceIPRange] devices_ips: list of devices IPs to discover
+        :param list snmp_comunity_strings: list of possible SNMP read community strings for the given devices
+        :param dict alive_hosts: devices found by the pre-scan, all devices are considered alive if it is None
+        :param skip_ips: IPs of devices that shouldn't be probed
+        :return: dictionary {IP: SNMPSystemInfo} for all devices that answered
+        :rtype: dict
+        """
+        self.output.send("Getting SNMP data from the devices")
+        snmp_system_data = self.snmp_prober.probe(ips=self._iter_devices_ips(devices_ips,
+                                                                             skip_ips=skip_ips,
+                                                                             only_ips=alive_hosts),
+                                                  snmp_community_strings=snmp_comunity_strings)
+        self.output.send("SNMP data was received from {} devices".format(len(snmp_system_data)))
+
+        return snmp_system_data
+
+    def _probe_cli_ports(self, devices_ips, alive_hosts=None, snmp_system_data=None, skip_ips=None):
+        """Get states of the CLI ports of all devices at once
+
+        Ports states from the liveness pre-scan are reused if it has already probed all CLI ports
+
+        :param list[autodiscovery.models.DeviceIPRange] devices_ips: list of devices IPs to discover
+        :param dict alive_hosts: devices found by the pre-scan, all devices are considered alive if it is None
+        :param dict snmp_system_data: system information {IP: SNMPSystemInfo} that was received from devices
+        :param skip_ips: IPs of devices that shouldn't be probed
+        :return: dictionary {IP: {port: port state}}
+        :rtype: dict
+        """
+        if alive_hosts is not None and set(self.cli_ports_prescanner.ports).issubset(self.prescanner.ports):
+            return alive_hosts
 
-                except Exception:
-                    self.output.send("Failed to discover {} device. See log for details".format(device_ip), error=True)
-                    self.logger.exception("Failed to discover {} device due to:".format(device_ip))
+        self.output.send("Probing CLI ports on the devices")
+        only_ips = alive_hosts if snmp_system_data is None else snmp_system_data
+        cli_ports_states = self.cli_ports_prescanner.probe_hosts(self._iter_devices_ips(devices_ips,
+                                                                                      skip_ips=skip_ips,
+                                                                                      only_ips=only_ips))
+        self.output.send("CLI ports were probed on {} devices".format(len(cli_ports_states)))
 
+        return cli_ports_states
+
+    def _restore_cached_entry(self, entry, entry_data):
+        """Fill Entry with the data of the device discovered on previous runs
+
+        :param autodiscovery.reports.discovery.base.Entry entry:
+        :param dict entry_data: {Entry attribute name: value}
+        :rtype: autodiscovery.reports.discovery.base.Entry
+        """
+        for attr_name, value in entry_data.iteritems():
+            setattr(entry, attr_name, value)
+
+        return entry
+
+    def _apply_vendor_settings(self, entry, vendor, vendor_settings):
+        """Update Entry restored from the discovery cache with the current vendor settings from the input file
+
+        Passwords aren't stored in the discovery cache, they are taken from the CLI credentials with the cached user
+
+        :param autodiscovery.reports.discovery.base.Entry entry:
+        :param autodiscovery.models.VendorDefinition vendor:
+        :param autodiscovery.models.vendor.VendorSettingsCollection vendor_settings:
+        :return: whether Entry was updated, False if CLI credentials of the cached user can't be found
+        :rtype: bool
+        """
+        entry.folder_path = vendor_settings.get_folder_path_by_vendor(vendor)
+        user = entry.attributes.get(ResourceModelsAttributes.USER)
+
+        if user is None:
+            return True
+
+        vendor_cli_creds = vendor_settings.get_creds_by_vendor(vendor)
+        user_creds = [cli_creds for cli_creds in vendor_cli_creds.cli_credentials if cli_creds.user == user] \
+            if vendor_cli_creds else []
+
+        # user was removed from the input file or it is ambiguous which password was valid
+        if len(user_creds) != 1:
+            return False
+
+        cli_creds = user_creds[0]
+        secret_values = {ResourceModelsAttributes.PASSWORD: cli_creds.password,
+                         ResourceModelsAttributes.ENABLE_PASSWORD: cli_creds.enable_password}
+
+        for attr_name, value in secret_values.iteritems():
+            if attr_name in entry.attributes:
+                entry.add_attribute(attr_name, value)
+
+        return True
+
+    def _process_device(self, report_entry, snmp_comunity_strings, vendor_settings, vendor_config,
+                        alive_hosts=None, snmp_system_data=None, cached_entries_data=None, cli_ports_states=None):
+        """Discover device and prepare it for the upload on the CloudShell
+
+        :param autodiscovery.reports.discovery.base.Entry report_entry: Entry that was added to the report
+        :param list snmp_comunity_strings: list of possible SNMP read community strings for the given devices
+        :param autodiscovery.models.vendor.VendorSettingsCollection vendor_settings: additional vendor settings
+        :param autodiscovery.models.VendorDefinitionCollection vendor_config:
+        :param dict alive_hosts: devices found by the pre-scan, all devices are considered alive if it is None
+        :param dict snmp_system_data: system information {IP: SNMPSystemInfo} that was received from devices
+        :param dict cached_entries_data: unchanged devices from the discovery cache {IP: {attribute name: value}}
+        :param dict cli_ports_states: states of the devices CLI ports {IP: {port: port state}}
+        :return: tuple with discovered Entry, its vendor and handler or None if device shouldn't be uploaded
+        :rtype: (autodiscovery.reports.discovery.base.Entry, autodiscovery.models.VendorDefinition,
+            autodiscovery.handlers.base.AbstractHandler)
+        """
+        device_ip = report_entry.ip
+        self.logger.info("Discovering device with IP {}".format(device_ip))
+        self.output.send("Discovering device with IP {}".format(device_ip))
+        try:
+            with report_entry as entry:
+                if alive_hosts is not None and device_ip not in alive_hosts:
+                    raise ReportableException("Device is unreachable")
+
+                cached_entry_data = cached_entries_data.get(device_ip) if cached_entries_data else None
+                device_cli_ports_states = cli_ports_states.get(device_ip) if cli_ports_states else None
+
+                if cached_entry_data is None:
+                    entry = self._discover_device(entry=entry,
+                                                  snmp_comunity_strings=snmp_comunity_strings,
+                                                  snmp_system_data=snmp_system_data)
+                else:
+                    self.logger.info("Device with IP {} was taken from the discovery cache".format(device_ip))
+                    entry = self._restore_cached_entry(entry=entry, entry_data=cached_entry_data)
+
+                vendor = vendor_config.get_vendor(vendor_name=entry.vendor)
+
+                if vendor is None:
+                    raise ReportableException("Unsupported vendor {}".format(entry.vendor))
+
+                try:
+                    handler = self.vendor_type_handlers_map[vendor.vendor_type.lower()]
+                except KeyError:
+                    raise ReportableException(
+                        "Invalid vendor type '{}'. Possible values are: {}".format(
+                            vendor.vendor_type, self.vendor_type_handlers_map.keys()))
+
+                if cached_entry_data is not None and not self._apply_vendor_settings(entry=entry,
+                                                                                     vendor=vendor,
+                                                                                     vendor_settings=vendor_settings):
+                    self.logger.info("CLI credentials of the cached device with IP {} weren't found in the input "
+                                     "file, discovering it again".format(device_ip))
+                    cached_entry_data = None
+
+                if cached_entry_data is None:
+                    discovered_entry = handler.discover(entry=entry,
+                                                        vendor=vendor,
+                                                        vendor_settings=vendor_settings,
+                                                        cli_ports_states=device_cli_ports_states)
+                    # devices with partially discovered data (without CLI credentials, etc.) are not cached
+                    if self.discovery_cache is not None and not discovered_entry.comment:
+                        self.discovery_cache.save_entry(discovered_entry)
                 else:
-                    self.output.send("Device with IP {} was successfully discovered".format(device_ip))
-                    self.logger.info("Device with IP {} was successfully discovered".format(device_ip))
+                    discovered_entry = entry
+
+        except Exception as e:
+            self._report_device_failure(device_ip=device_ip, error=e)
+            self._finish_entry(report_entry)
+
+        else:
+            if not self.offline:
+                return discovered_entry, vendor, handler
+
+            self._report_device_success(device_ip=device_ip)
+            self._finish_entry(report_entry)
+
+    def _upload_device(self, discovered_device):
+        """Upload discovered device on the CloudShell
+
+        :param tuple discovered_device: tuple with discovered Entry, its vendor and handler
+        :return:
+        """
+        entry, vendor, handler = discovered_device
+        device_ip = entry.ip
+        try:
+            with entry, self.cs_session_manager.session(cs_domain=entry.domain) as cs_session:
+                handler.upload(entry=entry, vendor=vendor, cs_session=cs_session)
+
+        except Exception as e:
+            self._report_device_failure(device_ip=device_ip, error=e)
+            self._finish_entry(entry)
+
+        else:
+            self._report_device_success(device_ip=device_ip)
+            self._finish_entry(entry, uploaded=True)
+
+    def _report_device_failure(self, device_ip, error):
+        """Send message about the failed device discovery to the output and to the logs
+
+        Should be called from the "except" block
+
+        :param str device_ip:
+        :param Exception error:
+        :return:
+        """
+        if isinstance(error, ReportableException):
+            self.output.send("Failed to discover {} device. {}".format(device_ip, str(error)), error=True)
+        else:
+            self.output.send("Failed to discover {} device. See log for details".format(device_ip), error=True)
+
+        self.logger.exception("Failed to discover {} device due to:".format(device_ip))
+
+    def _report_device_success(self, device_ip):
+        """Send message about the successful device discovery to the output and to the logs
+
+        :param str device_ip:
+        :return:
+        """
+        self.output.send("Device with IP {} was successfully discovered".format(device_ip))
+        self.logger.info("Device with IP {} was successfully discovered".format(device_ip))
 
+    def execute(self, devices_ips, snmp_comunity_strings, vendor_settings, additional_vendors_data):
+        """Execute Auto-discovery command
+
+        :param list[autodiscovery.models.DeviceIPRange] devices_ips: list of devices IPs to discover
+        :param list snmp_comunity_strings: list of possible SNMP read community strings for the given devices
+        :param autodiscovery.models.vendor.VendorSettingsCollection vendor_settings: additional vendor settings
+        :param list[dict] additional_vendors_data: additional vendors configuration
+        :return:
+        """
+        vendor_config = self.data_processor.load_vendor_config(additional_vendors_data=additional_vendors_data)
+        journaled_entries = self._get_journaled_entries(vendor_config=vendor_config, vendor_settings=vendor_settings)
+        skip_ips = set(journaled_entries)
+
+        if self.prescanner is None:
+            alive_hosts = None
+        else:
+            alive_hosts = self._prescan_devices(devices_ips=devices_ips, skip_ips=skip_ips)
+
+        if self.discovery_cache is None:
+            cached_entries_data = None
+        else:
+            cached_entries_data = self._get_cached_entries_data(devices_ips=devices_ips,
+                                                                alive_hosts=alive_hosts,
+                                                                skip_ips=skip_ips)
+            skip_ips.update(cached_entries_data)
+
+        if self.snmp_prober is None:
+            snmp_system_data = None
+        else:
+            snmp_system_data = self._probe_devices(devices_ips=devices_ips,
+                                                   snmp_comunity_strings=snmp_comunity_strings,
+                                                   alive_hosts=alive_hosts,
+                                                   skip_ips=skip_ips)
+
+        if self.cli_ports_prescanner is None:
+            cli_ports_states = None
+        else:
+            cli_ports_states = self._probe_cli_ports(devices_ips=devices_ips,
+                                                     alive_hosts=alive_hosts,
+                                                     snmp_system_data=snmp_system_data,
+                                                     skip_ips=skip_ips)
+
+        def process_device(report_entry):
+            return self._process_device(report_entry=report_entry,
+                                        snmp_comunity_strings=snmp_comunity_strings,
+                                        vendor_settings=vendor_settings,
+                                        vendor_config=vendor_config,
+                                        alive_hosts=alive_hosts,
+                                        snmp_system_data=snmp_system_data,
+                                        cached_entries_data=cached_entries_data,
+                                        cli_ports_states=cli_ports_states)
+
+        # entries are added to the report in the order of the IPs, so the report stays ordered with any workers
+        try:
+            parallel_pipeline(produce_func=process_device,
+                              consume_func=self._upload_device,
+                              iterable=self._get_entries(devices_ips=devices_ips,
+                                                         journaled_entries=journaled_entries),
+                              producers=self.workers,
+                              consumers=self.upload_workers,
+                              queue_size=self.upload_queue_size)
+        finally:
+            self._close_snmp_community_pool()
+
+        self._wait_for_attributes()
+        self._wait_for_autoload()
+        self._finish_unfinished_entries()
         self.report.generate()
+
+        if self.discovery_journal is not None:
+            self.discovery_journal.close(remove=True)
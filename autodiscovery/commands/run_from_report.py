@@ -15,6 +15,7 @@ class RunFromReportCommand(AbstractRunCommand):
         for parsed_entry in parsed_entries:
             self.logger.info("Uploading device with IP {}".format(parsed_entry.ip))
             self.output.send("Uploading device with IP {}".format(parsed_entry.ip))
+            uploaded = False
             try:
                 with self.report.edit_entry(entry=parsed_entry) as entry:
 
@@ -34,8 +35,9 @@ class RunFromReportCommand(AbstractRunCommand):
                         raise ReportableException("Invalid vendor type '{}'. Possible values are: {}"
                                                   .format(vendor.vendor_type, self.vendor_type_handlers_map.keys()))
 
-                    cs_session = self.cs_session_manager.get_session(cs_domain=entry.domain)
-                    handler.upload(entry=entry,  vendor=vendor, cs_session=cs_session)
+                    with self.cs_session_manager.session(cs_domain=entry.domain) as cs_session:
+                        handler.upload(entry=entry,  vendor=vendor, cs_session=cs_session)
+                        uploaded = True
 
             except Exception:
                 self.output.send("Failed to discover {} device. {}".format(parsed_entry.ip,
@@ -44,5 +46,10 @@ class RunFromReportCommand(AbstractRunCommand):
             else:
                 self.output.send("Device with IP {} was successfully uploaded".format(parsed_entry.ip))
                 self.logger.info("Device with IP {} was successfully uploaded".format(parsed_entry.ip))
+            finally:
+                self._finish_entry(parsed_entry, uploaded=uploaded)
 
+        self._wait_for_attributes()
+        self._wait_for_autoload()
+        self._finish_unfinished_entries()
         self.report.generate()
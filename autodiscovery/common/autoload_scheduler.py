@@ -0,0 +1,99 @@
+import threading
+from multiprocessing.pool import ThreadPool
+
+from autodiscovery.common.utils import wait_async_result
+
+
+class AutoloadScheduler(object):
+    def __init__(self, cs_session_manager, workers, timeout, logger):
+        """Run Autoload for the created CloudShell resources in the background
+
+        Each Autoload takes its own CloudShell API session from the pool, sessions of the upload workers
+        are returned to the pool before the Autoload starts
+
+        :param autodiscovery.common.cs_session_manager.CloudShellSessionManager cs_session_manager:
+        :param int workers: max number of resources that will be autoloaded concurrently
+        :param float timeout: time in seconds to wait for the resource Autoload, waits forever if it is None
+        :param logging.Logger logger:
+        """
+        self.cs_session_manager = cs_session_manager
+        self.workers = workers
+        self.timeout = timeout
+        self.logger = logger
+        self._pool = None
+        self._results = []
+        self._lock = threading.Lock()
+
+    def schedule(self, cs_domain, resource_name, entry):
+        """Add resource to the Autoload queue
+
+        :param str cs_domain: CloudShell domain of the resource
+        :param str resource_name:
+        :param autodiscovery.reports.base.AbstractEntry entry: Entry where the Autoload result will be written
+        :return:
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPool(processes=self.workers)
+
+            self._results.append(self._pool.apply_async(self._autoload, (cs_domain, resource_name, entry)))
+
+    def _autoload(self, cs_domain, resource_name, entry):
+        """Autoload resource and write failed result into the Entry
+
+        CloudShell API call can't be cancelled, so on the timeout the Autoload is left running in the background
+        and its session is returned to the pool only when the call is finished
+
+        :param str cs_domain: CloudShell domain of the resource
+        :param str resource_name:
+        :param autodiscovery.reports.base.AbstractEntry entry:
+        :return: tuple with Entry, resource name and error message or None if Autoload was successful
+        :rtype: (autodiscovery.reports.base.AbstractEntry, str, str)
+        """
+        errors = []
+
+        def autoload():
+            try:
+                with self.cs_session_manager.session(cs_domain=cs_domain) as cs_session:
+                    cs_session.AutoLoad(resource_name)
+            except Exception as e:
+                self.logger.exception("Unable to autoload resource {}".format(resource_name))
+                errors.append(str(e))
+
+        self.logger.info("Autoloading resource {}".format(resource_name))
+        thread = threading.Thread(target=autoload)
+        thread.daemon = True
+        thread.start()
+        thread.join(self.timeout)
+
+        if thread.is_alive():
+            self.logger.warning("Autoload of the resource {} has timed out".format(resource_name))
+            error = "Autoload has timed out after {} seconds".format(self.timeout)
+        elif errors:
+            error = "Autoload has failed: {}".format(errors[0])
+        else:
+            self.logger.info("Resource {} was successfully autoloaded".format(resource_name))
+            return
+
+        entry.status = entry.FAILED_STATUS
+        entry.comment = error
+        return entry, resource_name, error
+
+    def wait(self):
+        """Wait until Autoload of all scheduled resources is finished
+
+        :return: list of tuples with Entry, resource name and error message for each failed Autoload
+        :rtype: list[(autodiscovery.reports.base.AbstractEntry, str, str)]
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+            results, self._results = self._results, []
+
+        if pool is None:
+            return []
+
+        pool.close()
+        failures = [wait_async_result(result) for result in results]
+        pool.join()
+
+        return [failure for failure in failures if failure is not None]
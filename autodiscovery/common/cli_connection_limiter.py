@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+import threading
+
+
+class CLIConnectionLimiter(object):
+    def __init__(self, max_connections, max_device_connections):
+        """Limit number of the CLI connections opened at the same time
+
+        Too many login attempts to the same device can lock the user out, so the number of connections
+        is limited both for all devices and for each device
+
+        :param int max_connections: max number of CLI connections to all devices
+        :param int max_device_connections: max number of CLI connections to one device
+        """
+        self.max_connections = max_connections
+        self.max_device_connections = max_device_connections
+        self._connections = threading.BoundedSemaphore(max_connections)
+        self._device_connections = {}
+        self._lock = threading.Lock()
+
+    def _get_device_connections(self, device_ip):
+        """Get semaphore for the CLI connections to the given device
+
+        :param str device_ip:
+        :rtype: threading.BoundedSemaphore
+        """
+        with self._lock:
+            try:
+                return self._device_connections[device_ip]
+            except KeyError:
+                connections = self._device_connections[device_ip] = threading.BoundedSemaphore(
+                    self.max_device_connections)
+                return connections
+
+    @contextmanager
+    def connection(self, device_ip):
+        """Wait until CLI connection to the given device can be opened
+
+        :param str device_ip:
+        """
+        # device slot is taken first, so the waiting for it doesn't hold a slot for other devices
+        with self._get_device_connections(device_ip):
+            with self._connections:
+                yield
@@ -5,6 +5,7 @@ class ResourceModelsAttributes(object):
     USER = "User"
     PASSWORD = "Password"
     ENABLE_PASSWORD = "Enable Password"
+    SYSTEM_NAME = "System Name"
 
 
 class CloudshellAPIErrorCodes(object):
@@ -14,3 +15,12 @@ class CloudshellAPIErrorCodes(object):
     RESOURCE_ALREADY_EXISTS = "114"
     UNABLE_TO_LOCATE_DRIVER = "129"
     UNABLE_TO_LOCATE_FAMILY_OR_MODEL = "100"  # not a typo, same code as for incorrect login
+
+
+class ExistingResourceActions(object):
+    """Container for the actions on the device that already has a resource with its address on the CloudShell"""
+    CREATE = "create"  # create one more resource with a unique name
+    SKIP = "skip"  # leave the existing resource as is
+    UPDATE = "update"  # update attributes and driver of the existing resource
+
+    ALL = (CREATE, SKIP, UPDATE)
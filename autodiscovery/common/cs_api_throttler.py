@@ -0,0 +1,257 @@
+from __future__ import division
+
+import httplib
+import random
+import socket
+import threading
+import time
+import urllib2
+
+from cloudshell.api.common_cloudshell_api import CloudShellAPIError
+
+
+class TokenBucket(object):
+    def __init__(self, rate, capacity):
+        """Allow operations at the given average rate with bursts up to the bucket capacity
+
+        :param float rate: number of tokens added to the bucket per second
+        :param float capacity: max number of tokens in the bucket
+        """
+        self._rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._updated = time.time()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self):
+        with self._lock:
+            return self._rate
+
+    @rate.setter
+    def rate(self, value):
+        with self._lock:
+            self._refill()
+            self._rate = float(value)
+
+    def update_rate(self, update_func):
+        """Atomically change rate of the bucket
+
+        :param update_func: function that takes the current rate and returns a new one
+        :return:
+        """
+        with self._lock:
+            self._refill()
+            self._rate = float(update_func(self._rate))
+
+    def _refill(self):
+        """Add tokens for the time passed since the last update, should be called under the lock
+
+        :return:
+        """
+        now = time.time()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def acquire(self):
+        """Take one token from the bucket, waits until the token is available
+
+        :return:
+        """
+        while True:
+            with self._lock:
+                self._refill()
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait_time = (1 - self._tokens) / self._rate
+
+            time.sleep(wait_time)
+
+
+class CloudShellAPIMethodStats(object):
+    def __init__(self):
+        """Counters of the CloudShell API calls for one API method"""
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_time = 0.0
+
+    @property
+    def avg_time(self):
+        """Average latency of the API call in seconds
+
+        :rtype: float
+        """
+        if not self.calls:
+            return 0.0
+
+        return self.total_time / self.calls
+
+
+class CloudShellAPIThrottler(object):
+    # network errors that mean the CloudShell server is overloaded or temporarily unavailable
+    RETRYABLE_EXCEPTIONS = (urllib2.URLError, httplib.HTTPException, socket.error)
+    # on the network error the call could be already executed by the server, so only read-only calls are retried,
+    # e.g. retried CreateResource would fail with "resource already exists" and create a duplicate with another name
+    IDEMPOTENT_METHODS = frozenset(["FindResources", "GetFolderContent", "GetResourceDetails", "GetResourceList",
+                                    "GetServerDateAndTime", "Logon"])
+
+    def __init__(self, max_rate, min_rate, retries, backoff, max_backoff, logger, retryable_error_codes=(),
+                 retryable_error_messages=()):
+        """Rate limit, retry and count CloudShell API calls
+
+        Rate starts at the max rate, is halved on each retryable error and is increased back on successful calls
+
+        :param float max_rate: max number of API calls per second
+        :param float min_rate: rate below which API calls aren't slowed down on errors
+        :param int retries: number of retries for the API call that failed with a retryable error
+        :param float backoff: initial delay in seconds before the retry, doubled for each next retry
+        :param float max_backoff: max delay in seconds before the retry
+        :param logging.Logger logger:
+        :param retryable_error_codes: CloudShell API error codes that will be retried
+        :param retryable_error_messages: CloudShell API errors of the read-only calls with these substrings
+            in the message (any case) will be retried
+        """
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.logger = logger
+        self.retryable_error_codes = retryable_error_codes
+        self.retryable_error_messages = [message.lower() for message in retryable_error_messages]
+        self._bucket = TokenBucket(rate=max_rate, capacity=max_rate)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _is_retryable(self, method_name, error):
+        """Check whether failed API call can be retried
+
+        :param str method_name:
+        :param Exception error:
+        :rtype: bool
+        """
+        if isinstance(error, CloudShellAPIError) and error.code in self.retryable_error_codes:
+            return True
+
+        if method_name not in self.IDEMPOTENT_METHODS:
+            return False
+
+        if isinstance(error, CloudShellAPIError):
+            error_message = (error.message or "").lower()
+            return any(message in error_message for message in self.retryable_error_messages)
+
+        if isinstance(error, urllib2.HTTPError):
+            # server errors are retried, client errors will fail the same way again
+            return error.code >= 500
+
+        return isinstance(error, self.RETRYABLE_EXCEPTIONS)
+
+    def _get_backoff(self, attempt):
+        """Get delay before the retry with the full jitter, so retries from all threads are spread in time
+
+        :param int attempt: number of the retry starting from 0
+        :rtype: float
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _update_stats(self, method_name, call_time, error=False, retry=False):
+        """Update counters and rate after the API call
+
+        :param str method_name:
+        :param float call_time: latency of the API call in seconds
+        :param bool error: whether API call has failed
+        :param bool retry: whether API call has failed with a retryable error
+        :return:
+        """
+        with self._lock:
+            stats = self._stats.setdefault(method_name, CloudShellAPIMethodStats())
+            stats.calls += 1
+            stats.total_time += call_time
+
+            if error:
+                stats.errors += 1
+
+            if retry:
+                stats.retries += 1
+
+        if retry:
+            self._bucket.update_rate(lambda rate: max(self.min_rate, rate / 2))
+        elif not error:
+            self._bucket.update_rate(lambda rate: min(self.max_rate, rate + 1))
+
+    def call(self, method_name, func, *args, **kwargs):
+        """Call CloudShell API method within the rate limit and retry it on the retryable errors
+
+        :param str method_name: name of the API method for the counters
+        :param func: API method
+        :return: result of the API method
+        """
+        attempt = 0
+
+        while True:
+            self._bucket.acquire()
+            start_time = time.time()
+
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                retry = attempt < self.retries and self._is_retryable(method_name=method_name, error=e)
+                self._update_stats(method_name=method_name,
+                                   call_time=time.time() - start_time,
+                                   error=True,
+                                   retry=retry)
+                if not retry:
+                    raise
+
+                backoff = self._get_backoff(attempt)
+                self.logger.warning("CloudShell API call {} has failed, retrying in {:.2f} seconds"
+                                    .format(method_name, backoff), exc_info=True)
+                time.sleep(backoff)
+                attempt += 1
+            else:
+                self._update_stats(method_name=method_name, call_time=time.time() - start_time)
+                return result
+
+    def get_stats(self):
+        """Get counters of the CloudShell API calls
+
+        :return: dictionary {API method name: CloudShellAPIMethodStats}
+        :rtype: dict
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def log_stats(self):
+        """Write counters of the CloudShell API calls into the logs
+
+        :return:
+        """
+        for method_name, stats in sorted(self.get_stats().iteritems()):
+            self.logger.info("CloudShell API {}: {} calls, {} errors, {} retries, {:.3f} seconds average latency"
+                             .format(method_name, stats.calls, stats.errors, stats.retries, stats.avg_time))
+
+
+class ThrottledCloudShellSession(object):
+    def __init__(self, cs_session, throttler):
+        """CloudShell API session which API calls go through the throttler
+
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
+        :param CloudShellAPIThrottler throttler:
+        """
+        self._cs_session = cs_session
+        self._throttler = throttler
+
+    def __getattr__(self, name):
+        attr = getattr(self._cs_session, name)
+
+        if not callable(attr):
+            return attr
+
+        def throttled_call(*args, **kwargs):
+            return self._throttler.call(name, attr, *args, **kwargs)
+
+        return throttled_call
@@ -0,0 +1,152 @@
+import threading
+
+from autodiscovery import config
+
+
+class CloudShellAttributesBatcher(object):
+    def __init__(self, cs_session_manager, batch_size, flush_interval, logger):
+        """Set attributes of many resources with a single SetAttributesValues API call
+
+        Attributes updates are collected per CloudShell domain and sent when the batch is full or when
+        the flush interval has passed since the first update in the batch
+
+        :param autodiscovery.common.cs_session_manager.CloudShellSessionManager cs_session_manager:
+        :param int batch_size: max number of resources in one API call
+        :param float flush_interval: max time in seconds the attributes update waits in the batch
+        :param logging.Logger logger:
+        """
+        self.cs_session_manager = cs_session_manager
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.logger = logger
+        self._batches = {}
+        self._timers = {}
+        self._in_flight = 0
+        self._failures = []
+        self._condition = threading.Condition()
+
+    def add(self, cs_domain, request, entry, on_success=None):
+        """Add resource attributes update to the batch
+
+        :param str cs_domain: CloudShell domain of the resource
+        :param cloudshell.api.cloudshell_api.ResourceAttributesUpdateRequest request:
+        :param autodiscovery.reports.base.AbstractEntry entry: Entry where the failed update will be written
+        :param on_success: function that will be called after the attributes are set
+        :return:
+        """
+        with self._condition:
+            batch = self._batches.setdefault(cs_domain, [])
+            batch.append((request, entry, on_success))
+
+            if len(batch) >= self.batch_size:
+                batch = self._take_batch(cs_domain)
+            else:
+                if len(batch) == 1:
+                    timer = threading.Timer(self.flush_interval, self._flush_expired, (cs_domain,))
+                    timer.daemon = True
+                    timer.start()
+                    self._timers[cs_domain] = timer
+                batch = None
+
+        if batch:
+            self._flush(cs_domain=cs_domain, batch=batch)
+
+    def _take_batch(self, cs_domain):
+        """Remove batch for the given domain so it can be sent, should be called under the lock
+
+        :param str cs_domain:
+        :rtype: list[tuple]
+        """
+        timer = self._timers.pop(cs_domain, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self._batches.pop(cs_domain, [])
+        if batch:
+            self._in_flight += 1
+
+        return batch
+
+    def _flush_expired(self, cs_domain):
+        """Send batch that waited for the flush interval
+
+        :param str cs_domain:
+        :return:
+        """
+        with self._condition:
+            batch = self._take_batch(cs_domain)
+
+        if batch:
+            self._flush(cs_domain=cs_domain, batch=batch)
+
+    def _flush(self, cs_domain, batch):
+        """Send batch taken with the _take_batch method
+
+        :param str cs_domain:
+        :param list[tuple] batch:
+        :return:
+        """
+        try:
+            self._send_batch(cs_domain=cs_domain, batch=batch)
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def _send_batch(self, cs_domain, batch):
+        """Set attributes for all resources in the batch
+
+        API call doesn't tell which resource has failed, so on the error each update is sent separately
+
+        :param str cs_domain:
+        :param list[tuple] batch: list of tuples with update request, Entry and success callback
+        :return:
+        """
+        self.logger.info("Setting attributes for {} resources".format(len(batch)))
+
+        try:
+            with self.cs_session_manager.session(cs_domain=cs_domain) as cs_session:
+                cs_session.SetAttributesValues([request for request, _, _ in batch])
+        except Exception as e:
+            if len(batch) > 1:
+                self.logger.warning("Unable to set attributes for {} resources, setting them one by one"
+                                    .format(len(batch)), exc_info=True)
+                for update in batch:
+                    self._send_batch(cs_domain=cs_domain, batch=[update])
+                return
+
+            request, entry, _ = batch[0]
+            self.logger.exception("Unable to set attributes for the resource {}".format(request.ResourceFullName))
+            error = "Unable to set attributes: {}".format(e)
+            entry.status = entry.FAILED_STATUS
+            entry.comment = error
+
+            with self._condition:
+                self._failures.append((entry, request.ResourceFullName, error))
+            return
+
+        for _, _, on_success in batch:
+            if on_success is not None:
+                on_success()
+
+    def wait(self):
+        """Send all collected updates and wait until all batches are sent
+
+        :return: list of tuples with Entry, resource name and error message for each failed update
+        :rtype: list[(autodiscovery.reports.base.AbstractEntry, str, str)]
+        """
+        with self._condition:
+            batches = [(cs_domain, self._take_batch(cs_domain)) for cs_domain in self._batches.keys()]
+
+        for cs_domain, batch in batches:
+            if batch:
+                self._flush(cs_domain=cs_domain, batch=batch)
+
+        with self._condition:
+            while self._in_flight:
+                # wait with timeout, so it can be interrupted with Ctrl-C
+                self._condition.wait(config.INTERRUPTIBLE_WAIT_INTERVAL)
+
+            failures, self._failures = self._failures, []
+
+        return failures
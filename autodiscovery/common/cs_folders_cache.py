@@ -0,0 +1,44 @@
+import threading
+
+
+class CloudShellFoldersCache(object):
+    FOLDERS_SEPARATOR = "/"
+
+    def __init__(self):
+        """Folders that were already created on the CloudShell during the run
+
+        Folders are cached per CloudShell domain, so sessions of the same domain share them
+        """
+        self._created_folders = set()
+        self._folder_locks = {}
+        self._lock = threading.Lock()
+
+    def _get_folder_lock(self, key):
+        """Get lock for the folder creation, so the same folder isn't created by several threads
+
+        :param tuple key: (CloudShell domain ID, folder path)
+        :rtype: threading.Lock
+        """
+        with self._lock:
+            return self._folder_locks.setdefault(key, threading.Lock())
+
+    def create_folder(self, cs_session, folder_path):
+        """Create folder on the CloudShell if it wasn't created in the current run
+
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
+        :param str folder_path: full path to the folder ("Root Folder/Sub Folder")
+        :return:
+        """
+        key = (cs_session.domain, folder_path)
+
+        with self._get_folder_lock(key):
+            if key in self._created_folders:
+                return
+
+            cs_session.CreateFolder(folderFullPath=folder_path)
+
+            # CloudShell creates all parent folders as well
+            folder_names = folder_path.split(self.FOLDERS_SEPARATOR)
+            with self._lock:
+                for index in xrange(1, len(folder_names) + 1):
+                    self._created_folders.add((cs_session.domain, self.FOLDERS_SEPARATOR.join(folder_names[:index])))
@@ -0,0 +1,40 @@
+import threading
+
+
+class CloudShellResourcesDetailsCache(object):
+    def __init__(self):
+        """Details of the CloudShell resources with their attributes and child resources
+
+        Details of each resource are loaded with a single API call per CloudShell domain
+        and reused by all next lookups of the same resource
+        """
+        self._details = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _get_key_lock(self, key):
+        """Get lock for the resource details loading, so details aren't loaded by several threads
+
+        :param tuple key:
+        :rtype: threading.Lock
+        """
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get_resource_details(self, cs_session, resource_name):
+        """Get resource details from the cache or load them from the CloudShell
+
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
+        :param str resource_name:
+        :rtype: cloudshell.api.cloudshell_api.ResourceInfo
+        """
+        key = (cs_session.domain, resource_name)
+
+        with self._get_key_lock(key):
+            if key not in self._details:
+                details = cs_session.GetResourceDetails(resource_name)
+
+                with self._lock:
+                    self._details[key] = details
+
+            return self._details[key]
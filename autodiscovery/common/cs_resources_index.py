@@ -0,0 +1,135 @@
+import threading
+
+
+class CloudShellResource(object):
+    def __init__(self, name, address, family, model):
+        """Resource that exists on the CloudShell
+
+        :param str name:
+        :param str address:
+        :param str family:
+        :param str model:
+        """
+        self.name = name
+        self.address = address
+        self.family = family
+        self.model = model
+
+
+class CloudShellResourcesIndex(object):
+    NAME_SUFFIX_TPL = "{}-{}"
+
+    def __init__(self, logger):
+        """Names and addresses of the root resources that exist on the CloudShell
+
+        Resources are loaded with a single API call per CloudShell domain on the first use,
+        so unique resource names are picked locally instead of the failed CreateResource calls
+
+        :param logging.Logger logger:
+        """
+        self.logger = logger
+        self._names = {}
+        self._addresses = {}
+        self._lock = threading.Lock()
+        self._domain_locks = {}
+
+    def _get_domain_lock(self, cs_domain):
+        """Get lock for the resources loading, so resources aren't loaded by several threads
+
+        :param str cs_domain: CloudShell domain ID
+        :rtype: threading.Lock
+        """
+        with self._lock:
+            return self._domain_locks.setdefault(cs_domain, threading.Lock())
+
+    def _load_resources(self, cs_session):
+        """Load all root resources from the CloudShell if they weren't loaded yet
+
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
+        :return:
+        """
+        with self._get_domain_lock(cs_session.domain):
+            if cs_session.domain in self._names:
+                return
+
+            self.logger.info("Loading existing resources from the CloudShell")
+            names = set()
+            addresses = {}
+
+            for resource in cs_session.GetResourceList().Resources:
+                names.add(resource.Name.lower())
+                # sub-resources (ports, modules, etc.) have addresses relative to their root resource
+                if resource.FullAddress == resource.Address:
+                    addresses.setdefault(resource.Address, CloudShellResource(name=resource.Name,
+                                                                              address=resource.Address,
+                                                                              family=resource.ResourceFamilyName,
+                                                                              model=resource.ResourceModelName))
+
+            self.logger.info("Loaded {} existing resources from the CloudShell".format(len(names)))
+
+            with self._lock:
+                self._addresses[cs_session.domain] = addresses
+                self._names[cs_session.domain] = names
+
+    def get_resource_by_address(self, cs_session, address):
+        """Get root resource with the given address
+
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
+        :param str address:
+        :rtype: CloudShellResource
+        """
+        self._load_resources(cs_session)
+
+        with self._lock:
+            return self._addresses[cs_session.domain].get(address)
+
+    def reserve_name(self, cs_session, resource_name):
+        """Get unique name for the new resource and mark it as taken
+
+        Suffix "-1", "-2", etc. is added to the given name if it is already taken
+
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
+        :param str resource_name:
+        :rtype: str
+        """
+        self._load_resources(cs_session)
+
+        with self._lock:
+            names = self._names[cs_session.domain]
+            unique_name = resource_name
+            suffix = 0
+
+            while unique_name.lower() in names:
+                suffix += 1
+                unique_name = self.NAME_SUFFIX_TPL.format(resource_name, suffix)
+
+            names.add(unique_name.lower())
+
+        return unique_name
+
+    def release_name(self, cs_session, resource_name):
+        """Mark name as free if the resource with this name wasn't created
+
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
+        :param str resource_name:
+        :return:
+        """
+        with self._lock:
+            self._names.get(cs_session.domain, set()).discard(resource_name.lower())
+
+    def add_resource(self, cs_session, resource_name, address, family, model):
+        """Add created resource to the index
+
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
+        :param str resource_name:
+        :param str address:
+        :param str family:
+        :param str model:
+        :return:
+        """
+        with self._lock:
+            self._names[cs_session.domain].add(resource_name.lower())
+            self._addresses[cs_session.domain].setdefault(address, CloudShellResource(name=resource_name,
+                                                                                       address=address,
+                                                                                       family=family,
+                                                                                       model=model))
@@ -1,36 +1,64 @@
+from contextlib import contextmanager
+import threading
+import time
+
 from cloudshell.api.cloudshell_api import CloudShellAPISession
 from cloudshell.api.common_cloudshell_api import CloudShellAPIError
 
+from autodiscovery import config
 from autodiscovery.common.consts import CloudshellAPIErrorCodes
+from autodiscovery.common.cs_api_throttler import ThrottledCloudShellSession
 from autodiscovery.exceptions import AutoDiscoveryException
 
 
 class CloudShellSessionManager(object):
-    def __init__(self, cs_ip, cs_user, cs_password, logger):
-        """
+    def __init__(self, cs_ip, cs_user, cs_password, logger, max_sessions=config.CS_MAX_SESSIONS,
+                 health_check_interval=config.CS_SESSION_HEALTH_CHECK_INTERVAL, api_throttler=None):
+        """Pool of the CloudShell API sessions per domain
+
+        Sessions are created on demand up to the max number of sessions per domain,
+        session that was idle for too long is checked and logged in again if it is no longer valid
 
         :param str cs_ip:
         :param str cs_user:
         :param str cs_password:
         :param logging.Logger logger:
+        :param int max_sessions: max number of sessions per domain
+        :param float health_check_interval: time in seconds after which idle session is checked before the reuse
+        :param autodiscovery.common.cs_api_throttler.CloudShellAPIThrottler api_throttler: rate limits and retries
+            API calls of all sessions, API calls are sent as is if it is None
         """
         self._cs_ip = cs_ip
         self._cs_user = cs_user
         self._cs_password = cs_password
         self._logger = logger
-        self._cs_sessions = {}
+        self._max_sessions = max_sessions
+        self._health_check_interval = health_check_interval
+        self._api_throttler = api_throttler
+        self._idle_sessions = {}
+        self._sessions_count = {}
+        self._condition = threading.Condition()
 
     def _init_cs_session(self, cs_domain):
         """Initialize CloudShell session
 
         :param str cs_domain:
-        :rtype: CloudShellAPISession
+        :rtype: CloudShellAPISession | ThrottledCloudShellSession
         """
         try:
-            cs_session = CloudShellAPISession(host=self._cs_ip,
-                                              username=self._cs_user,
-                                              password=self._cs_password,
-                                              domain=cs_domain)
+            if self._api_throttler is None:
+                cs_session = CloudShellAPISession(host=self._cs_ip,
+                                                  username=self._cs_user,
+                                                  password=self._cs_password,
+                                                  domain=cs_domain)
+            else:
+                # login is rate limited and retried as any other API call
+                cs_session = self._api_throttler.call("Logon",
+                                                      CloudShellAPISession,
+                                                      host=self._cs_ip,
+                                                      username=self._cs_user,
+                                                      password=self._cs_password,
+                                                      domain=cs_domain)
         except CloudShellAPIError as e:
             if e.code in (CloudshellAPIErrorCodes.INCORRECT_LOGIN, CloudshellAPIErrorCodes.INCORRECT_PASSWORD):
                 self._logger.exception("Unable to login to the CloudShell API")
@@ -40,15 +68,87 @@ class CloudShellSessionManager(object):
             self._logger.exception("Unable to connect to the CloudShell API")
             raise AutoDiscoveryException("CloudShell server is unreachable")
 
+        if self._api_throttler is not None:
+            cs_session = ThrottledCloudShellSession(cs_session=cs_session, throttler=self._api_throttler)
+
         return cs_session
 
-    def get_session(self, cs_domain):
+    def _is_session_alive(self, cs_session):
+        """Check whether CloudShell session is still valid (token hasn't expired, etc.)
+
+        :param CloudShellAPISession cs_session:
+        :rtype: bool
         """
+        try:
+            cs_session.GetServerDateAndTime()
+        except Exception:
+            self._logger.warning("CloudShell session is no longer valid", exc_info=True)
+            return False
+
+        return True
+
+    def _checkout_session(self, cs_domain):
+        """Take idle session from the pool or create a new one, waits if all sessions are in use
+
+        :param str cs_domain:
+        :rtype: CloudShellAPISession
+        """
+        with self._condition:
+            idle_sessions = self._idle_sessions.setdefault(cs_domain, [])
+
+            while not idle_sessions and self._sessions_count.get(cs_domain, 0) >= self._max_sessions:
+                self._condition.wait()
+
+            if idle_sessions:
+                cs_session, last_used = idle_sessions.pop()
+            else:
+                self._sessions_count[cs_domain] = self._sessions_count.get(cs_domain, 0) + 1
+                cs_session = last_used = None
+
+        try:
+            if cs_session is None:
+                cs_session = self._init_cs_session(cs_domain=cs_domain)
+
+            elif time.time() - last_used > self._health_check_interval and not self._is_session_alive(cs_session):
+                self._logger.info("Logging in to the CloudShell domain {} again".format(cs_domain))
+                cs_session = self._init_cs_session(cs_domain=cs_domain)
+        except Exception:
+            with self._condition:
+                self._sessions_count[cs_domain] -= 1
+                self._condition.notify()
+            raise
+
+        return cs_session
+
+    def _return_session(self, cs_domain, cs_session):
+        """Return session to the pool, so it can be reused by other threads
+
+        :param str cs_domain:
+        :param CloudShellAPISession cs_session:
+        :return:
+        """
+        with self._condition:
+            self._idle_sessions[cs_domain].append((cs_session, time.time()))
+            self._condition.notify()
+
+    def log_api_stats(self):
+        """Write counters of the CloudShell API calls into the logs
 
-        :param str cs_domain: CloudShell Domain
         :return:
         """
-        if cs_domain not in self._cs_sessions:
-            self._cs_sessions[cs_domain] = self._init_cs_session(cs_domain=cs_domain)
+        if self._api_throttler is not None:
+            self._api_throttler.log_stats()
 
-        return self._cs_sessions[cs_domain]
+    @contextmanager
+    def session(self, cs_domain):
+        """Get CloudShell session for the domain for the exclusive use within the context
+
+        :param str cs_domain: CloudShell Domain
+        :rtype: CloudShellAPISession
+        """
+        cs_session = self._checkout_session(cs_domain=cs_domain)
+
+        try:
+            yield cs_session
+        finally:
+            self._return_session(cs_domain=cs_domain, cs_session=cs_session)
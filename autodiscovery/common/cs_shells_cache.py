@@ -0,0 +1,55 @@
+import threading
+
+
+class CloudShellShellsCache(object):
+    def __init__(self):
+        """Resource models and drivers that are missing on the CloudShell
+
+        Missing shells are learned from the failed API calls, so devices of the same model
+        don't repeat the same failed calls during the run. Shells are cached per CloudShell domain
+        """
+        self._missing_models = set()
+        self._missing_drivers = set()
+        self._lock = threading.Lock()
+
+    def is_model_missing(self, cs_session, resource_family, resource_model):
+        """Check whether resource family/model was already found missing on the CloudShell
+
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
+        :param str resource_family:
+        :param str resource_model:
+        :rtype: bool
+        """
+        with self._lock:
+            return (cs_session.domain, resource_family, resource_model) in self._missing_models
+
+    def add_missing_model(self, cs_session, resource_family, resource_model):
+        """Remember that resource family/model is missing on the CloudShell
+
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
+        :param str resource_family:
+        :param str resource_model:
+        :return:
+        """
+        with self._lock:
+            self._missing_models.add((cs_session.domain, resource_family, resource_model))
+
+    def is_driver_missing(self, cs_session, driver_name):
+        """Check whether driver was already found missing on the CloudShell
+
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
+        :param str driver_name:
+        :rtype: bool
+        """
+        with self._lock:
+            return (cs_session.domain, driver_name) in self._missing_drivers
+
+    def add_missing_driver(self, cs_session, driver_name):
+        """Remember that driver is missing on the CloudShell
+
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
+        :param str driver_name:
+        :return:
+        """
+        with self._lock:
+            self._missing_drivers.add((cs_session.domain, driver_name))
@@ -0,0 +1,79 @@
+import threading
+
+from cloudshell.api.cloudshell_api import AttributeNameValue
+
+from autodiscovery.common.consts import ResourceModelsAttributes
+
+
+class CloudShellSystemNamesIndex(object):
+    def __init__(self, logger):
+        """Root resources on the CloudShell found by the "System Name" attribute
+
+        CloudShell API doesn't return attribute values of all resources at once, so resources families
+        are loaded with a single API call per CloudShell domain and each System Name is searched only once
+        per domain, all next lookups of the same System Name are taken from the index
+
+        :param logging.Logger logger:
+        """
+        self.logger = logger
+        self._families = {}
+        self._resources = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _get_key_lock(self, key):
+        """Get lock for the data loading, so the same data isn't loaded by several threads
+
+        :param tuple key:
+        :rtype: threading.Lock
+        """
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _get_families(self, cs_session):
+        """Get families of all root resources in the CloudShell domain
+
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
+        :rtype: list[str]
+        """
+        with self._get_key_lock(("families", cs_session.domain)):
+            if cs_session.domain not in self._families:
+                self.logger.info("Loading resources families from the CloudShell")
+                families = set(resource.ResourceFamilyName for resource in cs_session.GetResourceList().Resources)
+
+                with self._lock:
+                    self._families[cs_session.domain] = sorted(families)
+
+            return self._families[cs_session.domain]
+
+    def find_resources(self, cs_session, sys_name):
+        """Get full names of the root resources with the given "System Name" attribute
+
+        2nd generation shells have the attribute with the family prefix, so it is searched in each family
+
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
+        :param str sys_name:
+        :rtype: list[str]
+        """
+        key = (cs_session.domain, sys_name)
+
+        with self._get_key_lock(key):
+            if key not in self._resources:
+                resources = []
+                sys_attrs = [("", ResourceModelsAttributes.SYSTEM_NAME)] + [
+                    (family, "{}.{}".format(family, ResourceModelsAttributes.SYSTEM_NAME))
+                    for family in self._get_families(cs_session)]
+
+                for family, sys_attr in sys_attrs:
+                    for resource in cs_session.FindResources(
+                            resourceFamily=family,
+                            includeSubResources=False,
+                            attributeValues=[AttributeNameValue(Name=sys_attr, Value=sys_name)]).Resources:
+                        # response may contain an empty result
+                        if resource.ResourceFamilyName and resource.FullName not in resources:
+                            resources.append(resource.FullName)
+
+                with self._lock:
+                    self._resources[key] = resources
+
+            return list(self._resources[key])
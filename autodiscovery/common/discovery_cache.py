@@ -0,0 +1,104 @@
+import itertools
+import json
+import sqlite3
+import threading
+import time
+
+from autodiscovery import config
+from autodiscovery.common.consts import ResourceModelsAttributes
+
+
+class DiscoveryCache(object):
+    FIELDS = ("ip", "sys_object_id", "description", "snmp_community", "vendor", "device_name", "model_type",
+              "folder_path", "attributes", "updated")
+    # values of these attributes aren't stored, they are resolved again from the input file by the cached user name
+    SECRET_ATTRIBUTES = (ResourceModelsAttributes.PASSWORD, ResourceModelsAttributes.ENABLE_PASSWORD)
+
+    def __init__(self, file_path, ttl, logger, query_chunk_size=config.DISCOVERY_CACHE_QUERY_CHUNK_SIZE):
+        """On-disk cache of the discovered devices stored in the SQLite database
+
+        :param str file_path: path to the SQLite database file
+        :param int ttl: time in seconds after which cached device will be discovered again
+        :param logging.Logger logger:
+        :param int query_chunk_size: max number of IPs requested from the database in one query
+        """
+        self.file_path = file_path
+        self.ttl = ttl
+        self.logger = logger
+        self.query_chunk_size = query_chunk_size
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(file_path, check_same_thread=False)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS devices ("
+                                 "ip TEXT PRIMARY KEY, "
+                                 "sys_object_id TEXT, "
+                                 "description TEXT, "
+                                 "snmp_community TEXT, "
+                                 "vendor TEXT, "
+                                 "device_name TEXT, "
+                                 "model_type TEXT, "
+                                 "folder_path TEXT, "
+                                 "attributes TEXT, "
+                                 "updated REAL)")
+        self._connection.commit()
+
+    def get_entries_data(self, ips):
+        """Get cached data for the given devices that is not expired
+
+        Devices are requested by the IP in chunks, so only the given devices are read from the database
+
+        :param collections.Iterable[str] ips:
+        :return: dictionary {IP: {Entry attribute name: value}}
+        :rtype: dict
+        """
+        ips = iter(ips)
+        min_updated = time.time() - self.ttl
+        entries_data = {}
+
+        while True:
+            ips_chunk = list(itertools.islice(ips, self.query_chunk_size))
+            if not ips_chunk:
+                break
+
+            with self._lock:
+                rows = self._connection.execute("SELECT {} FROM devices WHERE updated >= ? AND ip IN ({})".format(
+                    ", ".join(self.FIELDS), ", ".join("?" * len(ips_chunk))), [min_updated] + ips_chunk).fetchall()
+
+            for row in rows:
+                entry_data = dict(zip(self.FIELDS, row))
+                del entry_data["updated"]
+                entry_data["attributes"] = json.loads(entry_data["attributes"])
+                entries_data[entry_data["ip"]] = entry_data
+
+        return entries_data
+
+    def save_entry(self, entry):
+        """Save discovered device into the cache
+
+        Values of the secret attributes (passwords) are replaced with None
+
+        :param autodiscovery.reports.discovery.base.Entry entry:
+        :return:
+        """
+        attributes = {name: None if name in self.SECRET_ATTRIBUTES else value
+                      for name, value in entry.attributes.iteritems()}
+        values = [getattr(entry, field) for field in self.FIELDS[:-2]] + [json.dumps(attributes), time.time()]
+
+        with self._lock:
+            self._connection.execute("INSERT OR REPLACE INTO devices ({}) VALUES ({})".format(
+                ", ".join(self.FIELDS), ", ".join("?" * len(self.FIELDS))), values)
+            self._connection.commit()
+
+    def invalidate(self, ips=None):
+        """Remove given devices from the cache
+
+        :param list[str] ips: IPs of devices to remove, all devices will be removed if it is None
+        :return:
+        """
+        self.logger.info("Removing devices {} from the discovery cache".format("all" if ips is None else list(ips)))
+
+        with self._lock:
+            if ips is None:
+                self._connection.execute("DELETE FROM devices")
+            else:
+                self._connection.executemany("DELETE FROM devices WHERE ip = ?", ((ip,) for ip in ips))
+            self._connection.commit()
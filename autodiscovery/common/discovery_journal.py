@@ -0,0 +1,106 @@
+import json
+import os
+import threading
+
+from autodiscovery.common.discovery_cache import DiscoveryCache
+
+
+class DiscoveryJournal(object):
+    FIELDS = ("ip", "domain", "status", "comment", "vendor", "sys_object_id", "description", "snmp_community",
+              "model_type", "device_name", "folder_path", "attributes")
+    # values of these attributes aren't stored, they are resolved again from the input file on the resume
+    SECRET_ATTRIBUTES = DiscoveryCache.SECRET_ATTRIBUTES
+
+    def __init__(self, file_path, logger):
+        """Append-only file with devices finished during the discovery run, so the interrupted run can be resumed
+
+        Each finished device is written as a JSON line and flushed right away
+
+        :param str file_path:
+        :param logging.Logger logger:
+        """
+        self.file_path = file_path
+        self.logger = logger
+        self._file = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Get devices finished by the previous run
+
+        Broken lines (the last one can be written only partially if the process was killed) are skipped
+
+        :return: dictionary {IP: {Entry attribute name: value}}, the last record is used for the repeated IP
+        :rtype: dict
+        """
+        entries_data = {}
+
+        if not os.path.exists(self.file_path):
+            return entries_data
+
+        with open(self.file_path) as journal_file:
+            for line_num, line in enumerate(journal_file, start=1):
+                try:
+                    entry_data = json.loads(line)
+                except ValueError:
+                    self.logger.warning("Skipping broken line {} of the discovery journal {}".format(line_num,
+                                                                                                    self.file_path))
+                    continue
+
+                entries_data[entry_data["ip"]] = entry_data
+
+        return entries_data
+
+    def start(self, resume=False):
+        """Open the journal for the new records
+
+        :param bool resume: whether to keep devices recorded by the previous run, they are removed otherwise
+        :return:
+        """
+        if not resume:
+            self._file = open(self.file_path, "w")
+            return
+
+        broken_line = False
+
+        if os.path.exists(self.file_path):
+            with open(self.file_path, "rb") as journal_file:
+                journal_file.seek(0, os.SEEK_END)
+                if journal_file.tell():
+                    journal_file.seek(-1, os.SEEK_END)
+                    broken_line = journal_file.read(1) != "\n"
+
+        self._file = open(self.file_path, "a")
+
+        # next record shouldn't be written on the same line with the partially written one
+        if broken_line:
+            self._file.write("\n")
+
+    def record(self, entry):
+        """Write finished device into the journal
+
+        Values of the secret attributes (passwords) are replaced with None
+
+        :param autodiscovery.reports.discovery.base.Entry entry:
+        :return:
+        """
+        entry_data = {field: getattr(entry, field) for field in self.FIELDS}
+        entry_data["attributes"] = {name: None if name in self.SECRET_ATTRIBUTES else value
+                                    for name, value in entry.attributes.iteritems()}
+
+        with self._lock:
+            self._file.write(json.dumps(entry_data) + "\n")
+            self._file.flush()
+
+    def close(self, remove=False):
+        """Close the journal
+
+        :param bool remove: whether to remove the journal file, e.g. when the run was finished
+        :return:
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+            if remove and os.path.exists(self.file_path):
+                os.remove(self.file_path)
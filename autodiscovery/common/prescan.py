@@ -0,0 +1,130 @@
+import errno
+import select
+import socket
+import time
+
+from autodiscovery.common.utils import parallel_imap
+
+
+class PortState(object):
+    """Container for the TCP port states"""
+    OPEN = "open"
+    CLOSED = "closed"  # host has answered with the TCP reset, so it is alive
+    FILTERED = "filtered"
+
+
+class PreScanner(object):
+    CONNECT_IN_PROGRESS_ERRORS = (0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY)
+    CONNECTION_REFUSED_ERRORS = (errno.ECONNREFUSED, errno.ECONNRESET)
+
+    def __init__(self, ports, timeout, workers, logger):
+        """
+
+        :param list[int] ports: TCP ports that will be probed on each host
+        :param float timeout: time in seconds to wait for the hosts answer
+        :param int workers: number of hosts that will be probed concurrently
+        :param logging.Logger logger:
+        """
+        self.ports = ports
+        self.timeout = timeout
+        self.workers = workers
+        self.logger = logger
+
+    def _get_socket_error(self, sock):
+        """
+
+        :param socket.socket sock:
+        :rtype: int
+        """
+        return sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+
+    def probe(self, ip):
+        """Connect to all ports of the host simultaneously and get their states
+
+        :param str ip: IP address of the host
+        :return: dictionary {port: port state}
+        :rtype: dict
+        """
+        ports_states = {port: PortState.FILTERED for port in self.ports}
+        sockets = {}
+
+        try:
+            for port in self.ports:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setblocking(0)
+                error = sock.connect_ex((ip, port))
+
+                if error in self.CONNECT_IN_PROGRESS_ERRORS:
+                    sockets[sock] = port
+                else:
+                    sock.close()
+                    if error in self.CONNECTION_REFUSED_ERRORS:
+                        ports_states[port] = PortState.CLOSED
+
+            pending_sockets = dict(sockets)
+            deadline = time.time() + self.timeout
+
+            while pending_sockets:
+                remaining_time = deadline - time.time()
+                if remaining_time <= 0:
+                    break
+
+                _, writable, exceptional = select.select([],
+                                                         pending_sockets.keys(),
+                                                         pending_sockets.keys(),
+                                                         remaining_time)
+
+                for sock in set(writable) | set(exceptional):
+                    port = pending_sockets.pop(sock)
+                    error = self._get_socket_error(sock)
+
+                    if error == 0:
+                        ports_states[port] = PortState.OPEN
+                    elif error in self.CONNECTION_REFUSED_ERRORS:
+                        ports_states[port] = PortState.CLOSED
+
+        except (socket.error, select.error):
+            self.logger.debug("Unable to probe ports on the host {}".format(ip), exc_info=True)
+
+        finally:
+            for sock in sockets:
+                sock.close()
+
+        return ports_states
+
+    def is_alive(self, ports_states):
+        """Check if host has answered on any of the probed ports
+
+        :param dict ports_states: dictionary {port: port state}
+        :rtype: bool
+        """
+        return any(state != PortState.FILTERED for state in ports_states.itervalues())
+
+    def probe_hosts(self, ips):
+        """Probe all given hosts concurrently
+
+        :param collections.Iterable[str] ips:
+        :return: dictionary {IP: {port: port state}} for all hosts
+        :rtype: dict
+        """
+        def probe_host(ip):
+            return ip, self.probe(ip)
+
+        return dict(parallel_imap(probe_host, ips, workers=self.workers))
+
+    def find_alive_hosts(self, ips):
+        """Probe all given hosts concurrently and return only alive ones
+
+        :param collections.Iterable[str] ips:
+        :return: dictionary {IP: {port: port state}} for all alive hosts
+        :rtype: dict
+        """
+        alive_hosts = {}
+
+        for ip, ports_states in self.probe_hosts(ips).iteritems():
+            if self.is_alive(ports_states):
+                alive_hosts[ip] = ports_states
+            else:
+                self.logger.info("Host {} doesn't answer on any of the ports {}".format(ip, self.ports))
+
+        return alive_hosts
@@ -0,0 +1,45 @@
+import threading
+
+from ipaddress import ip_address
+
+
+class SNMPCommunityCache(object):
+    def __init__(self, prefix_length):
+        """Valid SNMP community strings learned per subnet
+
+        Devices in the same subnet usually share the same community string, so the community string
+        that was valid for the neighbour device is tried first
+
+        :param int prefix_length: length of the subnet prefix (24 for the /24 subnet)
+        """
+        self.prefix_length = prefix_length
+        self._communities = {}
+        self._lock = threading.Lock()
+
+    def _get_subnet(self, device_ip):
+        """Get subnet key for the given IP
+
+        :param str device_ip:
+        :rtype: int
+        """
+        address = ip_address(unicode(device_ip))
+        return int(address) >> (address.max_prefixlen - self.prefix_length)
+
+    def get(self, device_ip):
+        """Get community string that was valid for other devices from the same subnet
+
+        :param str device_ip:
+        :rtype: str
+        """
+        with self._lock:
+            return self._communities.get(self._get_subnet(device_ip))
+
+    def learn(self, device_ip, snmp_community):
+        """Remember valid community string for the subnet of the given device
+
+        :param str device_ip:
+        :param str snmp_community:
+        :return:
+        """
+        with self._lock:
+            self._communities[self._get_subnet(device_ip)] = snmp_community
@@ -0,0 +1,157 @@
+from pysnmp.hlapi.asyncore import CommunityData
+from pysnmp.hlapi.asyncore import ContextData
+from pysnmp.hlapi.asyncore import ObjectIdentity
+from pysnmp.hlapi.asyncore import ObjectType
+from pysnmp.hlapi.asyncore import SnmpEngine
+from pysnmp.hlapi.asyncore import UdpTransportTarget
+from pysnmp.hlapi.asyncore import getCmd
+from pysnmp.proto.rfc1905 import EndOfMibView
+from pysnmp.proto.rfc1905 import NoSuchInstance
+from pysnmp.proto.rfc1905 import NoSuchObject
+
+
+class SNMPSystemInfo(object):
+    def __init__(self, snmp_community, sys_object_id, description, sys_name):
+        """System information of the device from the SNMPv2-MIB
+
+        :param str snmp_community: valid SNMP read community string
+        :param str sys_object_id:
+        :param str description:
+        :param str sys_name:
+        """
+        self.snmp_community = snmp_community
+        self.sys_object_id = sys_object_id
+        self.description = description
+        self.sys_name = sys_name
+
+
+class AsyncSNMPProber(object):
+    SNMP_PORT = 161
+    SYSTEM_OIDS = (("SNMPv2-MIB", "sysObjectID", 0),
+                   ("SNMPv2-MIB", "sysDescr", 0),
+                   ("SNMPv2-MIB", "sysName", 0))
+
+    def __init__(self, timeout, retries, max_requests, logger):
+        """Get system information from many devices at once with a single multi-varbind SNMP GET per device
+
+        All requests are multiplexed over one UDP socket of the SNMP engine
+
+        :param float timeout: time in seconds to wait for the device response
+        :param int retries: number of request retries
+        :param int max_requests: max number of requests in flight
+        :param logging.Logger logger:
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.max_requests = max_requests
+        self.logger = logger
+
+    def _prepare_value(self, value):
+        """Convert SNMP value into the string
+
+        :param value: SNMP value from the response var bind
+        :rtype: str
+        """
+        if isinstance(value, (NoSuchObject, NoSuchInstance, EndOfMibView)):
+            return ""
+
+        return value.prettyPrint().strip(" \t\n\r")
+
+    def _send_requests(self, devices, oids, handle_values):
+        """Send SNMP GET request with the given OIDs to all devices keeping max number of requests in flight
+
+        :param collections.Iterable[(str, str)] devices: tuples (IP, SNMP community string)
+        :param tuple oids: OIDs that will be requested in a single GET request
+        :param function handle_values: will be called with IP, SNMP community string and values for each answer
+        :return:
+        """
+        snmp_engine = SnmpEngine()
+        context_data = ContextData()
+        devices_iter = iter(devices)
+
+        def send_next_request():
+            device = next(devices_iter, None)
+            if device is not None:
+                ip, snmp_community = device
+                getCmd(snmp_engine,
+                       CommunityData(snmp_community),
+                       UdpTransportTarget((ip, self.SNMP_PORT), timeout=self.timeout, retries=self.retries),
+                       context_data,
+                       *[ObjectType(ObjectIdentity(*oid)) for oid in oids],
+                       cbFun=handle_response,
+                       cbCtx=device)
+
+        def handle_response(snmp_engine, send_request_handle, error_indication, error_status, error_index,
+                            var_binds, device):
+            ip, snmp_community = device
+            if error_indication or error_status:
+                self.logger.debug("SNMP community string '{}' is not valid for device with IP {}: {}".format(
+                    snmp_community, ip, error_indication or error_status.prettyPrint()))
+            else:
+                handle_values(ip, snmp_community, [self._prepare_value(value) for _, value in var_binds])
+            send_next_request()
+
+        for _ in xrange(self.max_requests):
+            send_next_request()
+
+        snmp_engine.transportDispatcher.runDispatcher()
+        snmp_engine.transportDispatcher.closeDispatcher()
+
+    def _probe_with_community(self, ips, snmp_community, results):
+        """Send SNMP GET requests with the given community string to all devices
+
+        :param list[str] ips:
+        :param str snmp_community:
+        :param dict results: dictionary where answered devices will be added {IP: SNMPSystemInfo}
+        :return:
+        """
+        def handle_values(ip, snmp_community, values):
+            sys_object_id, description, sys_name = values
+            results[ip] = SNMPSystemInfo(snmp_community=snmp_community,
+                                         sys_object_id=sys_object_id,
+                                         description=description,
+                                         sys_name=sys_name)
+
+        self._send_requests(devices=((ip, snmp_community) for ip in ips),
+                            oids=self.SYSTEM_OIDS,
+                            handle_values=handle_values)
+
+    def get_sys_object_ids(self, devices):
+        """Get only sysObjectID from all given devices
+
+        :param dict devices: dictionary {IP: SNMP community string}
+        :return: dictionary {IP: sysObjectID} for all answered devices
+        :rtype: dict
+        """
+        results = {}
+
+        def handle_values(ip, snmp_community, values):
+            results[ip] = values[0]
+
+        self._send_requests(devices=devices.iteritems(),
+                            oids=self.SYSTEM_OIDS[:1],
+                            handle_values=handle_values)
+        return results
+
+    def probe(self, ips, snmp_community_strings):
+        """Get system information for all given devices
+
+        Each next community string is tried only for devices that didn't answer on the previous ones
+
+        :param collections.Iterable[str] ips:
+        :param list[str] snmp_community_strings: list of possible SNMP read community strings
+        :return: dictionary {IP: SNMPSystemInfo} for all answered devices
+        :rtype: dict
+        """
+        results = {}
+        pending_ips = list(ips)
+
+        for snmp_community in snmp_community_strings:
+            if not pending_ips:
+                break
+
+            self.logger.info("Trying community string '{}' for {} devices".format(snmp_community, len(pending_ips)))
+            self._probe_with_community(ips=pending_ips, snmp_community=snmp_community, results=results)
+            pending_ips = [ip for ip in pending_ips if ip not in results]
+
+        return results
@@ -1,5 +1,11 @@
+import collections
 import logging
 import os
+import Queue
+import threading
+from multiprocessing.pool import ThreadPool
+
+from autodiscovery import config
 
 
 def get_logger(file_path=None):
@@ -13,7 +19,7 @@ def get_logger(file_path=None):
 
     logger = logging.getLogger('autodiscovery')
     handler = logging.FileHandler(file_path)
-    formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
+    formatter = logging.Formatter('%(asctime)s %(threadName)s %(levelname)s %(message)s')
     handler.setFormatter(formatter)
     logger.addHandler(handler)
     logger.setLevel(logging.DEBUG)
@@ -29,3 +35,223 @@ def get_full_path(*args):
     """
     dir_name = os.path.split(os.path.abspath(__file__))[0]
     return os.path.join(dir_name, os.pardir, os.pardir, *args)
+
+
+def get_cache_path(*args):
+    """Get full path in the per-user cache folder
+
+    Package "data" folder is usually read-only when the tool is installed into the site-packages
+
+    :param args:
+    :return: full path ("/home/user/.cache/cloudshell-autodiscovery/example.pickle")
+    :rtype: str
+    """
+    if os.name == "nt":
+        base_dir = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+
+    return os.path.join(base_dir, config.CACHE_FOLDER, *args)
+
+
+def ensure_dir_exists(file_path):
+    """Create parent folder of the given file if it doesn't exist
+
+    :param str file_path:
+    :return:
+    """
+    dir_name = os.path.dirname(file_path)
+
+    try:
+        os.makedirs(dir_name)
+    except OSError:
+        if not os.path.isdir(dir_name):
+            raise
+
+
+def wait_async_result(async_result):
+    """Wait for the result of the function applied in the pool of worker threads
+
+    Waits without timeout can't be interrupted with Ctrl-C on Python 2, so it waits with timeout in a loop
+
+    :param multiprocessing.pool.AsyncResult async_result:
+    :return: result of the function
+    """
+    while not async_result.ready():
+        async_result.wait(config.INTERRUPTIBLE_WAIT_INTERVAL)
+
+    return async_result.get()
+
+
+def join_thread(thread):
+    """Wait until the thread is finished, can be interrupted with Ctrl-C
+
+    :param threading.Thread thread:
+    :return:
+    """
+    while thread.is_alive():
+        thread.join(config.INTERRUPTIBLE_WAIT_INTERVAL)
+
+
+def queue_get(queue):
+    """Get item from the queue, can be interrupted with Ctrl-C
+
+    :param Queue.Queue queue:
+    :return: item from the queue
+    """
+    while True:
+        try:
+            return queue.get(timeout=config.INTERRUPTIBLE_WAIT_INTERVAL)
+        except Queue.Empty:
+            pass
+
+
+def queue_put(queue, item):
+    """Put item into the queue, can be interrupted with Ctrl-C
+
+    :param Queue.Queue queue:
+    :param item:
+    :return:
+    """
+    while True:
+        try:
+            return queue.put(item, timeout=config.INTERRUPTIBLE_WAIT_INTERVAL)
+        except Queue.Full:
+            pass
+
+
+def parallel_imap(func, iterable, workers=1):
+    """Apply function to each item of the iterable using a pool of worker threads
+
+    Results are yielded in the same order as the items of the given iterable. Items are taken
+    from the iterable lazily, at most 2 items per worker are submitted ahead of the consumed results
+
+    :param function func:
+    :param iterable:
+    :param int workers: number of worker threads, items will be processed one by one if it is less than 2
+    :rtype: collections.Iterable
+    """
+    if workers < 2:
+        for item in iterable:
+            yield func(item)
+        return
+
+    pool = ThreadPool(processes=workers)
+    # ThreadPool.imap reads the whole iterable at once, so items are submitted through a bounded window
+    # and the next item is taken from the iterable only when one of the submitted results is consumed
+    window = threading.BoundedSemaphore(workers * 2)
+    pending_results = collections.deque()
+
+    def pop_result():
+        try:
+            return wait_async_result(pending_results.popleft())
+        finally:
+            window.release()
+
+    try:
+        for item in iterable:
+            while not window.acquire(False):
+                yield pop_result()
+
+            pending_results.append(pool.apply_async(func, (item,)))
+
+        while pending_results:
+            yield pop_result()
+    except BaseException:
+        # running calls aren't waited for, so Ctrl-C or an error isn't delayed until they are finished
+        pool.close()
+        raise
+    else:
+        pool.close()
+        pool.join()
+
+
+def parallel_first(func, items, pool=None):
+    """Apply function to all items concurrently and return the first result that is not None
+
+    Calls that are still running after the first result was found are not waited for,
+    items that weren't started yet are skipped
+
+    :param function func:
+    :param list items:
+    :param ThreadPool pool: shared pool of worker threads, a thread per item is started if it is None
+    :return: first result that is not None or None if there is no such result
+    """
+    items = list(items)
+    results = Queue.Queue()
+    found = threading.Event()
+
+    def worker(item):
+        result = None
+        try:
+            if not found.is_set():
+                result = func(item)
+        finally:
+            results.put(result)
+
+    for item in items:
+        if pool is None:
+            thread = threading.Thread(target=worker, args=(item,))
+            thread.daemon = True
+            thread.start()
+        else:
+            pool.apply_async(worker, (item,))
+
+    for _ in items:
+        result = queue_get(results)
+        if result is not None:
+            found.set()
+            return result
+
+
+def parallel_pipeline(produce_func, consume_func, iterable, producers=1, consumers=1, queue_size=1):
+    """Apply functions to each item of the iterable in two stages with separate pools of worker threads
+
+    Results of the first stage that are not None are put into the bounded queue and processed by the
+    second stage. Producers wait while the queue is full, so the first stage doesn't run ahead of the second one
+
+    :param function produce_func: first stage function
+    :param function consume_func: second stage function
+    :param iterable:
+    :param int producers: number of worker threads for the first stage
+    :param int consumers: number of worker threads for the second stage
+    :param int queue_size: max number of results waiting for the second stage
+    :return:
+    """
+    results = Queue.Queue(maxsize=queue_size)
+    stop = object()
+    errors = []
+
+    def consumer():
+        while True:
+            result = results.get()
+            if result is stop:
+                return
+            try:
+                consume_func(result)
+            except Exception as e:
+                # consumer should keep draining the queue, otherwise producers will wait forever
+                errors.append(e)
+
+    def produce(item):
+        result = produce_func(item)
+        if result is not None:
+            queue_put(results, result)
+
+    threads = [threading.Thread(target=consumer) for _ in xrange(consumers)]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+
+    try:
+        for _ in parallel_imap(produce, iterable, workers=producers):
+            pass
+    finally:
+        for _ in threads:
+            queue_put(results, stop)
+
+        for thread in threads:
+            join_thread(thread)
+
+    if errors:
+        raise errors[0]
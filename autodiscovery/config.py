@@ -1,9 +1,49 @@
 VENDOR_ENTERPRISE_NUMBERS_URL = "https://www.iana.org/assignments/enterprise-numbers/enterprise-numbers"
 DATA_FOLDER = "data"
+CACHE_FOLDER = "cloudshell-autodiscovery"  # per-user cache folder for the files generated at runtime
 EXAMPLES_FOLDER = "examples"
 VENDOR_ENTERPRISE_NUMBERS_FILE = "vendor_enterprise_numbers.json"
+VENDOR_ENTERPRISE_NUMBERS_CACHE_FILE = "vendor_enterprise_numbers.pickle"
+VENDOR_ENTERPRISE_NUMBERS_CACHE_VERSION = 1  # must be increased on any change of the VendorEnterpriseNumbers model
 VENDORS_CONFIG_FILE = "vendors_config.json"
+VENDORS_CONFIG_CACHE_FILE = "vendors_config.pickle"
+VENDORS_CONFIG_CACHE_VERSION = 1  # must be increased on any change of the vendors models
 VENDORS_CONFIG_EXAMPLE_FILE = "vendors_config_example.json"
 USER_INPUT_EXAMPLE_FILE = "user_input_example.yml"
 DEFAULT_CLOUDSHELL_DOMAIN = "Global"
 DEFAULT_RESOURCE_FOLDER_PATH = ""  # root folder
+PRESCAN_PORTS = [161, 22, 23]
+CLI_SSH_PORT = 22
+CLI_TELNET_PORT = 23
+PRESCAN_TIMEOUT = 1  # seconds
+PRESCAN_WORKERS = 64
+SNMP_TIMEOUT = 2  # seconds
+SNMP_RETRIES = 1
+SNMP_MAX_REQUESTS = 1000  # max number of SNMP requests in flight
+SNMP_COMMUNITY_WORKERS = 32  # max number of SNMP community strings tried at the same time for all devices
+SNMP_COMMUNITY_PREFIX_LENGTH = 24  # valid SNMP community strings are learned per /24 subnet
+MAX_DEVICES_IP_RANGE_SIZE = 2 ** 24  # max number of IPs in one devices range of the input file, e.g. IPv4 /8 network
+DISCOVERY_CACHE_FILE = "discovery_cache.sqlite"
+DISCOVERY_CACHE_TTL = 24  # hours
+DISCOVERY_CACHE_QUERY_CHUNK_SIZE = 500  # max number of IPs in one query, SQLite limits number of query parameters
+DISCOVERY_JOURNAL_FILE_EXTENSION = ".journal"  # journal is saved next to the report file
+CLI_MAX_CONNECTIONS = 32  # max number of CLI connections opened at the same time to all devices
+CLI_MAX_DEVICE_CONNECTIONS = 1  # max number of CLI connections opened at the same time to one device
+INTERRUPTIBLE_WAIT_INTERVAL = 0.5  # seconds, waits without timeout can't be interrupted with Ctrl-C on Python 2
+UPLOAD_QUEUE_SIZE = 100  # max number of discovered devices waiting for the upload on the CloudShell
+AUTOLOAD_WORKERS = 5  # max number of resources autoloaded concurrently in the background
+AUTOLOAD_TIMEOUT = 30 * 60  # seconds
+CS_ATTRIBUTES_BATCH_SIZE = 1  # max number of resources which attributes are set with one API call, 1 - no batching
+CS_ATTRIBUTES_BATCH_INTERVAL = 5  # seconds, max time the attributes update waits in the batch
+CS_MAX_SESSIONS = 10  # max number of CloudShell API sessions per domain
+CS_SESSION_HEALTH_CHECK_INTERVAL = 5 * 60  # seconds after which idle CloudShell session is checked before the reuse
+CS_API_MAX_RATE = 20  # max number of CloudShell API calls per second
+CS_API_MIN_RATE = 1  # CloudShell API calls rate isn't lowered below this one on errors
+CS_API_RETRIES = 3  # number of retries for the CloudShell API call that failed with a transient error
+CS_API_BACKOFF = 1  # seconds, initial delay before the CloudShell API call retry
+CS_API_MAX_BACKOFF = 30  # seconds
+CS_API_RETRYABLE_ERROR_CODES = ()  # default for --cs-api-retry-code, CloudShell API error codes that are retried
+# CloudShell API errors of the read-only calls that are retried when their message contains one of these (any case),
+# server busy and timeout errors share the error code with unrelated errors, so they are matched by the message
+CS_API_RETRYABLE_ERROR_MESSAGES = ("timeout", "timed out", "deadlock", "server is busy", "server too busy",
+                                   "service unavailable", "too many requests")
@@ -1,4 +1,9 @@
+import collections
+import cPickle
+import hashlib
 import json
+import os
+import threading
 
 from autodiscovery import config
 from autodiscovery import models
@@ -6,6 +11,9 @@ from autodiscovery.common import utils
 
 
 class JsonDataProcessor(object):
+    # PEN data is shared between all data processors, so it is parsed only once per run
+    _vendor_enterprise_numbers = None
+    _vendor_enterprise_numbers_lock = threading.Lock()
 
     def __init__(self, logger):
         """
@@ -23,6 +31,15 @@ class JsonDataProcessor(object):
         """
         return utils.get_full_path(config.DATA_FOLDER, filename)
 
+    def _prepare_cache_file_path(self, filename):
+        """Add full path in the per-user cache folder to the filename
+
+        :param str filename: Name of the cache file ("example.pickle")
+        :return: Full path to the file ("/home/user/.cache/cloudshell-autodiscovery/example.pickle")
+        :rtype: str
+        """
+        return utils.get_cache_path(filename)
+
     def _save(self, data, filename):
         """Save JSON Data to the given file
 
@@ -52,15 +69,78 @@ class JsonDataProcessor(object):
         :param dict data: JSON data that will be saved to the file
         :return:
         """
-        return self._save(data=data, filename=config.VENDOR_ENTERPRISE_NUMBERS_FILE)
+        with self._vendor_enterprise_numbers_lock:
+            JsonDataProcessor._vendor_enterprise_numbers = None
+            return self._save(data=data, filename=config.VENDOR_ENTERPRISE_NUMBERS_FILE)
+
+    def _get_vendor_enterprise_numbers_fingerprint(self):
+        """Get fingerprint of the Vendors PEN JSON file and the PEN model version
+
+        :rtype: str
+        """
+        file_path = self._prepare_file_path(config.VENDOR_ENTERPRISE_NUMBERS_FILE)
+        fingerprint = hashlib.sha1(str(config.VENDOR_ENTERPRISE_NUMBERS_CACHE_VERSION))
+
+        with open(file_path, "rb") as pen_file:
+            fingerprint.update(hashlib.sha1(pen_file.read()).hexdigest())
+
+        return fingerprint.hexdigest()
+
+    def _load_vendor_enterprise_numbers_cache(self, fingerprint):
+        """Load Vendors PEN index from the cache file if it was built for the given PEN file fingerprint
+
+        :param str fingerprint: fingerprint of the Vendors PEN data
+        :rtype: models.VendorEnterpriseNumbers
+        """
+        cache_file_path = self._prepare_cache_file_path(config.VENDOR_ENTERPRISE_NUMBERS_CACHE_FILE)
+
+        if not os.path.exists(cache_file_path):
+            return
+
+        try:
+            with open(cache_file_path, "rb") as cache_file:
+                cached_fingerprint, vendor_enterprise_numbers = cPickle.load(cache_file)
+        except Exception:
+            self.logger.warning("Unable to load Vendors PEN cache file {}".format(cache_file_path), exc_info=True)
+            return
+
+        if cached_fingerprint == fingerprint:
+            return vendor_enterprise_numbers
+
+    def _save_vendor_enterprise_numbers_cache(self, fingerprint, vendor_enterprise_numbers):
+        """Save Vendors PEN index with the PEN file fingerprint into the cache file, replacing the previous one
+
+        :param str fingerprint: fingerprint of the Vendors PEN data
+        :param models.VendorEnterpriseNumbers vendor_enterprise_numbers:
+        :return:
+        """
+        cache_file_path = self._prepare_cache_file_path(config.VENDOR_ENTERPRISE_NUMBERS_CACHE_FILE)
+
+        try:
+            utils.ensure_dir_exists(cache_file_path)
+            with open(cache_file_path, "wb") as cache_file:
+                cPickle.dump((fingerprint, vendor_enterprise_numbers), cache_file, cPickle.HIGHEST_PROTOCOL)
+        except (IOError, OSError):
+            self.logger.warning("Unable to save Vendors PEN cache file {}".format(cache_file_path), exc_info=True)
 
     def load_vendor_enterprise_numbers(self):
         """Load Vendors PEN data from the file
 
-        :return: JSON data
-        :rtype: dict
+        :rtype: models.VendorEnterpriseNumbers
         """
-        return self._load(filename=config.VENDOR_ENTERPRISE_NUMBERS_FILE)
+        with self._vendor_enterprise_numbers_lock:
+            if JsonDataProcessor._vendor_enterprise_numbers is None:
+                fingerprint = self._get_vendor_enterprise_numbers_fingerprint()
+                vendor_enterprise_numbers = self._load_vendor_enterprise_numbers_cache(fingerprint)
+
+                if vendor_enterprise_numbers is None:
+                    data = self._load(filename=config.VENDOR_ENTERPRISE_NUMBERS_FILE)
+                    vendor_enterprise_numbers = models.VendorEnterpriseNumbers(enterprise_numbers=data)
+                    self._save_vendor_enterprise_numbers_cache(fingerprint, vendor_enterprise_numbers)
+
+                JsonDataProcessor._vendor_enterprise_numbers = vendor_enterprise_numbers
+
+            return JsonDataProcessor._vendor_enterprise_numbers
 
     def _merge_vendors_data(self, conf_data, additional_data):
         """Merge default vendors configuration with additional one
@@ -69,29 +149,99 @@ class JsonDataProcessor(object):
         :param list[dict] additional_data: additional vendors config data
         :rtype: list[dict]
         """
+        conf_vendors_data = collections.OrderedDict()
+        for conf_vendor_data in conf_data:
+            conf_vendors_data.setdefault(conf_vendor_data["name"], conf_vendor_data)
+
         merged_data = []
         for add_vendor_data in additional_data:
-            for conf_vendor_data in conf_data:
-                if conf_vendor_data["name"] == add_vendor_data["name"]:
-                    conf_data.remove(conf_vendor_data)
+            conf_vendor_data = conf_vendors_data.pop(add_vendor_data["name"], None)
 
-                    for conf_os in conf_vendor_data.get("operation_systems", []):
-                        for add_os in add_vendor_data.get("operation_systems", []):
-                            if conf_os["name"] == add_os["name"]:
-                                conf_vendor_data["operation_systems"].remove(conf_os)
-
-                    if "operation_systems" in conf_vendor_data:
-                        oses = add_vendor_data.setdefault("operation_systems", [])
-                        oses.extend(conf_vendor_data["operation_systems"])
+            if conf_vendor_data is not None and "operation_systems" in conf_vendor_data:
+                oses = add_vendor_data.setdefault("operation_systems", [])
+                add_os_names = set(add_os["name"] for add_os in oses)
+                oses.extend(conf_os for conf_os in conf_vendor_data["operation_systems"]
+                            if conf_os["name"] not in add_os_names)
 
             merged_data.append(add_vendor_data)
 
-        merged_data.extend(conf_data)
+        merged_data.extend(conf_vendors_data.itervalues())
         return merged_data
 
+    def _get_vendor_config_fingerprint(self, additional_vendors_data):
+        """Get fingerprint of the default vendors config file, additional vendors config data and models version
+
+        :param list[dict] additional_vendors_data: additional vendors config data
+        :rtype: str
+        """
+        file_path = self._prepare_file_path(config.VENDORS_CONFIG_FILE)
+        fingerprint = hashlib.sha1(str(config.VENDORS_CONFIG_CACHE_VERSION))
+
+        with open(file_path, "rb") as config_file:
+            fingerprint.update(hashlib.sha1(config_file.read()).hexdigest())
+
+        fingerprint.update(hashlib.sha1(json.dumps(additional_vendors_data, sort_keys=True)).hexdigest())
+        return fingerprint.hexdigest()
+
+    def _load_vendor_config_cache(self, fingerprint):
+        """Load Vendors definitions from the cache file if they were built for the given config fingerprint
+
+        :param str fingerprint: fingerprint of the vendors config data
+        :rtype: models.VendorDefinitionCollection
+        """
+        cache_file_path = self._prepare_cache_file_path(config.VENDORS_CONFIG_CACHE_FILE)
+
+        if not os.path.exists(cache_file_path):
+            return
+
+        try:
+            with open(cache_file_path, "rb") as cache_file:
+                cached_fingerprint, vendor_config = cPickle.load(cache_file)
+        except Exception:
+            self.logger.warning("Unable to load Vendors config cache file {}".format(cache_file_path), exc_info=True)
+            return
+
+        if cached_fingerprint == fingerprint:
+            return vendor_config
+
+    def _save_vendor_config_cache(self, fingerprint, vendor_config):
+        """Save Vendors definitions with the config fingerprint into the cache file, replacing the previous ones
+
+        :param str fingerprint: fingerprint of the vendors config data
+        :param models.VendorDefinitionCollection vendor_config:
+        :return:
+        """
+        cache_file_path = self._prepare_cache_file_path(config.VENDORS_CONFIG_CACHE_FILE)
+
+        try:
+            utils.ensure_dir_exists(cache_file_path)
+            with open(cache_file_path, "wb") as cache_file:
+                cPickle.dump((fingerprint, vendor_config), cache_file, cPickle.HIGHEST_PROTOCOL)
+        except (IOError, OSError):
+            self.logger.warning("Unable to save Vendors config cache file {}".format(cache_file_path), exc_info=True)
+
     def load_vendor_config(self, additional_vendors_data=None):
+        """Load Vendors definitions from the cache file or JSON file into the corresponding models
+
+        :param list[dict] additional_vendors_data: additional vendors config data
+        :rtype: models.VendorDefinitionCollection
+        """
+        if additional_vendors_data is None:
+            additional_vendors_data = []
+
+        fingerprint = self._get_vendor_config_fingerprint(additional_vendors_data)
+        vendor_config = self._load_vendor_config_cache(fingerprint)
+
+        if vendor_config is None:
+            vendor_config = self._build_vendor_config(additional_vendors_data)
+            self._save_vendor_config_cache(fingerprint, vendor_config)
+
+        return vendor_config
+
+    def _build_vendor_config(self, additional_vendors_data):
         """Load Vendors definitions from JSON file into the corresponding models
 
+        :param list[dict] additional_vendors_data: additional vendors config data
         :rtype: models.VendorDefinitionCollection
         """
         vendors_data = self._load(filename=config.VENDORS_CONFIG_FILE)
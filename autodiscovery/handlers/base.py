@@ -1,29 +1,71 @@
+import functools
+
 from cloudshell.api.cloudshell_api import AttributeNameValue
 from cloudshell.api.cloudshell_api import ResourceAttributesUpdateRequest
 from cloudshell.api.common_cloudshell_api import CloudShellAPIError
 
+from autodiscovery import config
 from autodiscovery.cli_sessions import SSHDiscoverySession
 from autodiscovery.cli_sessions import TelnetDiscoverySession
+from autodiscovery.common.cli_connection_limiter import CLIConnectionLimiter
 from autodiscovery.common.consts import CloudshellAPIErrorCodes
+from autodiscovery.common.consts import ExistingResourceActions
+from autodiscovery.common.cs_folders_cache import CloudShellFoldersCache
+from autodiscovery.common.cs_resources_index import CloudShellResourcesIndex
+from autodiscovery.common.cs_shells_cache import CloudShellShellsCache
+from autodiscovery.common.prescan import PortState
 from autodiscovery.exceptions import ReportableException
 
 
 class AbstractHandler(object):
-    def __init__(self, logger, autoload):
+    def __init__(self, logger, autoload, cli_connection_limiter=None, autoload_scheduler=None, cs_folders_cache=None,
+                 cs_resources_index=None, existing_resource_action=ExistingResourceActions.CREATE,
+                 cs_shells_cache=None, attributes_batcher=None):
         """
 
         :param logging.Logger logger:
         :param bool autoload:
+        :param CLIConnectionLimiter cli_connection_limiter: limits CLI connections opened at the same time
+        :param autodiscovery.common.autoload_scheduler.AutoloadScheduler autoload_scheduler: runs Autoload in the
+            background, Autoload is run right after the resource creation if it is None
+        :param CloudShellFoldersCache cs_folders_cache: folders that were already created on the CloudShell
+        :param CloudShellResourcesIndex cs_resources_index: resources that exist on the CloudShell
+        :param str existing_resource_action: what to do with the device that already has a resource with its address
+            on the CloudShell, one of the ExistingResourceActions
+        :param CloudShellShellsCache cs_shells_cache: resource models and drivers that are missing on the CloudShell
+        :param autodiscovery.common.cs_attributes_batcher.CloudShellAttributesBatcher attributes_batcher: sets
+            attributes of many resources with one API call, attributes are set right after the upload if it is None
         """
         self.logger = logger
         self.autoload = autoload
+        self.autoload_scheduler = autoload_scheduler
+        self.existing_resource_action = existing_resource_action
+        self.attributes_batcher = attributes_batcher
+
+        if cli_connection_limiter is None:
+            cli_connection_limiter = CLIConnectionLimiter(max_connections=config.CLI_MAX_CONNECTIONS,
+                                                          max_device_connections=config.CLI_MAX_DEVICE_CONNECTIONS)
+        self.cli_connection_limiter = cli_connection_limiter
+
+        if cs_folders_cache is None:
+            cs_folders_cache = CloudShellFoldersCache()
+        self.cs_folders_cache = cs_folders_cache
+
+        if cs_resources_index is None:
+            cs_resources_index = CloudShellResourcesIndex(logger=logger)
+        self.cs_resources_index = cs_resources_index
 
-    def discover(self, entry, vendor, vendor_settings):
+        if cs_shells_cache is None:
+            cs_shells_cache = CloudShellShellsCache()
+        self.cs_shells_cache = cs_shells_cache
+
+    def discover(self, entry, vendor, vendor_settings, cli_ports_states=None):
         """Discover device attributes
 
         :param autodiscovery.reports.base.Entry entry:
         :param autodiscovery.models.vendor.BaseVendorDefinition vendor:
         :param autodiscovery.models.VendorSettingsCollection vendor_settings:
+        :param dict cli_ports_states: states of the device CLI ports {port: port state}, all ports are tried if None
         :rtype: autodiscovery.reports.base.Entry
         """
         raise NotImplementedError("Class {} must implement method 'discover'".format(type(self)))
@@ -38,23 +80,46 @@ class AbstractHandler(object):
         """
         raise NotImplementedError("Class {} must implement method 'upload'".format(type(self)))
 
-    def _get_cli_credentials(self, vendor, vendor_settings, device_ip):
+    def _get_cli_sessions(self, device_ip, cli_ports_states=None):
+        """Get CLI sessions that will be tried for the device in the order of their priority
+
+        Sessions for the ports that weren't found open by the CLI ports probe are skipped
+
+        :param str device_ip:
+        :param dict cli_ports_states: states of the device CLI ports {port: port state}, all ports are tried if None
+        :rtype: list[autodiscovery.cli_sessions.base.AbstractDiscoverySession]
+        """
+        sessions = []
+        for session_cls, port in ((SSHDiscoverySession, config.CLI_SSH_PORT),
+                                  (TelnetDiscoverySession, config.CLI_TELNET_PORT)):
+            if cli_ports_states is not None and cli_ports_states.get(port, PortState.OPEN) != PortState.OPEN:
+                self.logger.info("Skipping {} session for the device with IP {}, port {} is {}".format(
+                    session_cls.SESSION_TYPE, device_ip, port, cli_ports_states[port]))
+                continue
+
+            sessions.append(session_cls(device_ip, port=port))
+
+        return sessions
+
+    def _get_cli_credentials(self, vendor, vendor_settings, device_ip, cli_ports_states=None):
         """
 
         :param autodiscovery.models.VendorDefinition vendor:
         :param autodiscovery.models.VendorSettingsCollection vendor_settings:
         :param str device_ip:
+        :param dict cli_ports_states: states of the device CLI ports {port: port state}, all ports are tried if None
         :return:
         """
         vendor_cli_creds = vendor_settings.get_creds_by_vendor(vendor)
 
         if vendor_cli_creds:
-            for session in (SSHDiscoverySession(device_ip), TelnetDiscoverySession(device_ip)):
+            for session in self._get_cli_sessions(device_ip=device_ip, cli_ports_states=cli_ports_states):
                 try:
-                    valid_creds = session.check_credentials(cli_credentials=vendor_cli_creds,
-                                                            default_prompt=vendor.default_prompt,
-                                                            enable_prompt=vendor.enable_prompt,
-                                                            logger=self.logger)
+                    with self.cli_connection_limiter.connection(device_ip):
+                        valid_creds = session.check_credentials(cli_credentials=vendor_cli_creds,
+                                                                default_prompt=vendor.default_prompt,
+                                                                enable_prompt=vendor.enable_prompt,
+                                                                logger=self.logger)
                 except Exception:
                     self.logger.warning("{} Credentials aren't valid for the device with IP {}"
                                         .format(session.SESSION_TYPE, device_ip), exc_info=True)
@@ -76,12 +141,15 @@ class AbstractHandler(object):
         except CloudShellAPIError as e:
             if e.code == CloudshellAPIErrorCodes.UNABLE_TO_LOCATE_DRIVER:
                 self.logger.exception("Unable to locate driver {}".format(driver_name))
+                self.cs_shells_cache.add_missing_driver(cs_session=cs_session, driver_name=driver_name)
                 raise ReportableException("Shell {} is not installed on the CloudShell".format(driver_name))
             raise
 
     def _create_cs_resource(self, cs_session, resource_name, resource_family, resource_model, device_ip, folder_path):
         """Create Resource on CloudShell with appropriate attributes
 
+        Suffix "-1", "-2", etc. is added to the resource name if it is already taken on the CloudShell
+
         :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
         :param str resource_name:
         :param str resource_family:
@@ -91,27 +159,68 @@ class AbstractHandler(object):
         :return: name for the created Resource
         :rtype: str
         """
-        try:
-            cs_session.CreateResource(resourceFamily=resource_family,
-                                      resourceModel=resource_model,
-                                      resourceName=resource_name,
-                                      resourceAddress=device_ip,
-                                      folderFullPath=folder_path)
-        except CloudShellAPIError as e:
-            if e.code == CloudshellAPIErrorCodes.RESOURCE_ALREADY_EXISTS:
-                resource_name = "{}-1".format(resource_name)
+        requested_name = resource_name
+        resource_name = self.cs_resources_index.reserve_name(cs_session=cs_session, resource_name=requested_name)
+
+        while True:
+            try:
                 cs_session.CreateResource(resourceFamily=resource_family,
                                           resourceModel=resource_model,
                                           resourceName=resource_name,
                                           resourceAddress=device_ip,
                                           folderFullPath=folder_path)
-            else:
-                self.logger.exception("Unable to locate Shell with Resource Family/Name: {}/{}"
-                                      .format(resource_family, resource_model))
+            except CloudShellAPIError as e:
+                if e.code != CloudshellAPIErrorCodes.RESOURCE_ALREADY_EXISTS:
+                    self.cs_resources_index.release_name(cs_session=cs_session, resource_name=resource_name)
+                    self.logger.exception("Unable to locate Shell with Resource Family/Name: {}/{}"
+                                          .format(resource_family, resource_model))
+                    raise
+
+                # resource was created by someone else after the CloudShell resources were loaded
+                self.logger.warning("Resource name {} is already taken on the CloudShell".format(resource_name))
+                resource_name = self.cs_resources_index.reserve_name(cs_session=cs_session,
+                                                                     resource_name=requested_name)
+            except Exception:
+                self.cs_resources_index.release_name(cs_session=cs_session, resource_name=resource_name)
                 raise
+            else:
+                break
 
+        self.cs_resources_index.add_resource(cs_session=cs_session,
+                                             resource_name=resource_name,
+                                             address=device_ip,
+                                             family=resource_family,
+                                             model=resource_model)
         return resource_name
 
+    def _get_existing_resource(self, cs_session, entry):
+        """Get resource that already exists on the CloudShell for the device if it should be reused
+
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
+        :param autodiscovery.reports.base.Entry entry:
+        :rtype: autodiscovery.common.cs_resources_index.CloudShellResource
+        """
+        if self.existing_resource_action == ExistingResourceActions.CREATE:
+            return
+
+        return self.cs_resources_index.get_resource_by_address(cs_session=cs_session, address=entry.ip)
+
+    def _get_upload_error(self, cs_session, entry, driver_name):
+        """Get reason why the device wasn't uploaded with any of its shells
+
+        :param cloudshell.api.cloudshell_api.CloudShellAPISession cs_session:
+        :param autodiscovery.reports.base.Entry entry:
+        :param str driver_name:
+        :rtype: str
+        """
+        existing_resource = self._get_existing_resource(cs_session=cs_session, entry=entry)
+
+        if existing_resource is not None:
+            return "Resource {} with the same address already exists on the CloudShell with a different model {}" \
+                .format(existing_resource.name, existing_resource.model)
+
+        return "Shell {} is not installed".format(driver_name)
+
     def _upload_resource(self, cs_session, entry, resource_family, resource_model, driver_name, attribute_prefix=""):
         """
 
@@ -123,36 +232,97 @@ class AbstractHandler(object):
         :param attribute_prefix:
         :return:
         """
-        if entry.folder_path != "":
-            # create folder before uploading resource. If folder was already created it will return successful result
-            cs_session.CreateFolder(folderFullPath=entry.folder_path)
+        existing_resource = self._get_existing_resource(cs_session=cs_session, entry=entry)
 
-        try:
-            resource_name = self._create_cs_resource(cs_session=cs_session,
-                                                     resource_name=entry.device_name,
+        if existing_resource is not None:
+            resource_name = existing_resource.name
+
+            if self.existing_resource_action == ExistingResourceActions.SKIP:
+                self.logger.info("Skipping device {}, resource {} with the same address already exists"
+                                 .format(entry.ip, resource_name))
+                entry.comment = "Resource {} with the same address already exists on the CloudShell".format(
+                    resource_name)
+                return resource_name
+
+            if existing_resource.model.lower() != resource_model.lower():
+                # resource could be created with the shell of another generation, let the caller try it
+                self.logger.info("Resource {} with the same address has a different model {}, not {}"
+                                 .format(resource_name, existing_resource.model, resource_model))
+                return
+
+            self.logger.info("Updating existing resource {}".format(resource_name))
+        else:
+            # fail fast for the shells that were already found missing for the previous devices
+            if self.cs_shells_cache.is_model_missing(cs_session=cs_session,
                                                      resource_family=resource_family,
-                                                     resource_model=resource_model,
-                                                     device_ip=entry.ip,
-                                                     folder_path=entry.folder_path)
-        except CloudShellAPIError as e:
-            if e.code == CloudshellAPIErrorCodes.UNABLE_TO_LOCATE_FAMILY_OR_MODEL:
+                                                     resource_model=resource_model):
+                self.logger.info("Resource Family/Model {}/{} is missing on the CloudShell".format(resource_family,
+                                                                                                   resource_model))
                 return
-            else:
-                raise
 
-        self.logger.info("Adding attributes to the resource {}".format(resource_name))
+            if self.cs_shells_cache.is_driver_missing(cs_session=cs_session, driver_name=driver_name):
+                raise ReportableException("Shell {} is not installed on the CloudShell".format(driver_name))
+
+            if entry.folder_path != "":
+                # create folder before uploading resource. Folder is created only once per run
+                self.cs_folders_cache.create_folder(cs_session=cs_session, folder_path=entry.folder_path)
+
+            try:
+                resource_name = self._create_cs_resource(cs_session=cs_session,
+                                                         resource_name=entry.device_name,
+                                                         resource_family=resource_family,
+                                                         resource_model=resource_model,
+                                                         device_ip=entry.ip,
+                                                         folder_path=entry.folder_path)
+            except CloudShellAPIError as e:
+                if e.code == CloudshellAPIErrorCodes.UNABLE_TO_LOCATE_FAMILY_OR_MODEL:
+                    self.cs_shells_cache.add_missing_model(cs_session=cs_session,
+                                                           resource_family=resource_family,
+                                                           resource_model=resource_model)
+                    return
+                else:
+                    raise
+
         attributes = [AttributeNameValue("{}{}".format(attribute_prefix, key), value)
                       for key, value in entry.attributes.iteritems()]
+        attributes_request = ResourceAttributesUpdateRequest(resource_name, attributes)
+        # Autoload that is run right after the upload needs attributes to be already set
+        batch_attributes = self.attributes_batcher is not None and (not self.autoload or
+                                                                    self.autoload_scheduler is not None)
 
-        cs_session.SetAttributesValues([ResourceAttributesUpdateRequest(resource_name, attributes)])
+        if not batch_attributes:
+            self.logger.info("Adding attributes to the resource {}".format(resource_name))
+            cs_session.SetAttributesValues([attributes_request])
 
         self.logger.info("Attaching driver to the resource {}".format(resource_name))
         self._add_resource_driver(cs_session=cs_session,
                                   resource_name=resource_name,
                                   driver_name=driver_name)
 
-        if self.autoload:
-            self.logger.info("Autoloading resource {}".format(resource_name))
-            cs_session.AutoLoad(resource_name)
+        if batch_attributes:
+            self.logger.info("Adding attributes to the resource {} in a batch".format(resource_name))
+            if self.autoload:
+                # Autoload is scheduled only after the attributes are set
+                on_success = functools.partial(self.autoload_scheduler.schedule,
+                                               cs_domain=cs_session.domain,
+                                               resource_name=resource_name,
+                                               entry=entry)
+            else:
+                on_success = None
+
+            self.attributes_batcher.add(cs_domain=cs_session.domain,
+                                        request=attributes_request,
+                                        entry=entry,
+                                        on_success=on_success)
+
+        elif self.autoload:
+            if self.autoload_scheduler is None:
+                self.logger.info("Autoloading resource {}".format(resource_name))
+                cs_session.AutoLoad(resource_name)
+            else:
+                self.logger.info("Scheduling Autoload for the resource {}".format(resource_name))
+                self.autoload_scheduler.schedule(cs_domain=cs_session.domain,
+                                                 resource_name=resource_name,
+                                                 entry=entry)
 
         return resource_name
@@ -8,12 +8,13 @@ from autodiscovery.handlers.base import AbstractHandler
 
 class NetworkingTypeHandler(AbstractHandler):
 
-    def discover(self, entry, vendor, vendor_settings):
+    def discover(self, entry, vendor, vendor_settings, cli_ports_states=None):
         """Discover device attributes
 
         :param autodiscovery.reports.base.Entry entry:
         :param autodiscovery.models.vendor.NetworkingVendorDefinition vendor:
         :param autodiscovery.models.VendorSettingsCollection vendor_settings:
+        :param dict cli_ports_states: states of the device CLI ports {port: port state}, all ports are tried if None
         :rtype: autodiscovery.reports.base.Entry
         """
         device_os = vendor.get_device_os(entry.description)
@@ -29,7 +30,8 @@ class NetworkingTypeHandler(AbstractHandler):
 
         cli_creds = self._get_cli_credentials(vendor=vendor,
                                               vendor_settings=vendor_settings,
-                                              device_ip=entry.ip)
+                                              device_ip=entry.ip,
+                                              cli_ports_states=cli_ports_states)
 
         entry.add_attribute(ResourceModelsAttributes.ENABLE_SNMP, "False")
         entry.add_attribute(ResourceModelsAttributes.SNMP_READ_COMMUNITY, entry.snmp_community)
@@ -84,4 +86,6 @@ class NetworkingTypeHandler(AbstractHandler):
                                                   driver_name=driver_name)
 
         if not resource_name:
-            raise ReportableException("Shell {} is not installed".format(driver_name))
+            raise ReportableException(self._get_upload_error(cs_session=cs_session,
+                                                             entry=entry,
+                                                             driver_name=driver_name))
@@ -8,17 +8,19 @@ from autodiscovery.common.consts import CloudshellAPIErrorCodes
 
 class PDUTypeHandler(AbstractHandler):
 
-    def discover(self, entry, vendor, vendor_settings):
+    def discover(self, entry, vendor, vendor_settings, cli_ports_states=None):
         """Discover device attributes
 
         :param autodiscovery.reports.base.Entry entry:
         :param autodiscovery.models.vendor.PDUVendorDefinition vendor:
         :param autodiscovery.models.VendorSettingsCollection vendor_settings:
+        :param dict cli_ports_states: states of the device CLI ports {port: port state}, all ports are tried if None
         :rtype: autodiscovery.reports.base.Entry
         """
         cli_creds = self._get_cli_credentials(vendor=vendor,
                                               vendor_settings=vendor_settings,
-                                              device_ip=entry.ip)
+                                              device_ip=entry.ip,
+                                              cli_ports_states=cli_ports_states)
         if cli_creds is None:
             entry.comment = "Unable to discover device user/password"
         else:
@@ -42,4 +44,6 @@ class PDUTypeHandler(AbstractHandler):
                                               driver_name=vendor.driver_name)
 
         if not resource_name:
-            raise ReportableException("Shell {} is not installed".format(vendor.driver_name))
+            raise ReportableException(self._get_upload_error(cs_session=cs_session,
+                                                             entry=entry,
+                                                             driver_name=vendor.driver_name))
@@ -1,3 +1,9 @@
+import bisect
+import threading
+
+from ipaddress import IPv4Address
+from ipaddress import IPv6Address
+
 from autodiscovery.config import DEFAULT_CLOUDSHELL_DOMAIN
 from autodiscovery.config import DEFAULT_RESOURCE_FOLDER_PATH
 
@@ -21,11 +27,89 @@ class InputDataModel(object):
         self.vendor_settings = vendor_settings
 
 
+class IPRange(object):
+    def __init__(self, intervals, version=4):
+        """Lazy range of IP addresses, addresses are generated only during the iteration
+
+        Range can be iterated many times, memory usage depends only on the number of intervals
+
+        :param list[(int, int)] intervals: sorted non-overlapping intervals of integer addresses, both ends included
+        :param int version: IP version of the addresses, 4 or 6
+        """
+        self.intervals = intervals
+        self.version = version
+        self._address_class = IPv4Address if version == 4 else IPv6Address
+        self._firsts = [first for first, _ in intervals]
+
+    def __iter__(self):
+        for first, last in self.intervals:
+            address = first
+            while address <= last:
+                yield str(self._address_class(address))
+                address += 1
+
+    @property
+    def size(self):
+        """Number of addresses in the range, can be bigger than the max value allowed for len()
+
+        :rtype: long
+        """
+        return sum(last - first + 1 for first, last in self.intervals)
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, ip):
+        try:
+            address = int(self._address_class(unicode(ip)))
+        except ValueError:
+            return False
+
+        index = bisect.bisect_right(self._firsts, address) - 1
+        return index >= 0 and address <= self.intervals[index][1]
+
+    def __repr__(self):
+        return "<{} {}>".format(type(self).__name__, ", ".join(
+            "{}-{}".format(self._address_class(first), self._address_class(last))
+            for first, last in self.intervals))
+
+    def difference(self, other):
+        """Get addresses of the range that are not in the other range
+
+        :param IPRange other:
+        :rtype: IPRange
+        """
+        if other.version != self.version:
+            return self
+
+        intervals = []
+        other_intervals = other.intervals
+        other_index = 0
+
+        for first, last in self.intervals:
+            # skip other intervals that end before the current one
+            while other_index < len(other_intervals) and other_intervals[other_index][1] < first:
+                other_index += 1
+
+            index = other_index
+            while first <= last and index < len(other_intervals) and other_intervals[index][0] <= last:
+                other_first, other_last = other_intervals[index]
+                if other_first > first:
+                    intervals.append((first, other_first - 1))
+                first = max(first, other_last + 1)
+                index += 1
+
+            if first <= last:
+                intervals.append((first, last))
+
+        return IPRange(intervals=intervals, version=self.version)
+
+
 class DeviceIPRange(object):
     def __init__(self, ip_range, domain=None):
         """
 
-        :param list[str] ip_range:
+        :param IPRange ip_range:
         :param str domain:
         """
         self.ip_range = ip_range
@@ -65,6 +149,7 @@ class VendorCLICredentials(object):
         """
         self.name = name
         self.cli_credentials = cli_credentials
+        self._lock = threading.Lock()
 
     def update_valid_creds(self, valid_creds):
         """Set valid credentials to be first in the list of possible CLI credentials for the Vendor
@@ -72,10 +157,14 @@ class VendorCLICredentials(object):
         :param CLICredentials valid_creds:
         :return:
         """
-        if valid_creds in self.cli_credentials:
-            self.cli_credentials.remove(valid_creds)
-
-        self.cli_credentials.insert(0, valid_creds)
+        with self._lock:
+            # replace the whole list so sessions that are iterating over the old one will not be affected
+            cli_credentials = list(self.cli_credentials)
+            if valid_creds in cli_credentials:
+                cli_credentials.remove(valid_creds)
+
+            cli_credentials.insert(0, valid_creds)
+            self.cli_credentials = cli_credentials
 
 
 class VendorSettingsCollection(object):
@@ -1,6 +1,76 @@
+from array import array
+import bisect
 import re
 
 
+class VendorEnterpriseNumbers(object):
+    def __init__(self, enterprise_numbers):
+        """Immutable index of the vendors Private Enterprise Numbers sorted by the integer PEN
+
+        :param dict enterprise_numbers: dictionary {"vendor PEN": "vendor name"}
+        """
+        numbers = sorted(enterprise_numbers.iterkeys(), key=int)
+        self._numbers = array("L", (int(number) for number in numbers))
+        self._names = tuple(enterprise_numbers[number] for number in numbers)
+
+    def _find_index(self, number):
+        """Find index of the given PEN in the sorted numbers array
+
+        :param int|str number: vendor PEN
+        :rtype: int
+        """
+        number = int(number)
+        index = bisect.bisect_left(self._numbers, number)
+        if index < len(self._numbers) and self._numbers[index] == number:
+            return index
+
+        raise KeyError(number)
+
+    def __getitem__(self, number):
+        return self._names[self._find_index(number)]
+
+    def __contains__(self, number):
+        try:
+            self._find_index(number)
+        except (KeyError, TypeError, ValueError):
+            return False
+
+        return True
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def get(self, number, default=None):
+        """Get vendor name by its PEN
+
+        :param int|str number: vendor PEN
+        :param default: value that will be returned if there is no such PEN
+        :rtype: str
+        """
+        if number in self:
+            return self[number]
+
+        return default
+
+
+class AliasesMatcher(object):
+    def __init__(self, aliases):
+        """Aliases regexp that is compiled only once
+
+        :param list[str] aliases: list of regexp patterns
+        """
+        self.aliases = aliases
+        self._regexp = re.compile(r"({})".format("|".join(aliases)), flags=re.DOTALL)
+
+    def search(self, text):
+        """Check if any of the aliases matches the given text
+
+        :param str text:
+        :rtype: bool
+        """
+        return bool(self._regexp.search(text))
+
+
 class VendorDefinitionCollection(object):
     def __init__(self, vendors):
         """
@@ -8,6 +78,28 @@ class VendorDefinitionCollection(object):
         :param list[VendorDefinition] vendors:
         """
         self._vendors = vendors
+        self._vendor_indexes = {}
+        # vendor names are resolved only once, as many devices share the same name from the PEN data file
+        self._resolved_vendors = {}
+
+        for index, vendor in enumerate(vendors):
+            self._vendor_indexes.setdefault(vendor.name.lower(), index)
+
+    def _find_vendor(self, vendor_name):
+        """Find vendor by it name/aliases in the same order as they are defined in the vendors list
+
+        :param str vendor_name: vendor name from the PEN data file
+        :rtype: VendorDefinition
+        """
+        index = self._vendor_indexes.get(vendor_name.lower(), len(self._vendors))
+
+        # vendors before the one with the same name can still match the name by their aliases
+        for vendor in self._vendors[:index]:
+            if vendor.check_in_aliases(vendor_name):
+                return vendor
+
+        if index < len(self._vendors):
+            return self._vendors[index]
 
     def get_vendor(self, vendor_name):
         """Find vendor by it name/aliases
@@ -15,9 +107,11 @@ class VendorDefinitionCollection(object):
         :param str vendor_name: vendor name from the PEN data file
         :rtype: VendorDefinition
         """
-        for vendor in self._vendors:
-            if vendor.check_vendor_name(vendor_name):
-                return vendor
+        try:
+            return self._resolved_vendors[vendor_name]
+        except KeyError:
+            vendor = self._resolved_vendors[vendor_name] = self._find_vendor(vendor_name)
+            return vendor
 
 
 class BaseVendorDefinition(object):
@@ -36,14 +130,21 @@ class BaseVendorDefinition(object):
         self.default_prompt = default_prompt
         self.enable_prompt = enable_prompt
 
+    @property
+    def aliases(self):
+        return self._aliases_matcher.aliases
+
+    @aliases.setter
+    def aliases(self, aliases):
+        self._aliases_matcher = AliasesMatcher(aliases)
+
     def check_in_aliases(self, vendor_name):
         """Check in given vendor name is in aliases for current Vendor
 
         :param str vendor_name: vendor name from the PEN data file
         :rtype: bool
         """
-        aliases_regexp = r"({})".format("|".join(self.aliases))
-        return bool(re.search(aliases_regexp, vendor_name, flags=re.DOTALL))
+        return self._aliases_matcher.search(vendor_name)
 
     def check_vendor_name(self, vendor_name):
         """Check if given name is a name for the Vendor
@@ -77,10 +178,8 @@ class NetworkingVendorDefinition(BaseVendorDefinition):
         :rtype: OperationSystem
         """
         for os in self.operation_systems:
-            if os.aliases:
-                aliases_regexp = r"({})".format("|".join(os.aliases))
-                if re.search(aliases_regexp, system_description, flags=re.DOTALL):
-                    return os
+            if os.aliases and os.check_in_aliases(system_description):
+                return os
 
         return self.get_default_device_os()
 
@@ -132,16 +231,41 @@ class OperationSystem(object):
         self.models_map = models_map
         self.families = families
 
+    @property
+    def aliases(self):
+        return self._aliases_matcher.aliases
+
+    @aliases.setter
+    def aliases(self, aliases):
+        self._aliases_matcher = AliasesMatcher(aliases)
+
+    @property
+    def models_map(self):
+        return self._models_map
+
+    @models_map.setter
+    def models_map(self, models_map):
+        self._models_map = models_map
+        self._models_matchers = [(AliasesMatcher(model_map["aliases"]), model_map["model"])
+                                 for model_map in models_map]
+
+    def check_in_aliases(self, system_description):
+        """Check if given system description is in aliases for current Operation System
+
+        :param str system_description: device system description from SNMPv2-MIB.sysDescr
+        :rtype: bool
+        """
+        return self._aliases_matcher.search(system_description)
+
     def get_device_model_type(self, system_description):
         """Find device model (switch, router, etc.) by device system description
 
         :param str system_description: device system description from SNMPv2-MIB.sysDescr
         :return:
         """
-        for model_map in self.models_map:
-            aliases_regexp = r"({})".format("|".join(model_map["aliases"]))
-            if re.search(aliases_regexp, system_description, flags=re.DOTALL):
-                return model_map["model"]
+        for aliases_matcher, model in self._models_matchers:
+            if aliases_matcher.search(system_description):
+                return model
 
         return self.default_model
 
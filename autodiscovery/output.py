@@ -1,3 +1,5 @@
+import threading
+
 import click
 
 
@@ -12,6 +14,10 @@ class EmptyOutput(AbstractOutput):
 
 
 class ConsoleOutput(AbstractOutput):
+    def __init__(self):
+        self._lock = threading.Lock()
+
     def send(self, message, error=False):
         fg = "red" if error else "green"
-        click.secho(message, fg=fg)
+        with self._lock:
+            click.secho(message, fg=fg)
@@ -2,7 +2,9 @@ import json
 
 import yaml
 from ipaddress import ip_address
+from ipaddress import ip_network
 
+from autodiscovery import config
 from autodiscovery.exceptions import AutoDiscoveryException
 from autodiscovery import models
 
@@ -26,43 +28,94 @@ class AbstractInputDataParser(object):
 
         :param unicode start_ip: first IP address in the range
         :param unicode last_ip:  last IP address in the range
-        :return: list of all IPs from the given range
+        :return: lazy range of all IPs from the given range
+        :rtype: models.IPRange
         """
         start_ip = ip_address(start_ip)
         last_ip = ip_address(last_ip)
-        result = []
+        intervals = [(int(start_ip), int(last_ip))] if start_ip <= last_ip else []
 
-        while start_ip <= last_ip:
-            result.append(str(start_ip))
-            start_ip += 1
+        return models.IPRange(intervals=intervals, version=start_ip.version)
 
-        return result
+    def _find_network_ips(self, network):
+        """Find all host IPs in the given network
+
+        Network and broadcast addresses of the IPv4 network are skipped
+
+        :param unicode network: network in the CIDR notation ("a.b.c.d/nn")
+        :rtype: models.IPRange
+        """
+        network = ip_network(network, strict=False)
+        first_ip = int(network.network_address)
+        last_ip = int(network.broadcast_address)
+
+        if network.version == 4 and last_ip - first_ip > 1:
+            first_ip += 1
+            last_ip -= 1
+
+        return models.IPRange(intervals=[(first_ip, last_ip)], version=network.version)
+
+    def _parse_ip_range(self, device_ips):
+        """Parse single IP, IP range ("a.b.c.d-e") or network in the CIDR notation ("a.b.c.d/nn")
+
+        IP ranges are supported only for IPv4, IPv6 addresses can be given as a network in the CIDR notation
+
+        :param str device_ips:
+        :rtype: models.IPRange
+        """
+        try:
+            if "/" in device_ips:
+                return self._find_network_ips(network=unicode(device_ips))
+
+            if "-" in device_ips and ":" in device_ips:
+                raise ValueError("IPv6 ranges aren't supported, use a network in the CIDR notation")
+
+            if "-" in device_ips:
+                first_ip, last_ip = device_ips.split("-")
+                first_ip_octets = first_ip.split(".")
+                last_ip_octets = last_ip.split(".")
+                last_ip = first_ip_octets[:4-len(last_ip_octets)] + last_ip_octets
+                return self._find_ips(start_ip=unicode(first_ip), last_ip=unicode(".".join(last_ip)))
+
+            return self._find_ips(start_ip=unicode(device_ips), last_ip=unicode(device_ips))
+
+        except ValueError as e:
+            raise AutoDiscoveryException("Invalid devices IPs '{}'. {}".format(device_ips, e))
 
     def _parse_devices_ips(self, devices_ips):
-        """Parse all devices IPs and IP ranges into a single list
+        """Parse all devices IPs and IP ranges into the lazy ranges of IPs
 
-        :param list[str] devices_ips:
+        Excluded IPs and IPs that were already given in the previous ranges are removed from the range
+
+        :param list[str|dict] devices_ips:
         :rtype: list[models.DeviceIPRange]
         """
         parsed_ips = []
+        previous_ranges = []
 
         for device_range in devices_ips:
             if isinstance(device_range, dict):
                 device_ips = device_range["range"]
                 domain = device_range.get("domain")
+                excluded_ips = device_range.get("exclude", [])
             else:
                 device_ips = device_range
                 domain = None
+                excluded_ips = []
 
-            if "-" in device_ips:
-                first_ip, last_ip = device_ips.split("-")
-                first_ip_octets = first_ip.split(".")
-                last_ip_octets = last_ip.split(".")
-                last_ip = first_ip_octets[:4-len(last_ip_octets)] + last_ip_octets
-                ip_range = self._find_ips(start_ip=unicode(first_ip), last_ip=unicode(".".join(last_ip)))
-            else:
-                ip_range = [device_ips]
+            if isinstance(excluded_ips, basestring):
+                excluded_ips = [excluded_ips]
+
+            ip_range = self._parse_ip_range(device_ips)
+
+            for excluded_range in [self._parse_ip_range(ips) for ips in excluded_ips] + previous_ranges:
+                ip_range = ip_range.difference(excluded_range)
+
+            if ip_range.size > config.MAX_DEVICES_IP_RANGE_SIZE:
+                raise AutoDiscoveryException("Devices IPs '{}' contain {} addresses, max allowed number is {}"
+                                             .format(device_ips, ip_range.size, config.MAX_DEVICES_IP_RANGE_SIZE))
 
+            previous_ranges.append(ip_range)
             parsed_ips.append(models.DeviceIPRange(ip_range=ip_range, domain=domain))
 
         return parsed_ips
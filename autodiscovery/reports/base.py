@@ -1,18 +1,19 @@
+import threading
+
 from autodiscovery.exceptions import ReportableException
 
 
 class AbstractReport(object):
     def __init__(self):
         self._entries = []
+        self._lock = threading.Lock()
 
     def add_entry(self, *args, **kwargs):
         """Add new Entry to the Report
 
         :rtype: Entry
         """
-        entry = self.entry_class(*args, **kwargs)
-        self._entries.append(entry)
-        return entry
+        return self.edit_entry(entry=self.entry_class(*args, **kwargs))
 
     def edit_entry(self, entry):
         """Add given Entry to the Report
@@ -20,9 +21,20 @@ class AbstractReport(object):
         :param Entry entry:
         :rtype: Entry
         """
-        self._entries.append(entry)
+        with self._lock:
+            self._entries.append(entry)
         return entry
 
+    def finish_entry(self, entry):
+        """Mark Entry as finished, it will not be changed anymore
+
+        Report keeps all entries until the "generate" call, stream reports write finished Entry right away
+
+        :param Entry entry:
+        :return:
+        """
+        pass
+
     def get_current_entry(self):
         """Get last added Entry from the Report"""
         if self._entries:
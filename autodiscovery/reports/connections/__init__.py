@@ -1,13 +1,25 @@
+import os
+
 from autodiscovery.reports.connections.excel import ExcelReport
+from autodiscovery.reports.connections.excel import StreamExcelReport
 from autodiscovery.reports.connections.console import ConsoleReport
+from autodiscovery.reports.connections.csv_report import CSVReport
+from autodiscovery.reports.connections.jsonl import JSONLReport
 
 
 REPORTS_MAP = {
     "console": ConsoleReport,
-    "excel": ExcelReport
+    "excel": ExcelReport,
+    "excel-stream": StreamExcelReport,
+    "csv": CSVReport,
+    "jsonl": JSONLReport
 }
 DEFAULT_REPORT_TYPE = "excel"
 REPORT_TYPES = REPORTS_MAP.keys()
+FILE_EXTENSIONS_REPORT_TYPES = {
+    CSVReport.FILE_EXTENSION: "csv",
+    JSONLReport.FILE_EXTENSION: "jsonl"
+}
 
 
 def get_report(report_file, report_type=DEFAULT_REPORT_TYPE):
@@ -19,3 +31,13 @@ def get_report(report_file, report_type=DEFAULT_REPORT_TYPE):
     """
     report_class = REPORTS_MAP.get(report_type)
     return report_class(report_file)
+
+
+def get_report_type(report_file):
+    """Get type of the report by its file extension, Excel report type is used for all other files
+
+    :param str report_file:
+    :rtype: str
+    """
+    _, extension = os.path.splitext(report_file)
+    return FILE_EXTENSIONS_REPORT_TYPES.get(extension.lower(), DEFAULT_REPORT_TYPE)
@@ -0,0 +1,6 @@
+from autodiscovery.reports.connections.base import AbstractConnectionsReport
+from autodiscovery.reports.csv_report import AbstractCSVReport
+
+
+class CSVReport(AbstractCSVReport, AbstractConnectionsReport):
+    DEFAULT_REPORT_FILE = "connect_ports_report{}".format(AbstractCSVReport.FILE_EXTENSION)
@@ -1,5 +1,6 @@
 from autodiscovery.reports.connections.base import AbstractConnectionsReport
 from autodiscovery.reports.excel import AbstractExcelReport
+from autodiscovery.reports.excel import AbstractStreamExcelReport
 
 
 class ExcelReport(AbstractExcelReport, AbstractConnectionsReport):
@@ -20,3 +21,7 @@ class ExcelReport(AbstractExcelReport, AbstractConnectionsReport):
             self.STATUS_HEADER: 20,
             self.COMMENT_HEADER: 40,
         }
+
+
+class StreamExcelReport(AbstractStreamExcelReport, ExcelReport):
+    pass
@@ -0,0 +1,6 @@
+from autodiscovery.reports.connections.base import AbstractConnectionsReport
+from autodiscovery.reports.jsonl import AbstractJSONLReport
+
+
+class JSONLReport(AbstractJSONLReport, AbstractConnectionsReport):
+    DEFAULT_REPORT_FILE = "connect_ports_report{}".format(AbstractJSONLReport.FILE_EXTENSION)
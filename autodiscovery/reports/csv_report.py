@@ -0,0 +1,63 @@
+import csv
+
+from autodiscovery.reports.stream import AbstractStreamReport
+
+
+class AbstractCSVReport(AbstractStreamReport):
+    FILE_EXTENSION = ".csv"
+    DEFAULT_REPORT_FILE = "report{}".format(FILE_EXTENSION)
+
+    def __init__(self, file_name=None):
+        """
+
+        :param str file_name:
+        """
+        super(AbstractCSVReport, self).__init__(file_name=file_name)
+        self._file = None
+        self._writer = None
+
+    def _encode_value(self, value):
+        """
+
+        :param value:
+        :rtype: str
+        """
+        if isinstance(value, unicode):
+            return value.encode("utf-8")
+
+        return value
+
+    def _start(self):
+        """Open the file and write the header"""
+        self._file = open(self.file_name, "wb")
+        self._writer = csv.writer(self._file)
+        self._write_row(self._header)
+
+    def _write_row(self, row):
+        """Write row and flush it, so the file contains all finished entries even if the process crashes
+
+        :param list row:
+        :return:
+        """
+        self._writer.writerow([self._encode_value(value) for value in row])
+        self._file.flush()
+
+    def _finish(self):
+        """Close the file"""
+        self._file.close()
+
+    def parse_entries_from_file(self, report_file):
+        """
+
+        :param str report_file: path to the report file
+        :rtype: list[Entry]
+        """
+        entries = []
+
+        with open(report_file, "rb") as csv_file:
+            for row in csv.DictReader(csv_file):
+                entry_attrs = {entry_attr: row.get(header) or ""
+                               for header, entry_attr in self._header_entry_map.iteritems()}
+                entries.append(self.entry_class(**entry_attrs))
+
+        return entries
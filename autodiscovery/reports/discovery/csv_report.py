@@ -0,0 +1,6 @@
+from autodiscovery.reports.discovery.base import AbstractDiscoveryReport
+from autodiscovery.reports.csv_report import AbstractCSVReport
+
+
+class CSVReport(AbstractCSVReport, AbstractDiscoveryReport):
+    DEFAULT_REPORT_FILE = "discovery_report{}".format(AbstractCSVReport.FILE_EXTENSION)
@@ -1,5 +1,6 @@
 from autodiscovery.reports.discovery.base import AbstractDiscoveryReport
 from autodiscovery.reports.excel import AbstractExcelReport
+from autodiscovery.reports.excel import AbstractStreamExcelReport
 
 
 class ExcelReport(AbstractExcelReport, AbstractDiscoveryReport):
@@ -25,3 +26,7 @@ class ExcelReport(AbstractExcelReport, AbstractDiscoveryReport):
             self.ADDED_TO_CLOUDSHELL_HEADER: 25,
             self.COMMENT_HEADER: 40,
         }
+
+
+class StreamExcelReport(AbstractStreamExcelReport, ExcelReport):
+    pass
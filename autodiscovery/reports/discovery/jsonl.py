@@ -0,0 +1,6 @@
+from autodiscovery.reports.discovery.base import AbstractDiscoveryReport
+from autodiscovery.reports.jsonl import AbstractJSONLReport
+
+
+class JSONLReport(AbstractJSONLReport, AbstractDiscoveryReport):
+    DEFAULT_REPORT_FILE = "discovery_report{}".format(AbstractJSONLReport.FILE_EXTENSION)
@@ -4,6 +4,7 @@ import xlsxwriter
 from openpyxl import load_workbook
 
 from autodiscovery.reports.base import AbstractReport
+from autodiscovery.reports.stream import AbstractStreamReport
 
 
 class AbstractExcelReport(AbstractReport):
@@ -115,4 +116,41 @@ class AbstractExcelReport(AbstractReport):
             entry = self.entry_class(**entry_attrs)
             entries.append(entry)
 
-        return entries
\ No newline at end of file
+        return entries
+
+
+class AbstractStreamExcelReport(AbstractStreamReport):
+    def __init__(self, file_name=None):
+        """Excel report that writes each finished Entry in the constant memory mode
+
+        Rows are flushed to the temporary file right away, but the .xlsx file itself
+        is created only on the "generate" call
+
+        :param str file_name:
+        """
+        super(AbstractStreamExcelReport, self).__init__(file_name=file_name)
+        self._workbook = None
+        self._worksheet = None
+        self._row_num = 0
+
+    def _start(self):
+        """Create Workbook and write the bold header"""
+        self._workbook = xlsxwriter.Workbook(self.file_name, {"constant_memory": True})
+        self._worksheet = self._workbook.add_worksheet()
+        # format columns width
+        self._format_columns_width(self._worksheet)
+        self._worksheet.write_row(0, 0, self._header, self._workbook.add_format({'bold': True}))
+        self._row_num = 1
+
+    def _write_row(self, row):
+        """
+
+        :param list row:
+        :return:
+        """
+        self._worksheet.write_row(self._row_num, 0, row)
+        self._row_num += 1
+
+    def _finish(self):
+        """Save the Workbook into the excel file"""
+        self._workbook.close()
@@ -0,0 +1,55 @@
+import collections
+import json
+
+from autodiscovery.reports.stream import AbstractStreamReport
+
+
+class AbstractJSONLReport(AbstractStreamReport):
+    FILE_EXTENSION = ".jsonl"
+    DEFAULT_REPORT_FILE = "report{}".format(FILE_EXTENSION)
+
+    def __init__(self, file_name=None):
+        """Report with one JSON object per Entry on each line
+
+        :param str file_name:
+        """
+        super(AbstractJSONLReport, self).__init__(file_name=file_name)
+        self._file = None
+
+    def _start(self):
+        """Open the file"""
+        self._file = open(self.file_name, "w")
+
+    def _write_row(self, row):
+        """Write row and flush it, so the file contains all finished entries even if the process crashes
+
+        :param list row:
+        :return:
+        """
+        self._file.write(json.dumps(collections.OrderedDict(zip(self._header, row))))
+        self._file.write("\n")
+        self._file.flush()
+
+    def _finish(self):
+        """Close the file"""
+        self._file.close()
+
+    def parse_entries_from_file(self, report_file):
+        """
+
+        :param str report_file: path to the report file
+        :rtype: list[Entry]
+        """
+        entries = []
+
+        with open(report_file) as jsonl_file:
+            for line in jsonl_file:
+                if not line.strip():
+                    continue
+
+                row = json.loads(line)
+                entry_attrs = {entry_attr: row.get(header) or ""
+                               for header, entry_attr in self._header_entry_map.iteritems()}
+                entries.append(self.entry_class(**entry_attrs))
+
+        return entries
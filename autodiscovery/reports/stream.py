@@ -0,0 +1,115 @@
+import collections
+import threading
+
+from autodiscovery.reports.base import AbstractReport
+
+
+class AbstractStreamReport(AbstractReport):
+    def __init__(self, file_name=None):
+        """Report that writes each finished Entry to the file as soon as all entries added before it are finished
+
+        Rows are written in the order the entries were added. Only entries that aren't written yet are kept
+        in the memory: not finished ones and finished ones that wait for the earlier entries. Not finished entries
+        are written on the "generate" call
+
+        :param str file_name:
+        """
+        super(AbstractStreamReport, self).__init__()
+
+        if file_name is None:
+            file_name = self.DEFAULT_REPORT_FILE
+        elif not file_name.lower().endswith(self.FILE_EXTENSION):
+            file_name += self.FILE_EXTENSION
+
+        self.file_name = file_name
+        self._entries = collections.OrderedDict()
+        self._current_entry = None
+        self._started = False
+        self._write_lock = threading.Lock()
+
+    def edit_entry(self, entry):
+        """Add given Entry to the Report
+
+        :param Entry entry:
+        :rtype: Entry
+        """
+        with self._lock:
+            self._entries.setdefault(entry, False)
+            self._current_entry = entry
+        return entry
+
+    def get_current_entry(self):
+        """Get last added Entry from the Report"""
+        return self._current_entry
+
+    def finish_entry(self, entry):
+        """Mark Entry as finished and write all finished entries that aren't preceded by not finished ones
+
+        Written entries are removed from the memory
+
+        :param Entry entry:
+        :return:
+        """
+        # rows are taken and written under the same lock, so they are written in the order they were taken
+        with self._write_lock:
+            with self._lock:
+                if entry not in self._entries:
+                    return
+
+                self._entries[entry] = True
+                entries = []
+
+                for added_entry, finished in self._entries.iteritems():
+                    if not finished:
+                        break
+                    entries.append(added_entry)
+
+                for finished_entry in entries:
+                    del self._entries[finished_entry]
+
+            for finished_entry in entries:
+                self._write_entry(finished_entry)
+
+    def _write_entry(self, entry):
+        """Write Entry to the file, should be called under the write lock
+
+        :param Entry entry:
+        :return:
+        """
+        if not self._started:
+            self._start()
+            self._started = True
+
+        self._write_row([getattr(entry, attr) for attr in self._header_entry_map.values()])
+
+    def generate(self):
+        """Write all not finished entries and close the file"""
+        with self._lock:
+            entries, self._entries = self._entries.keys(), collections.OrderedDict()
+
+        with self._write_lock:
+            if not self._started:
+                self._start()
+                self._started = True
+
+            for entry in entries:
+                self._write_entry(entry)
+
+            self._finish()
+            self._started = False
+
+    def _start(self):
+        """Open the file and write the header"""
+        raise NotImplementedError("Class {} must implement method '_start'".format(type(self)))
+
+    def _write_row(self, row):
+        """Write row with Entry attributes values to the file
+
+        :param list row:
+        :return:
+        """
+        raise NotImplementedError("Class {} must implement method '_write_row'".format(type(self)))
+
+    def _finish(self):
+        """Close the file"""
+        raise NotImplementedError("Class {} must implement method '_finish'".format(type(self)))
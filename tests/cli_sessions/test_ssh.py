@@ -1,6 +1,8 @@
 import unittest
 
 import mock
+from paramiko import AuthenticationException
+from paramiko import SSHException
 
 from autodiscovery.cli_sessions import SSHDiscoverySession
 from autodiscovery.exceptions import AutoDiscoveryException
@@ -20,8 +22,9 @@ class TestSSHDiscoverySession(unittest.TestCase):
         enable_prompt = "$"
         valid_creds = mock.MagicMock()
         output_str = mock.MagicMock()
+        transport = mock.MagicMock()
         self.ssh_session._check_enable_password = mock.MagicMock(return_value=valid_creds)
-        self.ssh_session._handler = mock.MagicMock()
+        self.ssh_session._connect = mock.MagicMock(return_value=transport)
         self.ssh_session.hardware_expect = mock.MagicMock(return_value=output_str)
         # act
         result = self.ssh_session.check_credentials(cli_credentials=cli_credentials,
@@ -30,7 +33,8 @@ class TestSSHDiscoverySession(unittest.TestCase):
                                                     logger=self.logger)
         # verify
         self.assertEqual(result, valid_creds)
-        self.ssh_session._handler.close.assert_called_once_with()
+        transport.auth_password.assert_called_once_with(credentials.user, credentials.password)
+        transport.close.assert_called_once_with()
         self.ssh_session.hardware_expect.assert_called_once_with(None,
                                                                  expected_string="#|$",
                                                                  timeout=self.ssh_session._timeout,
@@ -42,6 +46,51 @@ class TestSSHDiscoverySession(unittest.TestCase):
                                                                         output_str=output_str,
                                                                         logger=self.logger)
 
+    @mock.patch("autodiscovery.cli_sessions.ssh.paramiko")
+    def test_check_credentials_reuses_transport(self, paramiko):
+        """Check that method will try all credentials on the same SSH transport"""
+        paramiko.AuthenticationException = AuthenticationException
+        paramiko.SSHException = SSHException
+        valid_credentials = mock.MagicMock()
+        cli_credentials = mock.MagicMock(cli_credentials=[mock.MagicMock(), valid_credentials])
+        transport = mock.MagicMock()
+        transport.auth_password.side_effect = [AuthenticationException(), None]
+        self.ssh_session._connect = mock.MagicMock(return_value=transport)
+        self.ssh_session._check_enable_password = mock.MagicMock(side_effect=lambda **kwargs: kwargs["valid_creds"])
+        self.ssh_session.hardware_expect = mock.MagicMock()
+        # act
+        result = self.ssh_session.check_credentials(cli_credentials=cli_credentials,
+                                                    default_prompt="#",
+                                                    enable_prompt="$",
+                                                    logger=self.logger)
+        # verify
+        self.assertEqual(result, valid_credentials)
+        self.ssh_session._connect.assert_called_once_with()
+        self.assertEqual(transport.auth_password.call_count, 2)
+
+    @mock.patch("autodiscovery.cli_sessions.ssh.paramiko")
+    def test_check_credentials_reconnects_closed_transport(self, paramiko):
+        """Check that method will reopen SSH transport if the device has closed it"""
+        paramiko.AuthenticationException = AuthenticationException
+        paramiko.SSHException = SSHException
+        valid_credentials = mock.MagicMock()
+        cli_credentials = mock.MagicMock(cli_credentials=[valid_credentials])
+        closed_transport = mock.MagicMock(is_active=mock.MagicMock(return_value=False),
+                                          auth_password=mock.MagicMock(side_effect=SSHException()))
+        transport = mock.MagicMock()
+        self.ssh_session._connect = mock.MagicMock(side_effect=[closed_transport, transport])
+        self.ssh_session._check_enable_password = mock.MagicMock(side_effect=lambda **kwargs: kwargs["valid_creds"])
+        self.ssh_session.hardware_expect = mock.MagicMock()
+        # act
+        result = self.ssh_session.check_credentials(cli_credentials=cli_credentials,
+                                                    default_prompt="#",
+                                                    enable_prompt="$",
+                                                    logger=self.logger)
+        # verify
+        self.assertEqual(result, valid_credentials)
+        closed_transport.close.assert_called_once_with()
+        transport.auth_password.assert_called_once_with(valid_credentials.user, valid_credentials.password)
+
     def test_check_credentials_no_valid_credentials(self):
         """Check that method will raise AutoDiscoveryException if any credentials aren't valid"""
         cli_credentials = mock.MagicMock(cli_credentials=[])
@@ -51,47 +51,37 @@ class TestRunCommand(unittest.TestCase):
         # verify
         self.assertEqual(result, [('Port 2', 'test adjacent attr')])
 
-    @mock.patch("autodiscovery.commands.connect_ports.AttributeNameValue")
-    def test_find_resource_by_sys_name(self, attribute_name_value_class):
-        """Check that method will return full name if the found resource"""
-        family_name = "Test Family Name"
-        sys_name = "Test Sys Name"
-        cs_session = mock.MagicMock(GetResourceList=mock.MagicMock(return_value=mock.MagicMock(
-            Resources=[mock.MagicMock(ResourceFamilyName=family_name)])))
-
-        cs_session.FindResources.side_effect = [mock.MagicMock(Resources=[mock.MagicMock()]),
-                                                mock.MagicMock(Resources=[])]
+    def test_find_resource_by_sys_name(self):
+        """Check that method will return details of the resource found in the System Names index"""
+        cs_session = mock.MagicMock()
+        cs_system_names_index = mock.MagicMock()
+        cs_system_names_index.find_resources.return_value = ["Test Resource"]
+        self.connect_ports_command.cs_system_names_index = cs_system_names_index
         # act
-        result = self.connect_ports_command._find_resource_by_sys_name(cs_session=cs_session, sys_name=sys_name)
+        result = self.connect_ports_command._find_resource_by_sys_name(cs_session=cs_session,
+                                                                       sys_name="Test Sys Name")
         # verify
-
-        cs_session.FindResources.assert_any_call(includeSubResources=False,
-                                                 resourceFamily='',
-                                                 attributeValues=[attribute_name_value_class()])
-
-        cs_session.FindResources.assert_any_call(includeSubResources=False,
-                                                 resourceFamily=family_name,
-                                                 attributeValues=[attribute_name_value_class()])
-
-        self.assertEqual(result, cs_session.GetResourceDetails())
+        cs_system_names_index.find_resources.assert_called_once_with(cs_session=cs_session, sys_name="Test Sys Name")
+        cs_session.GetResourceDetails.assert_called_once_with("Test Resource")
+        self.assertEqual(result, cs_session.GetResourceDetails.return_value)
 
     def test_find_resource_by_sys_name_no_such_resource(self):
         """Check that method will raise ReportableException if it fails to find resource"""
-        sys_name = "Test Sys Name"
-        cs_session = mock.MagicMock()
-        cs_session.FindResources.return_value.Resources = []
+        self.connect_ports_command.cs_system_names_index = mock.MagicMock(
+            find_resources=mock.MagicMock(return_value=[]))
         # act
         with self.assertRaisesRegexp(ReportableException, "Unable to find resource"):
-            self.connect_ports_command._find_resource_by_sys_name(cs_session=cs_session, sys_name=sys_name)
+            self.connect_ports_command._find_resource_by_sys_name(cs_session=mock.MagicMock(),
+                                                                  sys_name="Test Sys Name")
 
     def test_find_resource_by_sys_name_finds_several_resources(self):
         """Check that method will raise ReportableException if it finds several resources"""
-        sys_name = "Test Sys Name"
-        cs_session = mock.MagicMock()
-        cs_session.FindResources.return_value.Resources = [mock.MagicMock(), mock.MagicMock()]
+        self.connect_ports_command.cs_system_names_index = mock.MagicMock(
+            find_resources=mock.MagicMock(return_value=["Resource 1", "Resource 2"]))
         # act
         with self.assertRaisesRegexp(ReportableException, "Found several resources"):
-            self.connect_ports_command._find_resource_by_sys_name(cs_session=cs_session, sys_name=sys_name)
+            self.connect_ports_command._find_resource_by_sys_name(cs_session=mock.MagicMock(),
+                                                                  sys_name="Test Sys Name")
 
     def test_find_port_by_adjacent_name(self):
         port_name = "Test Port Name"
@@ -103,6 +93,22 @@ class TestRunCommand(unittest.TestCase):
         # verify
         self.assertEquals(result, port)
 
+    def test_find_port_by_adjacent_name_walks_ports_once(self):
+        """Check that ports of the adjacent resource will be walked only once for all its adjacent ports"""
+        port_1 = mock.MagicMock(Name="10.10.10.10/Chassis 1/Module 1/Eth 2-1")
+        port_2 = mock.MagicMock(Name="10.10.10.10/Chassis 1/Module 1/Eth 2-2")
+        adjacent_resource = mock.MagicMock()
+        adjacent_resource.Name = "Switch 1"
+        self.connect_ports_command._find_ports = mock.MagicMock(return_value=[port_1, port_2])
+        self.connect_ports_command._find_port_by_adjacent_name(adjacent_resource=adjacent_resource,
+                                                               adjacent_port_name="Eth 2/1")
+        # act
+        result = self.connect_ports_command._find_port_by_adjacent_name(adjacent_resource=adjacent_resource,
+                                                                        adjacent_port_name="Eth 2.2")
+        # verify
+        self.assertEqual(result, port_2)
+        self.connect_ports_command._find_ports.assert_called_once_with(adjacent_resource)
+
     def test_find_port_by_adjacent_name_no_such_port(self):
         port_name = "Test Port Name"
         port = mock.MagicMock(Name="10.10.10.10/Chassis 1/Module 1/Other Port Name")
@@ -118,7 +124,7 @@ class TestRunCommand(unittest.TestCase):
         port_name = "Port 1"
         adjacent = "Device 1 through Eth 2/1"
         cs_session = mock.MagicMock()
-        self.cs_session_manager.get_session.return_value = cs_session
+        self.cs_session_manager.session.return_value.__enter__.return_value = cs_session
         self.connect_ports_command._find_adjacent_ports = mock.MagicMock(return_value=[(port_name, adjacent)])
         self.connect_ports_command._find_resource_by_sys_name = mock.MagicMock()
         self.connect_ports_command._find_port_by_adjacent_name = mock.MagicMock()
@@ -146,7 +152,7 @@ class TestRunCommand(unittest.TestCase):
         port_name = "Port 1"
         adjacent = "Device 1 through Eth 2/1"
         cs_session = mock.MagicMock()
-        self.cs_session_manager.get_session.return_value = cs_session
+        self.cs_session_manager.session.return_value.__enter__.return_value = cs_session
         self.connect_ports_command._find_adjacent_ports = mock.MagicMock(return_value=[(port_name, adjacent)])
         self.connect_ports_command._find_resource_by_sys_name = mock.MagicMock(side_effect=ReportableException)
         # act
@@ -169,7 +175,7 @@ class TestRunCommand(unittest.TestCase):
         port_name = "Port 1"
         adjacent = "Device 1 through Eth 2/1"
         cs_session = mock.MagicMock()
-        self.cs_session_manager.get_session.return_value = cs_session
+        self.cs_session_manager.session.return_value.__enter__.return_value = cs_session
         self.connect_ports_command._find_adjacent_ports = mock.MagicMock(return_value=[(port_name, adjacent)])
         self.connect_ports_command._find_resource_by_sys_name = mock.MagicMock(side_effect=Exception)
         # act
@@ -185,3 +191,35 @@ class TestRunCommand(unittest.TestCase):
 
         self.report.generate.assert_called_once_with()
         self.logger.exception.assert_called_once()
+
+    def test_execute_with_workers_keeps_report_order(self):
+        """Check that ports processed concurrently will be added to the report in the order of resources and ports"""
+        adjacent_ports = {"Resource {}".format(i): [("Resource {} Port {}".format(i, j), "Device through Eth 1/{}"
+                                                     .format(j)) for j in range(5)] for i in range(4)}
+        self.connect_ports_command.workers = 4
+        self.connect_ports_command._get_resource_adjacent_ports = mock.MagicMock(
+            side_effect=lambda resource_name, domain: adjacent_ports[resource_name])
+        self.connect_ports_command._find_resource_by_sys_name = mock.MagicMock()
+        self.connect_ports_command._find_port_by_adjacent_name = mock.MagicMock()
+        connected_ports = []
+        self.connect_ports_command._connect_port = lambda port_data: connected_ports.append(port_data[0])
+        resources_names = sorted(adjacent_ports)
+        # act
+        self.connect_ports_command.execute(resources_names=resources_names, domain="Global")
+        # verify
+        expected_ports = [port for resource_name in resources_names for port, _ in adjacent_ports[resource_name]]
+        self.assertEqual([call[1]["source_port"] for call in self.report.add_entry.call_args_list], expected_ports)
+        self.assertEqual(sorted(connected_ports), sorted(expected_ports))
+        self.report.generate.assert_called_once_with()
+
+    def test_execute_skips_resource_that_failed_to_load(self):
+        """Check that ports will not be added to the report for the resource which details weren't loaded"""
+        self.cs_session_manager.session.return_value.__enter__.return_value.GetResourceDetails.side_effect = \
+            Exception("resource not found")
+        # act
+        self.connect_ports_command.execute(resources_names=["Test Resource"], domain="Global")
+        # verify
+        self.report.add_entry.assert_not_called()
+        self.output.send.assert_any_call("Failed to update physical connections for the resource 'Test Resource'. "
+                                         "See log for the details", error=True)
+        self.report.generate.assert_called_once_with()
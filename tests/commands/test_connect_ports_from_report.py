@@ -4,6 +4,7 @@ import mock
 
 from autodiscovery.commands import ConnectPortsFromReportCommand
 from autodiscovery.exceptions import ReportableException
+from autodiscovery.reports.connections.base import Entry
 
 
 class TestConnectPortsFromReportCommand(unittest.TestCase):
@@ -21,30 +22,30 @@ class TestConnectPortsFromReportCommand(unittest.TestCase):
         """Check that method will call UpdatePhysicalConnection API command"""
         entry_data = mock.MagicMock()
         cs_session = mock.MagicMock()
-        self.cs_session_manager.get_session.return_value = cs_session
+        self.cs_session_manager.session.return_value.__enter__.return_value = cs_session
         # act
         self.connect_ports_command.execute(parsed_entries=[entry_data])
         # verify
         self.report.edit_entry.assert_called_once_with(entry=entry_data)
-        self.cs_session_manager.get_session.assert_called_once_with(
+        self.cs_session_manager.session.assert_called_once_with(
             cs_domain=self.report.edit_entry().__enter__().domain)
 
         cs_session.UpdatePhysicalConnection.assert_called_once_with(
-            resourceAFullPath=entry_data.source_port,
-            resourceBFullPath=entry_data.target_port)
+            resourceAFullPath=self.report.edit_entry().__enter__().source_port,
+            resourceBFullPath=self.report.edit_entry().__enter__().target_port)
 
         self.report.generate.assert_called_once_with()
 
     def test_execute_handles_reportable_exception(self):
         """Check that method will handle ReportableException and will generate report"""
         entry_data = mock.MagicMock()
-        self.cs_session_manager.get_session.side_effect = ReportableException()
+        self.cs_session_manager.session.side_effect = ReportableException()
         # act
         self.connect_ports_command.execute(parsed_entries=[entry_data])
 
         # verify
         self.report.edit_entry.assert_called_once_with(entry=entry_data)
-        self.cs_session_manager.get_session.assert_called_once_with(
+        self.cs_session_manager.session.assert_called_once_with(
             cs_domain=self.report.edit_entry().__enter__().domain)
 
         self.report.generate.assert_called_once_with()
@@ -53,14 +54,82 @@ class TestConnectPortsFromReportCommand(unittest.TestCase):
     def test_execute_handles_exception(self):
         """Check that method will handle Exception and will generate report"""
         entry_data = mock.MagicMock()
-        self.cs_session_manager.get_session.side_effect = Exception()
+        self.cs_session_manager.session.side_effect = Exception()
         # act
         self.connect_ports_command.execute(parsed_entries=[entry_data])
 
         # verify
         self.report.edit_entry.assert_called_once_with(entry=entry_data)
-        self.cs_session_manager.get_session.assert_called_once_with(
+        self.cs_session_manager.session.assert_called_once_with(
             cs_domain=self.report.edit_entry().__enter__().domain)
 
         self.report.generate.assert_called_once_with()
         self.logger.exception.assert_called_once()
+
+    def _get_entry(self, source_port, target_port, domain="Global", status=Entry.FAILED_STATUS):
+        return Entry(resource_name="", source_port=source_port, adjacent="", target_port=target_port,
+                     domain=domain, status=status)
+
+    def test_execute_detects_duplicate_ports(self):
+        """Check that connections with the port used several times will fail before any API call"""
+        self.report.edit_entry.side_effect = lambda entry: entry
+        entries = [self._get_entry("Switch 1/Port 1", "Switch 2/Port 1"),
+                   self._get_entry("Switch 1/Port 2", "Switch 2/Port 2"),
+                   self._get_entry("switch 1/port 1", "Switch 3/Port 1"),
+                   self._get_entry("Switch 1/Port 1", "Switch 4/Port 1", domain="Test")]
+        cs_session = mock.MagicMock()
+        self.cs_session_manager.session.return_value.__enter__.return_value = cs_session
+        # act
+        self.connect_ports_command.execute(parsed_entries=entries)
+        # verify
+        self.assertEqual([entry.status for entry in entries],
+                         [Entry.FAILED_STATUS, Entry.SUCCESS_STATUS, Entry.FAILED_STATUS, Entry.SUCCESS_STATUS])
+        self.assertEqual(entries[0].comment, "Port 'Switch 1/Port 1' is used in several connections")
+        self.assertEqual(cs_session.UpdatePhysicalConnection.call_count, 2)
+
+    def test_execute_groups_entries_by_domain(self):
+        """Check that connections will be processed concurrently domain by domain"""
+        self.report.edit_entry.side_effect = lambda entry: entry
+        self.connect_ports_command.workers = 3
+        entries = [self._get_entry("Switch {}/Port 1".format(i), "Switch {}/Port 2".format(i),
+                                   domain="Global" if i % 2 else "Test") for i in range(6)]
+        domains = []
+        self.cs_session_manager.session.side_effect = lambda cs_domain: domains.append(cs_domain) or mock.MagicMock()
+        # act
+        self.connect_ports_command.execute(parsed_entries=entries)
+        # verify
+        self.assertEqual(domains, ["Test"] * 3 + ["Global"] * 3)
+        self.assertTrue(all(entry.status == Entry.SUCCESS_STATUS for entry in entries))
+        self.report.generate.assert_called_once_with()
+
+    def test_execute_dry_run(self):
+        """Check that dry run will check that ports exist and will not create any connections"""
+        self.report.edit_entry.side_effect = lambda entry: entry
+        self.connect_ports_command.dry_run = True
+        entries = [self._get_entry("Switch 1/Port 1", "Switch 2/Port 1"),
+                   self._get_entry("Switch 1/Port 2", "Switch 2/Port 5"),
+                   self._get_entry("Switch 1/Port 3", "Switch 3/Port 1")]
+        switches = {"Switch 1": ["Switch 1/Port 1", "Switch 1/Port 2", "Switch 1/Port 3"],
+                    "Switch 2": ["Switch 2/Port 1"]}
+
+        def get_resource_details(resource_name):
+            if resource_name not in switches:
+                raise Exception("resource not found")
+            return mock.MagicMock(ChildResources=[mock.MagicMock(ChildResources=[], **{"Name": port})
+                                                  for port in switches[resource_name]],
+                                  **{"Name": resource_name})
+
+        cs_session = mock.MagicMock(domain="Global")
+        cs_session.GetResourceDetails.side_effect = get_resource_details
+        self.cs_session_manager.session.return_value.__enter__.return_value = cs_session
+        # act
+        self.connect_ports_command.execute(parsed_entries=entries)
+        # verify
+        self.assertEqual(entries[0].status, Entry.FAILED_STATUS)
+        self.assertEqual(entries[0].comment, "")
+        self.assertEqual(entries[1].comment, "Port 'Switch 2/Port 5' doesn't exist on the CloudShell")
+        self.assertEqual(entries[2].comment, "Port 'Switch 3/Port 1' doesn't exist on the CloudShell")
+        cs_session.UpdatePhysicalConnection.assert_not_called()
+        # each root resource is loaded only once
+        self.assertEqual(sorted(call[0][0] for call in cs_session.GetResourceDetails.call_args_list),
+                         ["Switch 1", "Switch 2", "Switch 3"])
@@ -4,6 +4,7 @@ import mock
 
 from autodiscovery.commands import RunCommand
 from autodiscovery.exceptions import ReportableException
+from autodiscovery.reports.discovery.base import Entry
 
 
 class TestRunCommand(unittest.TestCase):
@@ -47,6 +48,68 @@ class TestRunCommand(unittest.TestCase):
             self.run_command._get_snmp_handler(device_ip="10.10.10.10",
                                                snmp_comunity_strings=[snmp_community])
 
+    @mock.patch("autodiscovery.commands.run.QualiSnmp")
+    def test_get_snmp_handler_tries_learned_community_first(self, quali_snmp_class):
+        """Check that community string that was valid for the neighbour device will be tried first"""
+        snmp_community = "learned snmp community"
+        self.run_command.snmp_community_cache.learn(device_ip="10.10.10.1", snmp_community=snmp_community)
+        self.run_command._get_snmp_handler_for_community = mock.MagicMock(
+            return_value=(quali_snmp_class(), snmp_community))
+        # act
+        result = self.run_command._get_snmp_handler(device_ip="10.10.10.10",
+                                                    snmp_comunity_strings=["other community", snmp_community])
+        # verify
+        self.assertEqual(result, (quali_snmp_class(), snmp_community))
+        self.run_command._get_snmp_handler_for_community.assert_called_once_with(device_ip="10.10.10.10",
+                                                                                 snmp_community=snmp_community)
+
+    @mock.patch("autodiscovery.commands.run.QualiSnmp")
+    def test_get_snmp_handler_learns_valid_community(self, quali_snmp_class):
+        """Check that method will try all community strings and remember the valid one for the subnet"""
+        snmp_community = "valid snmp community"
+        quali_snmp = mock.MagicMock()
+
+        def create_quali_snmp(snmp_parameters, logger):
+            if snmp_parameters.snmp_community != snmp_community:
+                raise Exception("SNMP timeout")
+            return quali_snmp
+
+        quali_snmp_class.side_effect = create_quali_snmp
+        # act
+        result = self.run_command._get_snmp_handler(device_ip="10.10.10.10",
+                                                    snmp_comunity_strings=["invalid community", snmp_community])
+        # verify
+        self.assertEqual(result, (quali_snmp, snmp_community))
+        self.assertEqual(self.run_command.snmp_community_cache.get(device_ip="10.10.10.20"), snmp_community)
+
+    def test_get_snmp_handler_tries_communities_in_order(self):
+        """Check that community strings will be tried one by one and the first valid one will be used"""
+        self.run_command._get_snmp_handler_for_community = mock.MagicMock(
+            side_effect=lambda device_ip, snmp_community: None if snmp_community == "invalid" else (
+                mock.sentinel.snmp_handler, snmp_community))
+        # act
+        result = self.run_command._get_snmp_handler(device_ip="10.10.10.10",
+                                                    snmp_comunity_strings=["invalid", "first valid", "second valid"])
+        # verify
+        self.assertEqual(result, (mock.sentinel.snmp_handler, "first valid"))
+        self.assertEqual(self.run_command._get_snmp_handler_for_community.call_args_list,
+                         [mock.call(device_ip="10.10.10.10", snmp_community="invalid"),
+                          mock.call(device_ip="10.10.10.10", snmp_community="first valid")])
+
+    @mock.patch("autodiscovery.commands.run.parallel_first")
+    def test_get_snmp_handler_concurrent_communities(self, parallel_first):
+        """Check that community strings will be tried concurrently if concurrent SNMP communities are enabled"""
+        self.run_command.concurrent_snmp_communities = True
+        self.addCleanup(self.run_command._close_snmp_community_pool)
+        parallel_first.return_value = (mock.sentinel.snmp_handler, "valid")
+        # act
+        result = self.run_command._get_snmp_handler(device_ip="10.10.10.10",
+                                                    snmp_comunity_strings=["invalid", "valid"])
+        # verify
+        self.assertEqual(result, (mock.sentinel.snmp_handler, "valid"))
+        parallel_first.assert_called_once_with(mock.ANY, ["invalid", "valid"],
+                                               pool=self.run_command._get_snmp_community_pool())
+
     def test_execute(self):
         """Check that method will discover and upload entry"""
         vendor_settings = mock.MagicMock()
@@ -67,15 +130,16 @@ class TestRunCommand(unittest.TestCase):
                                                       ip=ip,
                                                       offline=False)
 
-        self.cs_session_manager.get_session.assert_called_once_with(cs_domain=device_data.domain)
+        self.cs_session_manager.session.assert_called_once_with(cs_domain=handler.discover.return_value.domain)
         self.report.generate.assert_called_once_with()
         handler.discover.assert_called_once_with(entry=self.report.add_entry().__enter__(),
                                                  vendor=self.data_processor.load_vendor_config().get_vendor(),
-                                                 vendor_settings=vendor_settings)
+                                                 vendor_settings=vendor_settings,
+                                                 cli_ports_states=None)
 
         handler.upload.assert_called_once_with(entry=handler.discover(),
                                                vendor=self.data_processor.load_vendor_config().get_vendor(),
-                                               cs_session=self.cs_session_manager.get_session())
+                                               cs_session=self.cs_session_manager.session().__enter__())
 
     def test_execute_handles_exception(self):
         """Check that method will handle Exception and will generate report"""
@@ -117,3 +181,342 @@ class TestRunCommand(unittest.TestCase):
 
         self.report.generate.assert_called_once_with()
         self.logger.exception.assert_called_once()
+
+    def test_execute_with_several_workers(self):
+        """Check that method will discover all devices concurrently and add entries in the order of the IPs"""
+        vendor_settings = mock.MagicMock()
+        ips = ["10.10.10.{}".format(i) for i in range(10)]
+        device_data = mock.MagicMock(ip_range=ips)
+        processed_entries = []
+        self.run_command.workers = 4
+        # list.append is atomic, unlike the call counter of the mock object
+        self.run_command._process_device = lambda report_entry, **kwargs: processed_entries.append(report_entry)
+        # act
+        self.run_command.execute(devices_ips=[device_data],
+                                 snmp_comunity_strings=["snmp community string"],
+                                 vendor_settings=vendor_settings,
+                                 additional_vendors_data=None)
+        # verify
+        self.assertEqual(self.report.add_entry.call_args_list,
+                         [mock.call(ip=ip, domain=device_data.domain, offline=False) for ip in ips])
+        self.assertEqual(len(processed_entries), len(ips))
+        self.report.generate.assert_called_once_with()
+
+    def test_execute_with_prescan(self):
+        """Check that method will not discover devices that were dropped by the pre-scan"""
+        vendor_settings = mock.MagicMock()
+        alive_ip = "10.10.10.10"
+        dead_ip = "10.10.10.11"
+        device_data = mock.MagicMock(ip_range=[alive_ip, dead_ip])
+        prescanned_ips = []
+        prescanner = mock.MagicMock()
+        prescanner.find_alive_hosts.side_effect = lambda ips: prescanned_ips.extend(ips) or {alive_ip: {}}
+        self.run_command.prescanner = prescanner
+        self.run_command._discover_device = mock.MagicMock()
+        self.report.add_entry.side_effect = lambda ip, domain, offline: mock.MagicMock(
+            ip=ip, __enter__=mock.MagicMock(return_value=mock.MagicMock(ip=ip)))
+        # act
+        self.run_command.execute(devices_ips=[device_data],
+                                 snmp_comunity_strings=["snmp community string"],
+                                 vendor_settings=vendor_settings,
+                                 additional_vendors_data=None)
+        # verify
+        self.assertEqual(prescanned_ips, [alive_ip, dead_ip])
+        self.run_command._discover_device.assert_called_once()
+        self.assertEqual(self.run_command._discover_device.call_args[1]["entry"].ip, alive_ip)
+        self.output.send.assert_any_call("Failed to discover {} device. Device is unreachable".format(dead_ip),
+                                         error=True)
+
+    def test_execute_with_cli_ports_prescanner(self):
+        """Check that method will pass CLI ports states that were probed on all devices at once to the handler"""
+        ip = "10.10.10.10"
+        device_data = mock.MagicMock(ip_range=[ip])
+        ports_states = {22: "closed", 23: "open"}
+        handler = mock.MagicMock()
+        cli_ports_prescanner = mock.MagicMock(ports=[22, 23])
+        cli_ports_prescanner.probe_hosts.side_effect = lambda ips: {ip: ports_states for ip in ips}
+        self.run_command.cli_ports_prescanner = cli_ports_prescanner
+        self.run_command._discover_device = mock.MagicMock(return_value=mock.MagicMock(ip=ip))
+        self.run_command.vendor_type_handlers_map = mock.MagicMock(__getitem__=mock.MagicMock(return_value=handler))
+        self.report.add_entry.return_value.ip = ip
+        # act
+        self.run_command.execute(devices_ips=[device_data],
+                                 snmp_comunity_strings=["snmp community string"],
+                                 vendor_settings=mock.MagicMock(),
+                                 additional_vendors_data=None)
+        # verify
+        cli_ports_prescanner.probe_hosts.assert_called_once()
+        self.assertEqual(handler.discover.call_args[1]["cli_ports_states"], ports_states)
+
+    def test_probe_cli_ports_reuses_prescan_results(self):
+        """Check that CLI ports will not be probed again if the liveness pre-scan has already probed them"""
+        alive_hosts = {"10.10.10.10": {161: "open", 22: "open", 23: "closed"}}
+        self.run_command.prescanner = mock.MagicMock(ports=[161, 22, 23])
+        self.run_command.cli_ports_prescanner = mock.MagicMock(ports=[22, 23])
+        # act
+        result = self.run_command._probe_cli_ports(devices_ips=[mock.MagicMock(ip_range=["10.10.10.10"])],
+                                                   alive_hosts=alive_hosts)
+        # verify
+        self.assertEqual(result, alive_hosts)
+        self.run_command.cli_ports_prescanner.probe_hosts.assert_not_called()
+
+    def test_execute_with_snmp_prober(self):
+        """Check that method will use SNMP data that was received by the prober for all devices at once"""
+        vendor_settings = mock.MagicMock()
+        ip = "10.10.10.10"
+        device_data = mock.MagicMock(ip_range=[ip])
+        snmp_community_strings = ["snmp community string"]
+        system_info = mock.MagicMock(sys_name="sys name", sys_object_id="SNMPv2-SMI::enterprises.9.1.222")
+        snmp_prober = mock.MagicMock()
+        snmp_prober.probe.return_value = {ip: system_info}
+        self.run_command.snmp_prober = snmp_prober
+        self.run_command._get_snmp_handler = mock.MagicMock()
+        self.report.add_entry.return_value.__enter__.return_value = mock.MagicMock(ip=ip)
+        # act
+        self.run_command.execute(devices_ips=[device_data],
+                                 snmp_comunity_strings=snmp_community_strings,
+                                 vendor_settings=vendor_settings,
+                                 additional_vendors_data=None)
+        # verify
+        snmp_prober.probe.assert_called_once_with(ips=mock.ANY, snmp_community_strings=snmp_community_strings)
+        self.run_command._get_snmp_handler.assert_not_called()
+        entry = self.report.add_entry().__enter__()
+        self.assertEqual(entry.snmp_community, system_info.snmp_community)
+        self.assertEqual(entry.sys_object_id, system_info.sys_object_id)
+        self.assertEqual(entry.description, system_info.description)
+        self.assertEqual(entry.device_name, system_info.sys_name)
+
+    def test_discover_device_no_snmp_data(self):
+        """Check that method will raise ReportableException if device didn't answer to the SNMP prober"""
+        entry = mock.MagicMock(ip="10.10.10.10")
+        # act
+        with self.assertRaisesRegexp(ReportableException, "SNMP timeout"):
+            self.run_command._discover_device(entry=entry,
+                                              snmp_comunity_strings=["snmp community string"],
+                                              snmp_system_data={})
+
+    def test_execute_with_discovery_cache(self):
+        """Check that method will take unchanged device from the cache and discover the changed one"""
+        vendor_settings = mock.MagicMock()
+        cached_ip = "10.10.10.10"
+        changed_ip = "10.10.10.20"
+        device_data = mock.MagicMock(ip_range=[cached_ip, changed_ip])
+        entry_data = {"ip": cached_ip,
+                      "sys_object_id": "SNMPv2-SMI::enterprises.9.1.222",
+                      "snmp_community": "public",
+                      "vendor": "Cisco",
+                      "attributes": {"CLI Connection Type": "SSH"}}
+        discovery_cache = mock.MagicMock()
+        discovery_cache.get_entries_data.return_value = {cached_ip: entry_data,
+                                                         changed_ip: dict(entry_data, ip=changed_ip)}
+        snmp_prober = mock.MagicMock()
+        snmp_prober.get_sys_object_ids.return_value = {cached_ip: "SNMPv2-SMI::enterprises.9.1.222",
+                                                       changed_ip: "SNMPv2-SMI::enterprises.9.1.1"}
+        snmp_prober.probe.return_value = {}
+        self.run_command.discovery_cache = discovery_cache
+        self.run_command.snmp_prober = snmp_prober
+        self.report.add_entry.side_effect = lambda ip, **kwargs: mock.MagicMock(
+            ip=ip, __enter__=mock.MagicMock(return_value=mock.MagicMock(ip=ip)))
+        probed_ips = []
+        snmp_prober.probe.side_effect = lambda ips, **kwargs: probed_ips.extend(ips) or {}
+        handler = mock.MagicMock()
+        self.run_command.vendor_type_handlers_map = mock.MagicMock(__getitem__=mock.MagicMock(return_value=handler))
+        # act
+        self.run_command.execute(devices_ips=[device_data],
+                                 snmp_comunity_strings=["public"],
+                                 vendor_settings=vendor_settings,
+                                 additional_vendors_data=None)
+        # verify
+        snmp_prober.get_sys_object_ids.assert_called_once_with(devices={cached_ip: "public", changed_ip: "public"})
+        self.assertEqual(probed_ips, [changed_ip])
+        handler.discover.assert_not_called()
+        handler.upload.assert_called_once()
+        uploaded_entry = handler.upload.call_args[1]["entry"]
+        self.assertEqual(uploaded_entry.ip, cached_ip)
+        self.assertEqual(uploaded_entry.vendor, "Cisco")
+        self.assertEqual(uploaded_entry.attributes, {"CLI Connection Type": "SSH"})
+        self.assertEqual(uploaded_entry.folder_path, vendor_settings.get_folder_path_by_vendor.return_value)
+
+    def test_execute_resume(self):
+        """Check that devices finished by the interrupted run will be added to the report without the discovery"""
+        journaled_ip = "10.10.10.10"
+        no_creds_ip = "10.10.10.20"
+        failed_ip = "10.10.10.25"
+        new_ip = "10.10.10.30"
+        device_data = mock.MagicMock(ip_range=[journaled_ip, no_creds_ip, failed_ip, new_ip])
+        discovery_journal = mock.MagicMock(SECRET_ATTRIBUTES=("Password",))
+        discovery_journal.load.return_value = {
+            journaled_ip: {"ip": journaled_ip, "status": Entry.SUCCESS_STATUS, "domain": "Global"},
+            no_creds_ip: {"ip": no_creds_ip, "status": Entry.SUCCESS_STATUS, "domain": "Global",
+                          "attributes": {"User": "removed", "Password": None}},
+            failed_ip: {"ip": failed_ip, "status": Entry.FAILED_STATUS, "domain": "Global"}}
+        vendor_settings = mock.MagicMock()
+        vendor_settings.get_creds_by_vendor.return_value.cli_credentials = []
+        self.report.entry_class = Entry
+        self.report.add_entry.side_effect = lambda ip, **kwargs: Entry(ip=ip, status=Entry.SUCCESS_STATUS,
+                                                                       domain="Global")
+        self.report.edit_entry.side_effect = lambda entry: entry
+        self.run_command.discovery_journal = discovery_journal
+        self.run_command.resume = True
+        handler = mock.MagicMock()
+        handler.discover.side_effect = lambda entry, **kwargs: entry
+        self.run_command._discover_device = mock.MagicMock(side_effect=lambda entry, **kwargs: entry)
+        self.run_command.vendor_type_handlers_map = mock.MagicMock(__getitem__=mock.MagicMock(return_value=handler))
+        # act
+        self.run_command.execute(devices_ips=[device_data],
+                                 snmp_comunity_strings=["public"],
+                                 vendor_settings=vendor_settings,
+                                 additional_vendors_data=None)
+        # verify
+        discovery_journal.start.assert_called_once_with(resume=True)
+        self.assertEqual([call[1]["ip"] for call in self.report.add_entry.call_args_list],
+                         [no_creds_ip, failed_ip, new_ip])
+        self.assertEqual(self.report.edit_entry.call_args[1]["entry"].ip, journaled_ip)
+        self.assertEqual([call[0][0].ip for call in discovery_journal.record.call_args_list],
+                         [no_creds_ip, failed_ip, new_ip])
+        self.assertEqual(self.report.finish_entry.call_count, 4)
+        discovery_journal.close.assert_called_once_with(remove=True)
+
+    def test_execute_without_resume_starts_new_journal(self):
+        """Check that devices recorded in the journal by the previous run will not be loaded without the resume"""
+        discovery_journal = mock.MagicMock()
+        self.run_command.discovery_journal = discovery_journal
+        # act
+        self.run_command.execute(devices_ips=[],
+                                 snmp_comunity_strings=["public"],
+                                 vendor_settings=mock.MagicMock(),
+                                 additional_vendors_data=None)
+        # verify
+        discovery_journal.load.assert_not_called()
+        discovery_journal.start.assert_called_once_with(resume=False)
+
+    def test_upload_device_records_entry_after_background_stages(self):
+        """Check that uploaded device will be recorded right away and again when all background stages are done"""
+        discovery_journal = mock.MagicMock()
+        self.run_command.discovery_journal = discovery_journal
+        self.run_command.attributes_batcher = mock.MagicMock()
+        entry = Entry(ip="10.10.10.10", status=Entry.SUCCESS_STATUS, domain="Global")
+        self.run_command._upload_device((entry, mock.MagicMock(), mock.MagicMock()))
+        discovery_journal.record.assert_called_once_with(entry)
+        self.report.finish_entry.assert_not_called()
+        # act
+        self.run_command._finish_unfinished_entries()
+        # verify
+        self.assertEqual(discovery_journal.record.call_args_list, [mock.call(entry), mock.call(entry)])
+        self.report.finish_entry.assert_called_once_with(entry)
+
+    def test_apply_vendor_settings(self):
+        """Check that method will take passwords of the cached user and folder path from the vendor settings"""
+        entry = Entry(ip="10.10.10.10", status=Entry.SUCCESS_STATUS, domain="Global")
+        entry.attributes = {"User": "admin", "Password": None, "Enable Password": None}
+        vendor_settings = mock.MagicMock()
+        vendor_settings.get_creds_by_vendor.return_value.cli_credentials = [
+            mock.MagicMock(user="root", password="root password", enable_password=None),
+            mock.MagicMock(user="admin", password="admin password", enable_password="enable password")]
+        # act
+        result = self.run_command._apply_vendor_settings(entry=entry,
+                                                         vendor=mock.MagicMock(),
+                                                         vendor_settings=vendor_settings)
+        # verify
+        self.assertTrue(result)
+        self.assertEqual(entry.folder_path, vendor_settings.get_folder_path_by_vendor.return_value)
+        self.assertEqual(entry.attributes, {"User": "admin",
+                                            "Password": "admin password",
+                                            "Enable Password": "enable password"})
+
+    def test_apply_vendor_settings_user_not_found(self):
+        """Check that method will return False if the cached user was removed from the vendor settings"""
+        entry = Entry(ip="10.10.10.10", status=Entry.SUCCESS_STATUS, domain="Global")
+        entry.attributes = {"User": "admin", "Password": None}
+        vendor_settings = mock.MagicMock()
+        vendor_settings.get_creds_by_vendor.return_value.cli_credentials = [
+            mock.MagicMock(user="root", password="root password", enable_password=None)]
+        # act
+        result = self.run_command._apply_vendor_settings(entry=entry,
+                                                         vendor=mock.MagicMock(),
+                                                         vendor_settings=vendor_settings)
+        # verify
+        self.assertFalse(result)
+        self.assertEqual(entry.attributes, {"User": "admin", "Password": None})
+
+    def test_execute_uploads_devices_in_separate_pool(self):
+        """Check that devices discovered by the discovery workers will be uploaded by the upload workers"""
+        ips = ["10.10.10.{}".format(i) for i in range(10)]
+        device_data = mock.MagicMock(ip_range=ips)
+        uploaded_devices = []
+        self.run_command.workers = 4
+        self.run_command.upload_workers = 2
+        self.run_command.upload_queue_size = 1
+        self.run_command._process_device = lambda report_entry, **kwargs: (report_entry, None, None)
+        self.run_command._upload_device = uploaded_devices.append
+        # act
+        self.run_command.execute(devices_ips=[device_data],
+                                 snmp_comunity_strings=["snmp community string"],
+                                 vendor_settings=mock.MagicMock(),
+                                 additional_vendors_data=None)
+        # verify
+        self.assertEqual(len(uploaded_devices), len(ips))
+        self.report.generate.assert_called_once_with()
+
+    def test_process_device_offline(self):
+        """Check that method will not return discovered device for the upload in the offline mode"""
+        self.run_command.offline = True
+        self.run_command._discover_device = mock.MagicMock()
+        self.run_command.vendor_type_handlers_map = mock.MagicMock()
+        report_entry = mock.MagicMock(ip="10.10.10.10")
+        # act
+        result = self.run_command._process_device(report_entry=report_entry,
+                                                  snmp_comunity_strings=["public"],
+                                                  vendor_settings=mock.MagicMock(),
+                                                  vendor_config=mock.MagicMock())
+        # verify
+        self.assertIsNone(result)
+        self.output.send.assert_any_call("Device with IP 10.10.10.10 was successfully discovered")
+        self.report.finish_entry.assert_called_once_with(report_entry)
+
+    def test_upload_device_handles_exception(self):
+        """Check that method will mark Entry as failed if the upload has failed"""
+        entry = Entry(ip="10.10.10.10", status=Entry.SUCCESS_STATUS, domain="Global")
+        handler = mock.MagicMock()
+        handler.upload.side_effect = ReportableException("Shell is not installed")
+        # act
+        self.run_command._upload_device((entry, mock.MagicMock(), handler))
+        # verify
+        self.assertEqual(entry.status, Entry.FAILED_STATUS)
+        self.assertEqual(entry.comment, "Shell is not installed")
+        self.output.send.assert_called_once_with("Failed to discover 10.10.10.10 device. Shell is not installed",
+                                                 error=True)
+        self.report.finish_entry.assert_called_once_with(entry)
+
+    def test_upload_device_finishes_entry(self):
+        """Check that uploaded device will be finished in the report if there are no background stages"""
+        entry = Entry(ip="10.10.10.10", status=Entry.SUCCESS_STATUS, domain="Global")
+        # act
+        self.run_command._upload_device((entry, mock.MagicMock(), mock.MagicMock()))
+        # verify
+        self.report.finish_entry.assert_called_once_with(entry)
+
+    def test_upload_device_keeps_entry_for_background_autoload(self):
+        """Check that uploaded device will not be finished while its Autoload can still fail in the background"""
+        self.run_command.autoload_scheduler = mock.MagicMock()
+        entry = Entry(ip="10.10.10.10", status=Entry.SUCCESS_STATUS, domain="Global")
+        # act
+        self.run_command._upload_device((entry, mock.MagicMock(), mock.MagicMock()))
+        # verify
+        self.report.finish_entry.assert_not_called()
+
+    def test_process_device_saves_discovered_entry_to_cache(self):
+        """Check that method will save fully discovered device into the discovery cache"""
+        discovery_cache = mock.MagicMock()
+        self.run_command.discovery_cache = discovery_cache
+        self.run_command._discover_device = mock.MagicMock()
+        handler = mock.MagicMock()
+        handler.discover.return_value.comment = ""
+        self.run_command.vendor_type_handlers_map = mock.MagicMock(__getitem__=mock.MagicMock(return_value=handler))
+        # act
+        self.run_command._process_device(report_entry=mock.MagicMock(),
+                                         snmp_comunity_strings=["public"],
+                                         vendor_settings=mock.MagicMock(),
+                                         vendor_config=mock.MagicMock())
+        # verify
+        discovery_cache.save_entry.assert_called_once_with(handler.discover.return_value)
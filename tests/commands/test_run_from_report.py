@@ -20,6 +20,37 @@ class TestRunFromReportCommand(unittest.TestCase):
                                                 output=self.output,
                                                 autoload=True)
 
+    def test_execute_waits_for_background_autoload(self):
+        """Check that method will wait for the background Autoload and report failed ones before the report"""
+        entry = mock.MagicMock(ip="10.10.10.10")
+        autoload_scheduler = mock.MagicMock()
+        autoload_scheduler.wait.return_value = [(entry, "resource", "Autoload has failed")]
+        self.run_command.autoload_scheduler = autoload_scheduler
+        self.run_command.vendor_type_handlers_map = mock.MagicMock()
+        # act
+        self.run_command.execute(parsed_entries=[], additional_vendors_data=None)
+        # verify
+        autoload_scheduler.wait.assert_called_once_with()
+        self.output.send.assert_any_call("Failed to autoload resource resource for the 10.10.10.10 device. "
+                                         "Autoload has failed", error=True)
+        self.report.generate.assert_called_once_with()
+
+    def test_execute_sets_batched_attributes_before_autoload(self):
+        """Check that method will set batched attributes and report failed ones before waiting for Autoload"""
+        entry = mock.MagicMock(ip="10.10.10.10")
+        calls = mock.MagicMock()
+        calls.attributes_batcher.wait.return_value = [(entry, "resource", "Unable to set attributes: error")]
+        calls.autoload_scheduler.wait.return_value = []
+        self.run_command.attributes_batcher = calls.attributes_batcher
+        self.run_command.autoload_scheduler = calls.autoload_scheduler
+        # act
+        self.run_command.execute(parsed_entries=[], additional_vendors_data=None)
+        # verify
+        self.assertEqual(calls.mock_calls[:2], [mock.call.attributes_batcher.wait(),
+                                                mock.call.autoload_scheduler.wait()])
+        self.output.send.assert_any_call("Failed to set attributes for the resource resource of the 10.10.10.10 "
+                                         "device. Unable to set attributes: error", error=True)
+
     def test_execute(self):
         """Check that method will upload discovered device"""
         device_data = mock.MagicMock()
@@ -30,12 +61,12 @@ class TestRunFromReportCommand(unittest.TestCase):
                                  additional_vendors_data=None)
         # verify
         self.report.edit_entry.assert_called_once_with(entry=device_data)
-        self.cs_session_manager.get_session.assert_called_once_with(
+        self.cs_session_manager.session.assert_called_once_with(
             cs_domain=self.report.edit_entry().__enter__().domain)
 
         handler.upload.assert_called_once_with(entry=self.report.edit_entry().__enter__(),
                                                vendor=self.data_processor.load_vendor_config().get_vendor(),
-                                               cs_session=self.cs_session_manager.get_session())
+                                               cs_session=self.cs_session_manager.session().__enter__())
         self.report.generate.assert_called_once_with()
 
     def test_execute_handles_exception(self):
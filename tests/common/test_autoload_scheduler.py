@@ -0,0 +1,71 @@
+import threading
+import unittest
+
+import mock
+
+from autodiscovery.common.autoload_scheduler import AutoloadScheduler
+from autodiscovery.reports.discovery.base import Entry
+
+
+class TestAutoloadScheduler(unittest.TestCase):
+    def setUp(self):
+        self.logger = mock.MagicMock()
+        self.cs_session = mock.MagicMock()
+        self.cs_session_manager = mock.MagicMock()
+        self.cs_session_manager.session.return_value.__enter__.return_value = self.cs_session
+        self.scheduler = AutoloadScheduler(cs_session_manager=self.cs_session_manager,
+                                           workers=2,
+                                           timeout=5,
+                                           logger=self.logger)
+        self.entry = Entry(ip="10.10.10.10", status=Entry.SUCCESS_STATUS, domain="Global")
+
+    def test_wait(self):
+        """Check that method will autoload all scheduled resources"""
+        autoloaded = []
+        lock = threading.Lock()
+
+        def autoload(resource_name):
+            with lock:
+                autoloaded.append(resource_name)
+
+        self.cs_session.AutoLoad.side_effect = autoload
+        # act
+        self.scheduler.schedule(cs_domain="Global", resource_name="resource 1", entry=self.entry)
+        self.scheduler.schedule(cs_domain="Global", resource_name="resource 2", entry=self.entry)
+        result = self.scheduler.wait()
+        # verify
+        self.assertEqual(result, [])
+        self.assertEqual(sorted(autoloaded), ["resource 1", "resource 2"])
+        self.cs_session_manager.session.assert_called_with(cs_domain="Global")
+        self.assertEqual(self.entry.status, Entry.SUCCESS_STATUS)
+
+    def test_wait_nothing_scheduled(self):
+        """Check that method will return empty list if there are no scheduled resources"""
+        self.assertEqual(self.scheduler.wait(), [])
+
+    def test_wait_failed_autoload(self):
+        """Check that failed Autoload will be written into the Entry"""
+        self.cs_session.AutoLoad.side_effect = Exception("unable to connect")
+        # act
+        self.scheduler.schedule(cs_domain="Global", resource_name="resource", entry=self.entry)
+        result = self.scheduler.wait()
+        # verify
+        self.assertEqual(result, [(self.entry, "resource", "Autoload has failed: unable to connect")])
+        self.assertEqual(self.entry.status, Entry.FAILED_STATUS)
+        self.assertEqual(self.entry.comment, "Autoload has failed: unable to connect")
+
+    def test_wait_autoload_timeout(self):
+        """Check that Autoload that wasn't finished in time will be written into the Entry as failed"""
+        finish_autoload = threading.Event()
+        self.addCleanup(finish_autoload.set)
+        self.cs_session.AutoLoad.side_effect = lambda resource_name: finish_autoload.wait()
+        self.scheduler.timeout = 0.01
+        # act
+        self.scheduler.schedule(cs_domain="Global", resource_name="resource", entry=self.entry)
+        result = self.scheduler.wait()
+        # verify
+        self.assertEqual(len(result), 1)
+        self.assertEqual(self.entry.status, Entry.FAILED_STATUS)
+        self.assertIn("timed out", self.entry.comment)
+        # session is still used by the running Autoload
+        self.cs_session_manager.session.return_value.__exit__.assert_not_called()
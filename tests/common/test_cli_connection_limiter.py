@@ -0,0 +1,47 @@
+import threading
+import unittest
+
+from autodiscovery.common.cli_connection_limiter import CLIConnectionLimiter
+
+
+class TestCLIConnectionLimiter(unittest.TestCase):
+    def setUp(self):
+        self.limiter = CLIConnectionLimiter(max_connections=2, max_device_connections=1)
+
+    def _acquire_in_thread(self, device_ip):
+        """Try to open connection to the device from another thread without waiting
+
+        :rtype: bool
+        """
+        result = []
+
+        def worker():
+            connections = self.limiter._get_device_connections(device_ip)
+            acquired = connections.acquire(False)
+            if acquired:
+                acquired = self.limiter._connections.acquire(False)
+                if acquired:
+                    self.limiter._connections.release()
+                connections.release()
+            result.append(acquired)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def test_device_connections_limit(self):
+        """Check that only one connection to the same device can be opened at the same time"""
+        with self.limiter.connection("10.0.0.1"):
+            self.assertFalse(self._acquire_in_thread("10.0.0.1"))
+            self.assertTrue(self._acquire_in_thread("10.0.0.2"))
+
+        self.assertTrue(self._acquire_in_thread("10.0.0.1"))
+
+    def test_connections_limit(self):
+        """Check that number of connections to all devices is limited"""
+        with self.limiter.connection("10.0.0.1"):
+            with self.limiter.connection("10.0.0.2"):
+                self.assertFalse(self._acquire_in_thread("10.0.0.3"))
+
+            self.assertTrue(self._acquire_in_thread("10.0.0.3"))
@@ -0,0 +1,115 @@
+import unittest
+import urllib2
+
+import mock
+from cloudshell.api.common_cloudshell_api import CloudShellAPIError
+
+from autodiscovery.common.cs_api_throttler import CloudShellAPIThrottler
+from autodiscovery.common.cs_api_throttler import ThrottledCloudShellSession
+from autodiscovery.common.cs_api_throttler import TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    @mock.patch("autodiscovery.common.cs_api_throttler.time")
+    def test_acquire_waits_for_token(self, time):
+        """Check that bucket will wait for the next token when all tokens were taken"""
+        time.time.return_value = 0
+        bucket = TokenBucket(rate=2, capacity=1)
+        time.sleep.side_effect = lambda seconds: setattr(time.time, "return_value", time.time.return_value + seconds)
+        # act
+        bucket.acquire()
+        bucket.acquire()
+        # verify
+        time.sleep.assert_called_once_with(0.5)
+
+
+class TestCloudShellAPIThrottler(unittest.TestCase):
+    def setUp(self):
+        self.throttler = CloudShellAPIThrottler(max_rate=1000,
+                                                min_rate=1,
+                                                retries=2,
+                                                backoff=0,
+                                                max_backoff=0,
+                                                logger=mock.MagicMock(),
+                                                retryable_error_codes=("999",),
+                                                retryable_error_messages=("Timeout",))
+
+    def test_call_retries_network_errors(self):
+        """Check that API call will be retried on the network error"""
+        func = mock.MagicMock(side_effect=[urllib2.URLError("reset"), "result"])
+        # act
+        result = self.throttler.call("GetResourceDetails", func, "resource")
+        # verify
+        self.assertEqual(result, "result")
+        self.assertEqual(func.call_args_list, [mock.call("resource"), mock.call("resource")])
+        stats = self.throttler.get_stats()["GetResourceDetails"]
+        self.assertEqual((stats.calls, stats.errors, stats.retries), (2, 1, 1))
+
+    def test_call_retries_retryable_error_codes(self):
+        """Check that API call will be retried only for the retryable CloudShell API error codes"""
+        func = mock.MagicMock(side_effect=[CloudShellAPIError(code="999", message="", rawxml=""),
+                                           CloudShellAPIError(code="114", message="", rawxml="")])
+        # act
+        with self.assertRaises(CloudShellAPIError):
+            self.throttler.call("CreateResource", func)
+        # verify
+        self.assertEqual(func.call_count, 2)
+
+    def test_call_retries_retryable_error_messages_for_idempotent_methods(self):
+        """Check that read-only API call will be retried for the CloudShell API error with the retryable message"""
+        func = mock.MagicMock(side_effect=[CloudShellAPIError(code="100", message="Request TIMEOUT", rawxml=""),
+                                           "result"])
+        # act
+        result = self.throttler.call("GetResourceDetails", func)
+        # verify
+        self.assertEqual(result, "result")
+        self.assertEqual(func.call_count, 2)
+
+    def test_call_does_not_retry_retryable_error_messages_for_not_idempotent_methods(self):
+        """Check that API call that could be already executed will not be retried for the retryable message"""
+        func = mock.MagicMock(side_effect=CloudShellAPIError(code="100", message="Request timeout", rawxml=""))
+        # act
+        with self.assertRaises(CloudShellAPIError):
+            self.throttler.call("CreateResource", func)
+        # verify
+        func.assert_called_once_with()
+
+    def test_call_stops_after_retries(self):
+        """Check that error will be raised when all retries have failed"""
+        func = mock.MagicMock(side_effect=urllib2.URLError("reset"))
+        # act
+        with self.assertRaises(urllib2.URLError):
+            self.throttler.call("GetResourceList", func)
+        # verify
+        self.assertEqual(func.call_count, 3)
+
+    def test_call_does_not_retry_network_errors_for_not_idempotent_methods(self):
+        """Check that API call that could be already executed by the server will not be retried"""
+        func = mock.MagicMock(side_effect=urllib2.URLError("timed out"))
+        # act
+        with self.assertRaises(urllib2.URLError):
+            self.throttler.call("CreateResource", func)
+        # verify
+        func.assert_called_once_with()
+
+    def test_retryable_error_lowers_rate(self):
+        """Check that rate will be halved on the retryable error and restored on the successful calls"""
+        func = mock.MagicMock(side_effect=[urllib2.URLError("reset"), None])
+        # act
+        self.throttler.call("GetResourceDetails", func)
+        # verify
+        self.assertEqual(self.throttler._bucket.rate, 501)
+
+
+class TestThrottledCloudShellSession(unittest.TestCase):
+    def test_api_calls_go_through_throttler(self):
+        """Check that API methods will be called via throttler and other attributes will be returned as is"""
+        cs_session = mock.MagicMock(domain="domain id")
+        throttler = mock.MagicMock()
+        throttled_session = ThrottledCloudShellSession(cs_session=cs_session, throttler=throttler)
+        # act
+        result = throttled_session.AutoLoad("resource")
+        # verify
+        self.assertEqual(result, throttler.call.return_value)
+        throttler.call.assert_called_once_with("AutoLoad", cs_session.AutoLoad, "resource")
+        self.assertEqual(throttled_session.domain, "domain id")
@@ -0,0 +1,94 @@
+import threading
+import unittest
+
+import mock
+from cloudshell.api.cloudshell_api import ResourceAttributesUpdateRequest
+
+from autodiscovery.common.cs_attributes_batcher import CloudShellAttributesBatcher
+from autodiscovery.reports.discovery.base import Entry
+
+
+class TestCloudShellAttributesBatcher(unittest.TestCase):
+    def setUp(self):
+        self.cs_session = mock.MagicMock()
+        self.cs_session_manager = mock.MagicMock()
+        self.cs_session_manager.session.return_value.__enter__.return_value = self.cs_session
+        self.batcher = CloudShellAttributesBatcher(cs_session_manager=self.cs_session_manager,
+                                                   batch_size=2,
+                                                   flush_interval=60,
+                                                   logger=mock.MagicMock())
+
+    def _get_entry(self, ip):
+        return Entry(ip=ip, status=Entry.SUCCESS_STATUS, domain="Global")
+
+    def test_add_sends_full_batch(self):
+        """Check that updates will be sent with one API call when the batch is full"""
+        requests = [ResourceAttributesUpdateRequest("resource 1", []),
+                    ResourceAttributesUpdateRequest("resource 2", [])]
+        on_success = mock.MagicMock()
+        # act
+        self.batcher.add(cs_domain="Global", request=requests[0], entry=self._get_entry("10.0.0.1"))
+        self.cs_session.SetAttributesValues.assert_not_called()
+        self.batcher.add(cs_domain="Global", request=requests[1], entry=self._get_entry("10.0.0.2"),
+                         on_success=on_success)
+        # verify
+        self.cs_session.SetAttributesValues.assert_called_once_with(requests)
+        self.cs_session_manager.session.assert_called_once_with(cs_domain="Global")
+        on_success.assert_called_once_with()
+        self.assertEqual(self.batcher.wait(), [])
+
+    def test_add_sends_batch_after_flush_interval(self):
+        """Check that not full batch will be sent when the flush interval has passed"""
+        sent = threading.Event()
+        self.cs_session.SetAttributesValues.side_effect = lambda requests: sent.set()
+        self.batcher.flush_interval = 0.01
+        request = ResourceAttributesUpdateRequest("resource", [])
+        # act
+        self.batcher.add(cs_domain="Global", request=request, entry=self._get_entry("10.0.0.1"))
+        # verify
+        self.assertTrue(sent.wait(5))
+        self.cs_session.SetAttributesValues.assert_called_once_with([request])
+
+    def test_add_keeps_domains_in_separate_batches(self):
+        """Check that updates for the different domains will not be sent in one batch"""
+        # act
+        self.batcher.add(cs_domain="Global", request=ResourceAttributesUpdateRequest("resource 1", []),
+                         entry=self._get_entry("10.0.0.1"))
+        self.batcher.add(cs_domain="Test", request=ResourceAttributesUpdateRequest("resource 2", []),
+                         entry=self._get_entry("10.0.0.2"))
+        # verify
+        self.cs_session.SetAttributesValues.assert_not_called()
+        self.batcher.wait()
+        self.assertEqual(self.cs_session.SetAttributesValues.call_count, 2)
+
+    def test_wait_maps_failures_to_entries(self):
+        """Check that on the failed batch each update will be sent separately and failed one written to its Entry"""
+        entry_ok = self._get_entry("10.0.0.1")
+        entry_failed = self._get_entry("10.0.0.2")
+        on_success = mock.MagicMock()
+        on_failed_success = mock.MagicMock()
+
+        def set_attributes_values(requests):
+            if any(request.ResourceFullName == "failed" for request in requests):
+                raise Exception("attribute doesn't exist")
+
+        self.cs_session.SetAttributesValues.side_effect = set_attributes_values
+        self.batcher.add(cs_domain="Global", request=ResourceAttributesUpdateRequest("ok", []), entry=entry_ok,
+                         on_success=on_success)
+        # act
+        self.batcher.add(cs_domain="Global", request=ResourceAttributesUpdateRequest("failed", []),
+                         entry=entry_failed, on_success=on_failed_success)
+        result = self.batcher.wait()
+        # verify
+        self.assertEqual(result, [(entry_failed, "failed", "Unable to set attributes: attribute doesn't exist")])
+        self.assertEqual(entry_ok.status, Entry.SUCCESS_STATUS)
+        self.assertEqual(entry_failed.status, Entry.FAILED_STATUS)
+        self.assertEqual(entry_failed.comment, "Unable to set attributes: attribute doesn't exist")
+        self.assertEqual(self.cs_session.SetAttributesValues.call_count, 3)
+        on_success.assert_called_once_with()
+        on_failed_success.assert_not_called()
+
+    def test_wait_nothing_added(self):
+        """Check that method will return empty list if there are no updates"""
+        self.assertEqual(self.batcher.wait(), [])
+        self.cs_session_manager.session.assert_not_called()
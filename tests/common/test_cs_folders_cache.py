@@ -0,0 +1,52 @@
+import unittest
+
+import mock
+
+from autodiscovery.common.cs_folders_cache import CloudShellFoldersCache
+
+
+class TestCloudShellFoldersCache(unittest.TestCase):
+    def setUp(self):
+        self.folders_cache = CloudShellFoldersCache()
+
+    def test_create_folder_only_once(self):
+        """Check that folder will be created on the CloudShell only once"""
+        cs_session = mock.MagicMock()
+        # act
+        self.folders_cache.create_folder(cs_session=cs_session, folder_path="Root/Cisco")
+        self.folders_cache.create_folder(cs_session=cs_session, folder_path="Root/Cisco")
+        # verify
+        cs_session.CreateFolder.assert_called_once_with(folderFullPath="Root/Cisco")
+
+    def test_create_folder_parent_folder(self):
+        """Check that parent folder will not be created if its sub folder was already created"""
+        cs_session = mock.MagicMock()
+        # act
+        self.folders_cache.create_folder(cs_session=cs_session, folder_path="Root/Cisco")
+        self.folders_cache.create_folder(cs_session=cs_session, folder_path="Root")
+        self.folders_cache.create_folder(cs_session=cs_session, folder_path="Root/Juniper")
+        # verify
+        self.assertEqual(cs_session.CreateFolder.call_args_list, [mock.call(folderFullPath="Root/Cisco"),
+                                                                   mock.call(folderFullPath="Root/Juniper")])
+
+    def test_create_folder_per_session(self):
+        """Check that the same folder will be created for each CloudShell session (domain)"""
+        cs_session = mock.MagicMock()
+        other_cs_session = mock.MagicMock()
+        # act
+        self.folders_cache.create_folder(cs_session=cs_session, folder_path="Root")
+        self.folders_cache.create_folder(cs_session=other_cs_session, folder_path="Root")
+        # verify
+        cs_session.CreateFolder.assert_called_once_with(folderFullPath="Root")
+        other_cs_session.CreateFolder.assert_called_once_with(folderFullPath="Root")
+
+    def test_create_folder_failed(self):
+        """Check that folder will be created again if the previous attempt has failed"""
+        cs_session = mock.MagicMock()
+        cs_session.CreateFolder.side_effect = [Exception(), None]
+        # act
+        with self.assertRaises(Exception):
+            self.folders_cache.create_folder(cs_session=cs_session, folder_path="Root")
+        self.folders_cache.create_folder(cs_session=cs_session, folder_path="Root")
+        # verify
+        self.assertEqual(cs_session.CreateFolder.call_count, 2)
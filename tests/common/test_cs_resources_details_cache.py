@@ -0,0 +1,29 @@
+import unittest
+
+import mock
+
+from autodiscovery.common.cs_resources_details_cache import CloudShellResourcesDetailsCache
+
+
+class TestCloudShellResourcesDetailsCache(unittest.TestCase):
+    def setUp(self):
+        self.cs_session = mock.MagicMock(domain="Global")
+        self.cache = CloudShellResourcesDetailsCache()
+
+    def test_get_resource_details(self):
+        """Check that resource details will be loaded from the CloudShell only once"""
+        self.cache.get_resource_details(cs_session=self.cs_session, resource_name="Switch 1")
+        # act
+        result = self.cache.get_resource_details(cs_session=self.cs_session, resource_name="Switch 1")
+        # verify
+        self.assertEqual(result, self.cs_session.GetResourceDetails.return_value)
+        self.cs_session.GetResourceDetails.assert_called_once_with("Switch 1")
+
+    def test_get_resource_details_per_domain(self):
+        """Check that resource details will be loaded again for another domain"""
+        self.cache.get_resource_details(cs_session=self.cs_session, resource_name="Switch 1")
+        self.cs_session.domain = "Test"
+        # act
+        self.cache.get_resource_details(cs_session=self.cs_session, resource_name="Switch 1")
+        # verify
+        self.assertEqual(self.cs_session.GetResourceDetails.call_count, 2)
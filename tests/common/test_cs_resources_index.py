@@ -0,0 +1,65 @@
+import unittest
+
+import mock
+
+from autodiscovery.common.cs_resources_index import CloudShellResourcesIndex
+
+
+class TestCloudShellResourcesIndex(unittest.TestCase):
+    def setUp(self):
+        self.cs_session = mock.MagicMock()
+        self.cs_session.GetResourceList.return_value.Resources = [
+            mock.MagicMock(Name="Router", Address="10.0.0.1", FullAddress="10.0.0.1", ResourceModelName="Model"),
+            mock.MagicMock(Name="Port 1", Address="1", FullAddress="10.0.0.1/1")]
+        self.resources_index = CloudShellResourcesIndex(logger=mock.MagicMock())
+
+    def test_resources_are_loaded_once(self):
+        """Check that resources will be loaded from the CloudShell only once per session"""
+        # act
+        self.resources_index.reserve_name(cs_session=self.cs_session, resource_name="Switch")
+        self.resources_index.get_resource_by_address(cs_session=self.cs_session, address="10.0.0.2")
+        # verify
+        self.cs_session.GetResourceList.assert_called_once_with()
+
+    def test_get_resource_by_address(self):
+        """Check that only root resources will be found by the address"""
+        # act
+        resource = self.resources_index.get_resource_by_address(cs_session=self.cs_session, address="10.0.0.1")
+        sub_resource = self.resources_index.get_resource_by_address(cs_session=self.cs_session, address="1")
+        # verify
+        self.assertEqual(resource.name, "Router")
+        self.assertEqual(resource.model, "Model")
+        self.assertIsNone(sub_resource)
+
+    def test_reserve_name(self):
+        """Check that unique name will be picked for the taken names regardless of the case"""
+        # act
+        first_name = self.resources_index.reserve_name(cs_session=self.cs_session, resource_name="router")
+        second_name = self.resources_index.reserve_name(cs_session=self.cs_session, resource_name="router")
+        free_name = self.resources_index.reserve_name(cs_session=self.cs_session, resource_name="Switch")
+        # verify
+        self.assertEqual(first_name, "router-1")
+        self.assertEqual(second_name, "router-2")
+        self.assertEqual(free_name, "Switch")
+
+    def test_release_name(self):
+        """Check that released name can be reserved again"""
+        name = self.resources_index.reserve_name(cs_session=self.cs_session, resource_name="Switch")
+        # act
+        self.resources_index.release_name(cs_session=self.cs_session, resource_name=name)
+        # verify
+        self.assertEqual(self.resources_index.reserve_name(cs_session=self.cs_session, resource_name="Switch"),
+                         "Switch")
+
+    def test_add_resource(self):
+        """Check that created resource will be found by its address"""
+        self.resources_index.reserve_name(cs_session=self.cs_session, resource_name="Switch")
+        # act
+        self.resources_index.add_resource(cs_session=self.cs_session,
+                                          resource_name="Switch",
+                                          address="10.0.0.2",
+                                          family="Family",
+                                          model="Model")
+        # verify
+        resource = self.resources_index.get_resource_by_address(cs_session=self.cs_session, address="10.0.0.2")
+        self.assertEqual(resource.name, "Switch")
@@ -0,0 +1,119 @@
+import threading
+import unittest
+
+import mock
+
+from autodiscovery.common.cs_session_manager import CloudShellSessionManager
+
+
+class TestCloudShellSessionManager(unittest.TestCase):
+    def setUp(self):
+        self.session_manager = CloudShellSessionManager(cs_ip="cs_ip",
+                                                        cs_user="cs_user",
+                                                        cs_password="cs_password",
+                                                        logger=mock.MagicMock(),
+                                                        max_sessions=2,
+                                                        health_check_interval=60)
+
+    @mock.patch("autodiscovery.common.cs_session_manager.CloudShellAPISession")
+    def test_session_is_reused(self, cs_api_session_class):
+        """Check that returned session will be reused instead of creating a new one"""
+        # act
+        with self.session_manager.session(cs_domain="Global") as first_session:
+            pass
+        with self.session_manager.session(cs_domain="Global") as second_session:
+            pass
+        # verify
+        self.assertIs(first_session, second_session)
+        cs_api_session_class.assert_called_once_with(host="cs_ip",
+                                                     username="cs_user",
+                                                     password="cs_password",
+                                                     domain="Global")
+
+    @mock.patch("autodiscovery.common.cs_session_manager.CloudShellAPISession")
+    def test_session_per_domain(self, cs_api_session_class):
+        """Check that session of one domain will not be used for another domain"""
+        cs_api_session_class.side_effect = lambda **kwargs: mock.MagicMock()
+        # act
+        with self.session_manager.session(cs_domain="Global") as global_session:
+            pass
+        with self.session_manager.session(cs_domain="Other") as other_session:
+            pass
+        # verify
+        self.assertIsNot(global_session, other_session)
+
+    @mock.patch("autodiscovery.common.cs_session_manager.CloudShellAPISession")
+    def test_sessions_limit(self, cs_api_session_class):
+        """Check that thread will wait for the session if all sessions of the domain are in use"""
+        cs_api_session_class.side_effect = lambda **kwargs: mock.MagicMock()
+        used_sessions = []
+        checked_out = threading.Event()
+
+        def use_session():
+            with self.session_manager.session(cs_domain="Global") as cs_session:
+                used_sessions.append(cs_session)
+                checked_out.set()
+
+        with self.session_manager.session(cs_domain="Global") as first_session:
+            with self.session_manager.session(cs_domain="Global"):
+                thread = threading.Thread(target=use_session)
+                thread.start()
+                # act
+                self.assertFalse(checked_out.wait(0.1))
+        thread.join()
+        # verify
+        self.assertEqual(cs_api_session_class.call_count, 2)
+        self.assertEqual(len(used_sessions), 1)
+
+    @mock.patch("autodiscovery.common.cs_session_manager.time")
+    @mock.patch("autodiscovery.common.cs_session_manager.CloudShellAPISession")
+    def test_expired_session_is_logged_in_again(self, cs_api_session_class, time):
+        """Check that idle session will be replaced with a new one if it is no longer valid"""
+        expired_session = mock.MagicMock()
+        expired_session.GetServerDateAndTime.side_effect = Exception()
+        new_session = mock.MagicMock()
+        cs_api_session_class.side_effect = [expired_session, new_session]
+        time.time.side_effect = [0, 120, 120]
+
+        with self.session_manager.session(cs_domain="Global"):
+            pass
+        # act
+        with self.session_manager.session(cs_domain="Global") as cs_session:
+            pass
+        # verify
+        self.assertIs(cs_session, new_session)
+
+    @mock.patch("autodiscovery.common.cs_session_manager.CloudShellAPISession")
+    def test_failed_login_frees_session_slot(self, cs_api_session_class):
+        """Check that failed session creation will not take a place in the pool"""
+        cs_api_session_class.side_effect = [Exception(), Exception(), mock.MagicMock()]
+
+        for _ in xrange(2):
+            with self.assertRaises(Exception):
+                with self.session_manager.session(cs_domain="Global"):
+                    pass
+        # act
+        with self.session_manager.session(cs_domain="Global") as cs_session:
+            pass
+        # verify
+        self.assertIsNotNone(cs_session)
+
+    @mock.patch("autodiscovery.common.cs_session_manager.ThrottledCloudShellSession")
+    @mock.patch("autodiscovery.common.cs_session_manager.CloudShellAPISession")
+    def test_login_goes_through_throttler(self, cs_api_session_class, throttled_session_class):
+        """Check that login will be rate limited and retried by the throttler"""
+        api_throttler = mock.MagicMock()
+        self.session_manager._api_throttler = api_throttler
+        # act
+        with self.session_manager.session(cs_domain="Global") as cs_session:
+            pass
+        # verify
+        api_throttler.call.assert_called_once_with("Logon",
+                                                   cs_api_session_class,
+                                                   host="cs_ip",
+                                                   username="cs_user",
+                                                   password="cs_password",
+                                                   domain="Global")
+        throttled_session_class.assert_called_once_with(cs_session=api_throttler.call.return_value,
+                                                        throttler=api_throttler)
+        self.assertEqual(cs_session, throttled_session_class.return_value)
@@ -0,0 +1,35 @@
+import unittest
+
+import mock
+
+from autodiscovery.common.cs_shells_cache import CloudShellShellsCache
+
+
+class TestCloudShellShellsCache(unittest.TestCase):
+    def setUp(self):
+        self.shells_cache = CloudShellShellsCache()
+
+    def test_missing_model(self):
+        """Check that missing model will be remembered per CloudShell session"""
+        cs_session = mock.MagicMock()
+        # act
+        self.shells_cache.add_missing_model(cs_session=cs_session, resource_family="Switch", resource_model="Model")
+        # verify
+        self.assertTrue(self.shells_cache.is_model_missing(cs_session=cs_session,
+                                                           resource_family="Switch",
+                                                           resource_model="Model"))
+        self.assertFalse(self.shells_cache.is_model_missing(cs_session=cs_session,
+                                                            resource_family="Router",
+                                                            resource_model="Model"))
+        self.assertFalse(self.shells_cache.is_model_missing(cs_session=mock.MagicMock(),
+                                                            resource_family="Switch",
+                                                            resource_model="Model"))
+
+    def test_missing_driver(self):
+        """Check that missing driver will be remembered per CloudShell session"""
+        cs_session = mock.MagicMock()
+        # act
+        self.shells_cache.add_missing_driver(cs_session=cs_session, driver_name="Driver")
+        # verify
+        self.assertTrue(self.shells_cache.is_driver_missing(cs_session=cs_session, driver_name="Driver"))
+        self.assertFalse(self.shells_cache.is_driver_missing(cs_session=mock.MagicMock(), driver_name="Driver"))
@@ -0,0 +1,62 @@
+import unittest
+
+import mock
+
+from autodiscovery.common.cs_system_names_index import CloudShellSystemNamesIndex
+
+
+class TestCloudShellSystemNamesIndex(unittest.TestCase):
+    def setUp(self):
+        self.cs_session = mock.MagicMock(domain="Global")
+        self.cs_session.GetResourceList.return_value.Resources = [mock.MagicMock(ResourceFamilyName="CS_Switch"),
+                                                                  mock.MagicMock(ResourceFamilyName="CS_Switch")]
+        self.index = CloudShellSystemNamesIndex(logger=mock.MagicMock())
+
+    def _find_resources(self, resourceFamily, includeSubResources, attributeValues):
+        found = {("", "System Name", "switch-1"): "Switch 1",
+                 ("CS_Switch", "CS_Switch.System Name", "switch-2"): "Switch 2"}
+        name = found.get((resourceFamily, attributeValues[0].Name, attributeValues[0].Value))
+
+        if name is None:
+            # CloudShell returns an empty resource if nothing was found
+            return mock.MagicMock(Resources=[mock.MagicMock(ResourceFamilyName="")])
+
+        return mock.MagicMock(Resources=[mock.MagicMock(ResourceFamilyName=resourceFamily or "Switch",
+                                                        FullName=name)])
+
+    def test_find_resources(self):
+        """Check that method will find resources by System Name attribute with and without family prefix"""
+        self.cs_session.FindResources.side_effect = self._find_resources
+        # act
+        result_1 = self.index.find_resources(cs_session=self.cs_session, sys_name="switch-1")
+        result_2 = self.index.find_resources(cs_session=self.cs_session, sys_name="switch-2")
+        # verify
+        self.assertEqual(result_1, ["Switch 1"])
+        self.assertEqual(result_2, ["Switch 2"])
+        self.cs_session.GetResourceList.assert_called_once_with()
+        # one search without family and one for the single family per System Name
+        self.assertEqual(self.cs_session.FindResources.call_count, 4)
+
+    def test_find_resources_is_cached(self):
+        """Check that the same System Name will be searched only once per domain"""
+        self.cs_session.FindResources.side_effect = self._find_resources
+        self.index.find_resources(cs_session=self.cs_session, sys_name="switch-1")
+        self.index.find_resources(cs_session=self.cs_session, sys_name="unknown")
+        # act
+        result = self.index.find_resources(cs_session=self.cs_session, sys_name="switch-1")
+        not_found_result = self.index.find_resources(cs_session=self.cs_session, sys_name="unknown")
+        # verify
+        self.assertEqual(result, ["Switch 1"])
+        self.assertEqual(not_found_result, [])
+        self.assertEqual(self.cs_session.FindResources.call_count, 4)
+
+    def test_find_resources_per_domain(self):
+        """Check that System Name will be searched again for another domain"""
+        self.cs_session.FindResources.side_effect = self._find_resources
+        self.index.find_resources(cs_session=self.cs_session, sys_name="switch-1")
+        self.cs_session.domain = "Test"
+        # act
+        self.index.find_resources(cs_session=self.cs_session, sys_name="switch-1")
+        # verify
+        self.assertEqual(self.cs_session.GetResourceList.call_count, 2)
+        self.assertEqual(self.cs_session.FindResources.call_count, 4)
@@ -0,0 +1,89 @@
+import unittest
+
+import mock
+
+from autodiscovery.common.discovery_cache import DiscoveryCache
+
+
+class TestDiscoveryCache(unittest.TestCase):
+    def setUp(self):
+        self.discovery_cache = DiscoveryCache(file_path=":memory:", ttl=60, logger=mock.MagicMock())
+
+    def _get_entry(self, ip):
+        return mock.MagicMock(ip=ip,
+                              sys_object_id="SNMPv2-SMI::enterprises.9.1.222",
+                              description="Cisco IOS Software",
+                              snmp_community="public",
+                              vendor="Cisco",
+                              device_name="switch",
+                              model_type="switch",
+                              folder_path="Cisco",
+                              attributes={"CLI Connection Type": "SSH"})
+
+    def test_save_entry(self):
+        """Check that method will save entry that can be received later"""
+        entry = self._get_entry(ip="10.10.10.10")
+        # act
+        self.discovery_cache.save_entry(entry)
+        # verify
+        result = self.discovery_cache.get_entries_data(ips=["10.10.10.10", "10.10.10.20"])
+        self.assertEqual(result, {"10.10.10.10": {"ip": "10.10.10.10",
+                                                  "sys_object_id": entry.sys_object_id,
+                                                  "description": entry.description,
+                                                  "snmp_community": entry.snmp_community,
+                                                  "vendor": entry.vendor,
+                                                  "device_name": entry.device_name,
+                                                  "model_type": entry.model_type,
+                                                  "folder_path": entry.folder_path,
+                                                  "attributes": entry.attributes}})
+
+    def test_get_entries_data_in_chunks(self):
+        """Check that devices will be requested from the database in chunks of the given size"""
+        ips = ["10.10.10.{}".format(num) for num in xrange(5)]
+        for ip in ips:
+            self.discovery_cache.save_entry(self._get_entry(ip))
+        self.discovery_cache.query_chunk_size = 2
+        # act
+        result = self.discovery_cache.get_entries_data(ips=iter(ips[1:] + ["10.10.10.100"]))
+        # verify
+        self.assertEqual(sorted(result), ips[1:])
+
+    def test_save_entry_without_passwords(self):
+        """Check that method will not store passwords of the device"""
+        entry = self._get_entry(ip="10.10.10.10")
+        entry.attributes = {"User": "admin", "Password": "secret", "Enable Password": "enable secret"}
+        # act
+        self.discovery_cache.save_entry(entry)
+        # verify
+        result = self.discovery_cache.get_entries_data(ips=["10.10.10.10"])
+        self.assertEqual(result["10.10.10.10"]["attributes"],
+                         {"User": "admin", "Password": None, "Enable Password": None})
+
+    @mock.patch("autodiscovery.common.discovery_cache.time")
+    def test_get_entries_data_skips_expired_entries(self, time):
+        """Check that method will not return entries that were saved earlier than TTL"""
+        time.time.return_value = 1000
+        self.discovery_cache.save_entry(self._get_entry(ip="10.10.10.10"))
+        time.time.return_value = 1061
+        # act
+        result = self.discovery_cache.get_entries_data(ips=["10.10.10.10"])
+        # verify
+        self.assertEqual(result, {})
+
+    def test_invalidate(self):
+        """Check that method will remove only given entries"""
+        self.discovery_cache.save_entry(self._get_entry(ip="10.10.10.10"))
+        self.discovery_cache.save_entry(self._get_entry(ip="10.10.10.20"))
+        # act
+        self.discovery_cache.invalidate(ips=["10.10.10.10"])
+        # verify
+        result = self.discovery_cache.get_entries_data(ips=["10.10.10.10", "10.10.10.20"])
+        self.assertEqual(result.keys(), ["10.10.10.20"])
+
+    def test_invalidate_all(self):
+        """Check that method will remove all entries"""
+        self.discovery_cache.save_entry(self._get_entry(ip="10.10.10.10"))
+        # act
+        self.discovery_cache.invalidate()
+        # verify
+        self.assertEqual(self.discovery_cache.get_entries_data(ips=["10.10.10.10"]), {})
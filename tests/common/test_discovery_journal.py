@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from autodiscovery.common.discovery_journal import DiscoveryJournal
+
+
+class TestDiscoveryJournal(unittest.TestCase):
+    def setUp(self):
+        journal_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, journal_dir)
+        self.file_path = os.path.join(journal_dir, "report.xlsx.journal")
+        self.logger = mock.MagicMock()
+        self.discovery_journal = DiscoveryJournal(file_path=self.file_path, logger=self.logger)
+
+    def _get_entry(self, ip, status="Success"):
+        return mock.MagicMock(ip=ip,
+                              domain="Global",
+                              status=status,
+                              comment="",
+                              vendor="Cisco",
+                              sys_object_id="SNMPv2-SMI::enterprises.9.1.222",
+                              description="Cisco IOS Software",
+                              snmp_community="public",
+                              model_type="switch",
+                              device_name="switch",
+                              folder_path="Cisco",
+                              attributes={"User": "admin", "Password": "secret"})
+
+    def test_record(self):
+        """Check that recorded entry without passwords will be loaded by the next run"""
+        self.discovery_journal.start()
+        # act
+        self.discovery_journal.record(self._get_entry(ip="10.10.10.10"))
+        # verify
+        result = DiscoveryJournal(file_path=self.file_path, logger=self.logger).load()
+        self.assertEqual(result, {"10.10.10.10": {"ip": "10.10.10.10",
+                                                  "domain": "Global",
+                                                  "status": "Success",
+                                                  "comment": "",
+                                                  "vendor": "Cisco",
+                                                  "sys_object_id": "SNMPv2-SMI::enterprises.9.1.222",
+                                                  "description": "Cisco IOS Software",
+                                                  "snmp_community": "public",
+                                                  "model_type": "switch",
+                                                  "device_name": "switch",
+                                                  "folder_path": "Cisco",
+                                                  "attributes": {"User": "admin", "Password": None}}})
+
+    def test_load_no_file(self):
+        """Check that method will return empty dictionary if there is no journal"""
+        self.assertEqual(self.discovery_journal.load(), {})
+
+    def test_start_resume_after_broken_line(self):
+        """Check that partially written record will be skipped and next records will be written on a new line"""
+        self.discovery_journal.start()
+        self.discovery_journal.record(self._get_entry(ip="10.10.10.10"))
+        self.discovery_journal.close()
+
+        with open(self.file_path, "a") as journal_file:
+            journal_file.write('{"ip": "10.10.10.20", "dom')
+
+        # act
+        self.discovery_journal.start(resume=True)
+        self.discovery_journal.record(self._get_entry(ip="10.10.10.30", status="Failed"))
+        self.discovery_journal.close()
+        # verify
+        result = self.discovery_journal.load()
+        self.assertEqual(sorted(result), ["10.10.10.10", "10.10.10.30"])
+        self.assertEqual(result["10.10.10.30"]["status"], "Failed")
+        self.assertEqual(self.logger.warning.call_count, 1)
+
+    def test_start_without_resume(self):
+        """Check that devices recorded by the previous run will be removed if the run isn't resumed"""
+        self.discovery_journal.start()
+        self.discovery_journal.record(self._get_entry(ip="10.10.10.10"))
+        self.discovery_journal.close()
+        # act
+        self.discovery_journal.start(resume=False)
+        # verify
+        self.assertEqual(self.discovery_journal.load(), {})
+
+    def test_close_remove(self):
+        """Check that journal file will be removed when the run is finished"""
+        self.discovery_journal.start()
+        # act
+        self.discovery_journal.close(remove=True)
+        # verify
+        self.assertFalse(os.path.exists(self.file_path))
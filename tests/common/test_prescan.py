@@ -0,0 +1,67 @@
+import errno
+import unittest
+
+import mock
+
+from autodiscovery.common.prescan import PortState
+from autodiscovery.common.prescan import PreScanner
+
+
+class TestPreScanner(unittest.TestCase):
+    def setUp(self):
+        self.logger = mock.MagicMock()
+        self.prescanner = PreScanner(ports=[161, 22], timeout=1, workers=2, logger=self.logger)
+
+    @mock.patch("autodiscovery.common.prescan.select")
+    @mock.patch("autodiscovery.common.prescan.socket")
+    def test_probe(self, socket, select):
+        """Check that method will return state for each probed port"""
+        closed_sock = mock.MagicMock(connect_ex=mock.MagicMock(return_value=errno.EINPROGRESS))
+        open_sock = mock.MagicMock(connect_ex=mock.MagicMock(return_value=errno.EINPROGRESS))
+        socket.socket.side_effect = [closed_sock, open_sock]
+        select.select.return_value = ([], [closed_sock, open_sock], [])
+        self.prescanner._get_socket_error = mock.MagicMock(
+            side_effect=lambda sock: errno.ECONNREFUSED if sock is closed_sock else 0)
+        # act
+        result = self.prescanner.probe(ip="10.10.10.10")
+        # verify
+        self.assertEqual(result, {161: PortState.CLOSED, 22: PortState.OPEN})
+        closed_sock.close.assert_called_once_with()
+        open_sock.close.assert_called_once_with()
+
+    @mock.patch("autodiscovery.common.prescan.select")
+    @mock.patch("autodiscovery.common.prescan.socket")
+    def test_probe_no_answer(self, socket, select):
+        """Check that method will mark ports as filtered if host doesn't answer until timeout"""
+        socket.socket.return_value.connect_ex.return_value = errno.EINPROGRESS
+        select.select.return_value = ([], [], [])
+        self.prescanner.timeout = 0.01
+        # act
+        result = self.prescanner.probe(ip="10.10.10.10")
+        # verify
+        self.assertEqual(result, {161: PortState.FILTERED, 22: PortState.FILTERED})
+
+    def test_is_alive(self):
+        """Check that host is alive if it answered on any port, even with the TCP reset"""
+        self.assertTrue(self.prescanner.is_alive({161: PortState.FILTERED, 22: PortState.CLOSED}))
+        self.assertFalse(self.prescanner.is_alive({161: PortState.FILTERED, 22: PortState.FILTERED}))
+
+    def test_find_alive_hosts(self):
+        """Check that method will return only alive hosts with their ports states"""
+        alive_ports_states = {161: PortState.FILTERED, 22: PortState.OPEN}
+        dead_ports_states = {161: PortState.FILTERED, 22: PortState.FILTERED}
+        self.prescanner.probe = mock.MagicMock(side_effect=lambda ip: {"10.10.10.10": alive_ports_states,
+                                                                       "10.10.10.11": dead_ports_states}[ip])
+        # act
+        result = self.prescanner.find_alive_hosts(["10.10.10.10", "10.10.10.11"])
+        # verify
+        self.assertEqual(result, {"10.10.10.10": alive_ports_states})
+
+    def test_probe_hosts(self):
+        """Check that method will return ports states for all hosts, even for the dead ones"""
+        ports_states = {161: PortState.FILTERED, 22: PortState.FILTERED}
+        self.prescanner.probe = mock.MagicMock(return_value=ports_states)
+        # act
+        result = self.prescanner.probe_hosts(["10.10.10.10", "10.10.10.11"])
+        # verify
+        self.assertEqual(result, {"10.10.10.10": ports_states, "10.10.10.11": ports_states})
@@ -0,0 +1,29 @@
+import unittest
+
+from autodiscovery.common.snmp_community_cache import SNMPCommunityCache
+
+
+class TestSNMPCommunityCache(unittest.TestCase):
+    def setUp(self):
+        self.community_cache = SNMPCommunityCache(prefix_length=24)
+
+    def test_get_no_learned_community(self):
+        """Check that method will return None if there is no community string for the subnet"""
+        self.assertIsNone(self.community_cache.get(device_ip="10.10.10.10"))
+
+    def test_learn(self):
+        """Check that learned community string will be returned only for devices from the same subnet"""
+        # act
+        self.community_cache.learn(device_ip="10.10.10.10", snmp_community="public")
+        # verify
+        self.assertEqual(self.community_cache.get(device_ip="10.10.10.254"), "public")
+        self.assertIsNone(self.community_cache.get(device_ip="10.10.11.10"))
+
+    def test_learn_with_custom_prefix_length(self):
+        """Check that subnet size depends on the prefix length"""
+        community_cache = SNMPCommunityCache(prefix_length=16)
+        # act
+        community_cache.learn(device_ip="10.10.10.10", snmp_community="public")
+        # verify
+        self.assertEqual(community_cache.get(device_ip="10.10.11.10"), "public")
+        self.assertIsNone(community_cache.get(device_ip="10.11.10.10"))
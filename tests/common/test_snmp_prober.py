@@ -0,0 +1,88 @@
+import unittest
+
+import mock
+from pysnmp.proto.rfc1902 import OctetString
+from pysnmp.proto.rfc1905 import NoSuchObject
+
+from autodiscovery.common.snmp_prober import AsyncSNMPProber
+
+
+class TestAsyncSNMPProber(unittest.TestCase):
+    def setUp(self):
+        self.logger = mock.MagicMock()
+        self.snmp_prober = AsyncSNMPProber(timeout=1, retries=0, max_requests=2, logger=self.logger)
+
+    def test_prepare_value(self):
+        """Check that method will return an empty string if there is no such object on the device"""
+        self.assertEqual(self.snmp_prober._prepare_value(OctetString("sys name  ")), "sys name")
+        self.assertEqual(self.snmp_prober._prepare_value(NoSuchObject("")), "")
+
+    @mock.patch("autodiscovery.common.snmp_prober.UdpTransportTarget")
+    @mock.patch("autodiscovery.common.snmp_prober.SnmpEngine")
+    @mock.patch("autodiscovery.common.snmp_prober.getCmd")
+    def test_probe_with_community(self, get_cmd, snmp_engine_class, udp_transport_target_class):
+        """Check that method will send requests to all devices and add answered ones to the results"""
+        ips = ["10.10.10.10", "10.10.10.11", "10.10.10.12"]
+        snmp_community = "public"
+        results = {}
+        requests = []
+        get_cmd.side_effect = lambda *args, **kwargs: requests.append(kwargs)
+        var_binds = [(mock.MagicMock(), OctetString("SNMPv2-SMI::enterprises.9.1.222")),
+                     (mock.MagicMock(), OctetString("description")),
+                     (mock.MagicMock(), OctetString("sys name"))]
+
+        def run_dispatcher():
+            # answer requests one by one, the next request is sent from the response callback
+            while requests:
+                request = requests.pop(0)
+                error_indication = "timeout" if request["cbCtx"] == ("10.10.10.11", snmp_community) else None
+                request["cbFun"](None, None, error_indication, 0, 0, var_binds, request["cbCtx"])
+
+        snmp_engine_class.return_value.transportDispatcher.runDispatcher.side_effect = run_dispatcher
+        # act
+        self.snmp_prober._probe_with_community(ips=ips, snmp_community=snmp_community, results=results)
+        # verify
+        self.assertEqual(sorted(results), ["10.10.10.10", "10.10.10.12"])
+        self.assertEqual(results["10.10.10.10"].snmp_community, snmp_community)
+        self.assertEqual(results["10.10.10.10"].sys_object_id, "SNMPv2-SMI::enterprises.9.1.222")
+        self.assertEqual(results["10.10.10.10"].description, "description")
+        self.assertEqual(results["10.10.10.10"].sys_name, "sys name")
+        self.assertEqual(get_cmd.call_count, len(ips))
+        udp_transport_target_class.assert_any_call(("10.10.10.11", 161), timeout=1, retries=0)
+
+    def test_get_sys_object_ids(self):
+        """Check that method will request only sysObjectID with the given community string for each device"""
+        devices = {"10.10.10.10": "public"}
+
+        def send_requests(devices, oids, handle_values):
+            for ip, snmp_community in devices:
+                handle_values(ip, snmp_community, ["SNMPv2-SMI::enterprises.9.1.222"])
+
+        self.snmp_prober._send_requests = mock.MagicMock(side_effect=send_requests)
+        # act
+        result = self.snmp_prober.get_sys_object_ids(devices=devices)
+        # verify
+        self.assertEqual(result, {"10.10.10.10": "SNMPv2-SMI::enterprises.9.1.222"})
+        self.assertEqual(self.snmp_prober._send_requests.call_args[1]["oids"], (("SNMPv2-MIB", "sysObjectID", 0),))
+
+    def test_probe(self):
+        """Check that method will try next community string only for devices that didn't answer"""
+        first_info = mock.MagicMock()
+        second_info = mock.MagicMock()
+
+        def probe_with_community(ips, snmp_community, results):
+            if snmp_community == "private":
+                results["10.10.10.10"] = first_info
+            else:
+                results["10.10.10.11"] = second_info
+
+        self.snmp_prober._probe_with_community = mock.MagicMock(side_effect=probe_with_community)
+        # act
+        result = self.snmp_prober.probe(ips=iter(["10.10.10.10", "10.10.10.11"]),
+                                        snmp_community_strings=["private", "public", "other"])
+        # verify
+        self.assertEqual(result, {"10.10.10.10": first_info, "10.10.10.11": second_info})
+        self.assertEqual(self.snmp_prober._probe_with_community.call_count, 2)
+        self.snmp_prober._probe_with_community.assert_called_with(ips=["10.10.10.11"],
+                                                                  snmp_community="public",
+                                                                  results=result)
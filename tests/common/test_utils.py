@@ -1,9 +1,19 @@
+import Queue
+import threading
 import unittest
 
 import mock
+from multiprocessing.pool import ThreadPool
 
+from autodiscovery.common.utils import get_cache_path
 from autodiscovery.common.utils import get_full_path
 from autodiscovery.common.utils import get_logger
+from autodiscovery.common.utils import join_thread
+from autodiscovery.common.utils import parallel_first
+from autodiscovery.common.utils import parallel_imap
+from autodiscovery.common.utils import parallel_pipeline
+from autodiscovery.common.utils import queue_get
+from autodiscovery.common.utils import wait_async_result
 
 
 class TestUtils(unittest.TestCase):
@@ -38,3 +48,148 @@ class TestUtils(unittest.TestCase):
         # verify
         self.assertEqual(result, joined_path)
         os.path.join.assert_called_once_with(base_dir, os.pardir, os.pardir, dir1, dir2, filename)
+
+    @mock.patch.dict("os.environ", {"XDG_CACHE_HOME": "/home/user/.cache"})
+    @mock.patch("autodiscovery.common.utils.os.name", "posix")
+    def test_get_cache_path(self):
+        """Check that method will return path in the per-user cache folder"""
+        # act
+        result = get_cache_path("test.pickle")
+        # verify
+        self.assertEqual(result, "/home/user/.cache/cloudshell-autodiscovery/test.pickle")
+
+    @mock.patch("autodiscovery.common.utils.config")
+    def test_wait_async_result(self, config):
+        """Check that function will wait for the result with timeout until it is ready"""
+        async_result = mock.MagicMock()
+        async_result.ready.side_effect = [False, False, True]
+        # act
+        result = wait_async_result(async_result)
+        # verify
+        self.assertEqual(result, async_result.get.return_value)
+        async_result.wait.assert_called_with(config.INTERRUPTIBLE_WAIT_INTERVAL)
+        self.assertEqual(async_result.wait.call_count, 2)
+
+    @mock.patch("autodiscovery.common.utils.config")
+    def test_join_thread(self, config):
+        """Check that function will join the thread with timeout until it is finished"""
+        thread = mock.MagicMock()
+        thread.is_alive.side_effect = [True, True, False]
+        # act
+        join_thread(thread)
+        # verify
+        thread.join.assert_called_with(config.INTERRUPTIBLE_WAIT_INTERVAL)
+        self.assertEqual(thread.join.call_count, 2)
+
+    @mock.patch("autodiscovery.common.utils.config")
+    def test_queue_get(self, config):
+        """Check that function will get item from the queue with timeout until it is available"""
+        queue = mock.MagicMock()
+        queue.get.side_effect = [Queue.Empty(), "item"]
+        # act
+        result = queue_get(queue)
+        # verify
+        self.assertEqual(result, "item")
+        queue.get.assert_called_with(timeout=config.INTERRUPTIBLE_WAIT_INTERVAL)
+
+    def test_parallel_imap(self):
+        """Check that function will return results in the same order as the given items"""
+        items = range(20)
+        # act
+        result = list(parallel_imap(lambda item: item * 2, items, workers=4))
+        # verify
+        self.assertEqual(result, [item * 2 for item in items])
+
+    def test_parallel_imap_consumes_iterable_lazily(self):
+        """Check that items will be taken from the iterable only when the submitted results are consumed"""
+        taken_items = []
+
+        def items():
+            for item in xrange(200000):
+                taken_items.append(item)
+                yield item
+
+        results = parallel_imap(lambda item: item, items(), workers=4)
+        # act
+        first_result = next(results)
+        # verify
+        self.assertEqual(first_result, 0)
+        self.assertLessEqual(len(taken_items), 4 * 2 + 1)
+        results.close()
+
+    @mock.patch("autodiscovery.common.utils.ThreadPool")
+    def test_parallel_imap_single_worker(self, thread_pool_class):
+        """Check that function will not create a pool of threads for the single worker"""
+        items = ["item 1", "item 2"]
+        func = mock.MagicMock()
+        # act
+        result = list(parallel_imap(func, items, workers=1))
+        # verify
+        self.assertEqual(result, [func(), func()])
+        func.assert_any_call("item 1")
+        func.assert_any_call("item 2")
+        thread_pool_class.assert_not_called()
+
+    def test_parallel_first(self):
+        """Check that function will return the first result that is not None"""
+        # act
+        result = parallel_first(lambda item: item if item == "valid" else None, ["invalid", "valid", "other"])
+        # verify
+        self.assertEqual(result, "valid")
+
+    def test_parallel_first_skips_items_after_result(self):
+        """Check that items that weren't started before the first result was found will be skipped"""
+        pool = ThreadPool(processes=1)
+        released = threading.Event()
+        called_items = []
+
+        def func(item):
+            called_items.append(item)
+            if item == "second":
+                released.wait()
+            return item
+
+        # act
+        result = parallel_first(func, ["first", "second", "third"], pool=pool)
+        released.set()
+        pool.close()
+        pool.join()
+        # verify
+        self.assertEqual(result, "first")
+        self.assertNotIn("third", called_items)
+
+    def test_parallel_first_no_results(self):
+        """Check that function will return None if all results are None"""
+        # act
+        result = parallel_first(lambda item: None, ["item 1", "item 2"])
+        # verify
+        self.assertIsNone(result)
+
+    def test_parallel_pipeline(self):
+        """Check that function will pass all results of the first stage that are not None to the second stage"""
+        consumed_items = []
+        # act
+        parallel_pipeline(produce_func=lambda item: item * 2 if item % 2 else None,
+                          consume_func=consumed_items.append,
+                          iterable=range(20),
+                          producers=4,
+                          consumers=3,
+                          queue_size=1)
+        # verify
+        self.assertEqual(sorted(consumed_items), [item * 2 for item in range(20) if item % 2])
+
+    def test_parallel_pipeline_raises_consumer_error(self):
+        """Check that function will process all items and raise error of the second stage at the end"""
+        produced_items = []
+
+        def consume_func(item):
+            raise ValueError(item)
+
+        # act
+        with self.assertRaises(ValueError):
+            parallel_pipeline(produce_func=lambda item: produced_items.append(item) or item,
+                              consume_func=consume_func,
+                              iterable=range(5),
+                              queue_size=1)
+        # verify
+        self.assertEqual(produced_items, range(5))
@@ -4,6 +4,8 @@ import mock
 from cloudshell.api.common_cloudshell_api import CloudShellAPIError
 
 from autodiscovery.common.consts import CloudshellAPIErrorCodes
+from autodiscovery.common.consts import ExistingResourceActions
+from autodiscovery.common.prescan import PortState
 from autodiscovery.exceptions import ReportableException
 from autodiscovery.handlers.base import AbstractHandler
 
@@ -88,40 +90,163 @@ class TestAbstractHandler(unittest.TestCase):
                                                                folderFullPath=folder_path)
 
     def test_create_cs_resource_resource_name_is_taken(self):
-        """Check that method will try to create resource one more time if given resource name is already taken"""
+        """Check that method will pick unique name locally if given resource name is already taken"""
         resource_name = "test resource name"
-        resource_family = "test resource family"
-        resource_model = "test resource model"
-        device_ip = "test device IP"
-        folder_path = "test folder path"
-        expected_resource_name = "{}-1".format(resource_name)
-        self.tested_instance._add_resource_driver = mock.MagicMock()
+        self.cs_session.GetResourceList.return_value.Resources = [
+            mock.MagicMock(Name=resource_name, Address="10.0.0.1", FullAddress="10.0.0.1"),
+            mock.MagicMock(Name="{}-1".format(resource_name), Address="10.0.0.2", FullAddress="10.0.0.2")]
+        # act
+        result = self.tested_instance._create_cs_resource(cs_session=self.cs_session,
+                                                          resource_name=resource_name,
+                                                          resource_family="test resource family",
+                                                          resource_model="test resource model",
+                                                          device_ip="test device IP",
+                                                          folder_path="test folder path")
+        # verify
+        self.assertEqual(result, "{}-2".format(resource_name))
+        self.cs_session.CreateResource.assert_called_once_with(resourceFamily="test resource family",
+                                                               resourceModel="test resource model",
+                                                               resourceName="{}-2".format(resource_name),
+                                                               resourceAddress="test device IP",
+                                                               folderFullPath="test folder path")
+
+    def test_create_cs_resource_resource_name_was_taken_after_loading(self):
+        """Check that method will try next unique name if resource name was taken after the resources loading"""
+        resource_name = "test resource name"
+        self.cs_session.GetResourceList.return_value.Resources = []
         self.cs_session.CreateResource.side_effect = [
             CloudShellAPIError(code=CloudshellAPIErrorCodes.RESOURCE_ALREADY_EXISTS,
                                message="",
                                rawxml=""),
             None]
-
+        # act
         result = self.tested_instance._create_cs_resource(cs_session=self.cs_session,
                                                           resource_name=resource_name,
-                                                          resource_family=resource_family,
-                                                          resource_model=resource_model,
-                                                          device_ip=device_ip,
-                                                          folder_path=folder_path)
+                                                          resource_family="test resource family",
+                                                          resource_model="test resource model",
+                                                          device_ip="test device IP",
+                                                          folder_path="test folder path")
+        # verify
+        self.assertEqual(result, "{}-1".format(resource_name))
+        self.assertEqual(self.cs_session.CreateResource.call_count, 2)
+
+    def test_upload_resource_missing_model_is_not_created_again(self):
+        """Check that resource of the model that was found missing will not be created for the next device"""
+        self.cs_session.CreateResource.side_effect = CloudShellAPIError(
+            code=CloudshellAPIErrorCodes.UNABLE_TO_LOCATE_FAMILY_OR_MODEL,
+            message="",
+            rawxml="")
+        entry = mock.MagicMock(folder_path="", attributes={})
+        # act
+        for _ in xrange(2):
+            result = self.tested_instance._upload_resource(cs_session=self.cs_session,
+                                                           entry=entry,
+                                                           resource_family="family",
+                                                           resource_model="model",
+                                                           driver_name="driver")
+            # verify
+            self.assertIsNone(result)
+
+        self.cs_session.CreateResource.assert_called_once()
+
+    def test_upload_resource_missing_driver_fails_before_creation(self):
+        """Check that resource will not be created if its driver was found missing for the previous device"""
+        self.cs_session.UpdateResourceDriver.side_effect = CloudShellAPIError(
+            code=CloudshellAPIErrorCodes.UNABLE_TO_LOCATE_DRIVER,
+            message="",
+            rawxml="")
+        entry = mock.MagicMock(folder_path="", attributes={})
+
+        with self.assertRaises(ReportableException):
+            self.tested_instance._upload_resource(cs_session=self.cs_session,
+                                                  entry=entry,
+                                                  resource_family="family",
+                                                  resource_model="model",
+                                                  driver_name="driver")
+        # act
+        with self.assertRaisesRegexp(ReportableException, "is not installed"):
+            self.tested_instance._upload_resource(cs_session=self.cs_session,
+                                                  entry=entry,
+                                                  resource_family="family",
+                                                  resource_model="model",
+                                                  driver_name="driver")
         # verify
-        self.assertEqual(result, expected_resource_name)
+        self.cs_session.CreateResource.assert_called_once()
 
-        self.cs_session.CreateResource.assert_any_call(resourceFamily=resource_family,
-                                                       resourceModel=resource_model,
-                                                       resourceName=resource_name,
-                                                       resourceAddress=device_ip,
-                                                       folderFullPath=folder_path)
+    def test_upload_resource_skips_existing_resource(self):
+        """Check that resource will not be created if resource with the device address already exists"""
+        self.tested_instance.existing_resource_action = ExistingResourceActions.SKIP
+        self.cs_session.GetResourceList.return_value.Resources = [
+            mock.MagicMock(Name="existing", Address="10.0.0.1", FullAddress="10.0.0.1")]
+        entry = mock.MagicMock(ip="10.0.0.1", folder_path="Root", attributes={})
+        # act
+        result = self.tested_instance._upload_resource(cs_session=self.cs_session,
+                                                       entry=entry,
+                                                       resource_family="family",
+                                                       resource_model="model",
+                                                       driver_name="driver")
+        # verify
+        self.assertEqual(result, "existing")
+        self.cs_session.CreateFolder.assert_not_called()
+        self.cs_session.CreateResource.assert_not_called()
+        self.cs_session.SetAttributesValues.assert_not_called()
 
-        self.cs_session.CreateResource.assert_any_call(resourceFamily=resource_family,
-                                                       resourceModel=resource_model,
-                                                       resourceName=expected_resource_name,
-                                                       resourceAddress=device_ip,
-                                                       folderFullPath=folder_path)
+    def test_upload_resource_updates_existing_resource(self):
+        """Check that attributes and driver of the existing resource will be updated instead of the creation"""
+        self.tested_instance.existing_resource_action = ExistingResourceActions.UPDATE
+        self.cs_session.GetResourceList.return_value.Resources = [
+            mock.MagicMock(Name="existing", Address="10.0.0.1", FullAddress="10.0.0.1", ResourceModelName="Model")]
+        entry = mock.MagicMock(ip="10.0.0.1", folder_path="", attributes={})
+        # act
+        result = self.tested_instance._upload_resource(cs_session=self.cs_session,
+                                                       entry=entry,
+                                                       resource_family="family",
+                                                       resource_model="model",
+                                                       driver_name="driver")
+        # verify
+        self.assertEqual(result, "existing")
+        self.cs_session.CreateResource.assert_not_called()
+        self.cs_session.UpdateResourceDriver.assert_called_once_with(resourceFullPath="existing",
+                                                                     driverName="driver")
+        self.cs_session.AutoLoad.assert_called_once_with("existing")
+
+    def test_upload_resource_updates_existing_resource_with_other_model(self):
+        """Check that method will return None if existing resource has a different model"""
+        self.tested_instance.existing_resource_action = ExistingResourceActions.UPDATE
+        self.cs_session.GetResourceList.return_value.Resources = [
+            mock.MagicMock(Name="existing", Address="10.0.0.1", FullAddress="10.0.0.1", ResourceModelName="other")]
+        entry = mock.MagicMock(ip="10.0.0.1", folder_path="", attributes={})
+        # act
+        result = self.tested_instance._upload_resource(cs_session=self.cs_session,
+                                                       entry=entry,
+                                                       resource_family="family",
+                                                       resource_model="model",
+                                                       driver_name="driver")
+        # verify
+        self.assertIsNone(result)
+        self.cs_session.CreateResource.assert_not_called()
+        self.cs_session.SetAttributesValues.assert_not_called()
+
+    def test_get_upload_error_existing_resource_with_other_model(self):
+        """Check that method will report existing resource with a different model"""
+        self.tested_instance.existing_resource_action = ExistingResourceActions.UPDATE
+        self.cs_session.GetResourceList.return_value.Resources = [
+            mock.MagicMock(Name="existing", Address="10.0.0.1", FullAddress="10.0.0.1", ResourceModelName="other")]
+        entry = mock.MagicMock(ip="10.0.0.1")
+        # act
+        result = self.tested_instance._get_upload_error(cs_session=self.cs_session, entry=entry, driver_name="driver")
+        # verify
+        self.assertEqual(result, "Resource existing with the same address already exists on the CloudShell "
+                                 "with a different model other")
+
+    def test_get_upload_error_shell_not_installed(self):
+        """Check that method will report missing shell if there is no existing resource"""
+        self.cs_session.GetResourceList.return_value.Resources = []
+        entry = mock.MagicMock(ip="10.0.0.1")
+        # act
+        result = self.tested_instance._get_upload_error(cs_session=self.cs_session, entry=entry, driver_name="driver")
+        # verify
+        self.assertEqual(result, "Shell driver is not installed")
 
     @mock.patch("autodiscovery.handlers.base.SSHDiscoverySession")
     @mock.patch("autodiscovery.handlers.base.TelnetDiscoverySession")
@@ -142,8 +267,8 @@ class TestAbstractHandler(unittest.TestCase):
                                                   vendor_settings=vendor_settings,
                                                   device_ip=device_ip)
         # verify
-        telnet_session_class.assert_called_once_with(device_ip)
-        ssh_session_class.assert_called_once_with(device_ip)
+        telnet_session_class.assert_called_once_with(device_ip, port=23)
+        ssh_session_class.assert_called_once_with(device_ip, port=22)
 
         ssh_session.check_credentials.assert_called_once_with(cli_credentials=vendor_cli_creds,
                                                               default_prompt=vendor.default_prompt,
@@ -184,3 +309,105 @@ class TestAbstractHandler(unittest.TestCase):
                                                                  logger=self.logger)
 
         vendor_cli_creds.update_valid_creds.assert_called_once_with(valid_creds)
+
+    @mock.patch("autodiscovery.handlers.base.SSHDiscoverySession")
+    @mock.patch("autodiscovery.handlers.base.TelnetDiscoverySession")
+    def test_get_cli_credentials_limits_connections(self, telnet_session_class, ssh_session_class):
+        """Check that each CLI session will be opened within the CLI connections limit for the device"""
+        self.tested_instance.cli_connection_limiter = mock.MagicMock()
+        vendor_settings = mock.MagicMock()
+        device_ip = "device_ip"
+        ssh_session_class.return_value.check_credentials.side_effect = Exception()
+        telnet_session_class.return_value.check_credentials.side_effect = Exception()
+        # act
+        self.tested_instance._get_cli_credentials(vendor=mock.MagicMock(),
+                                                  vendor_settings=vendor_settings,
+                                                  device_ip=device_ip)
+        # verify
+        self.assertEqual(self.tested_instance.cli_connection_limiter.connection.call_args_list,
+                         [mock.call(device_ip), mock.call(device_ip)])
+
+    @mock.patch("autodiscovery.handlers.base.SSHDiscoverySession")
+    @mock.patch("autodiscovery.handlers.base.TelnetDiscoverySession")
+    def test_get_cli_sessions_skips_not_open_ports(self, telnet_session_class, ssh_session_class):
+        """Check that method will return only sessions for the CLI ports that were found open"""
+        device_ip = "device_ip"
+        # act
+        result = self.tested_instance._get_cli_sessions(device_ip=device_ip,
+                                                        cli_ports_states={22: PortState.FILTERED,
+                                                                          23: PortState.OPEN})
+        # verify
+        self.assertEqual(result, [telnet_session_class.return_value])
+        ssh_session_class.assert_not_called()
+
+    @mock.patch("autodiscovery.handlers.base.SSHDiscoverySession")
+    @mock.patch("autodiscovery.handlers.base.TelnetDiscoverySession")
+    def test_get_cli_sessions_without_ports_states(self, telnet_session_class, ssh_session_class):
+        """Check that method will return SSH and then Telnet session if CLI ports weren't probed"""
+        # act
+        result = self.tested_instance._get_cli_sessions(device_ip="device_ip")
+        # verify
+        self.assertEqual(result, [ssh_session_class.return_value, telnet_session_class.return_value])
+
+    def test_upload_resource_schedules_autoload(self):
+        """Check that method will schedule Autoload in the background instead of running it"""
+        autoload_scheduler = mock.MagicMock()
+        self.tested_instance.autoload_scheduler = autoload_scheduler
+        self.tested_instance._create_cs_resource = mock.MagicMock(return_value="resource name")
+        self.tested_instance._add_resource_driver = mock.MagicMock()
+        entry = mock.MagicMock(folder_path="", attributes={})
+        # act
+        self.tested_instance._upload_resource(cs_session=self.cs_session,
+                                              entry=entry,
+                                              resource_family="family",
+                                              resource_model="model",
+                                              driver_name="driver")
+        # verify
+        self.cs_session.AutoLoad.assert_not_called()
+        autoload_scheduler.schedule.assert_called_once_with(cs_domain=self.cs_session.domain,
+                                                            resource_name="resource name",
+                                                            entry=entry)
+
+    def test_upload_resource_batches_attributes(self):
+        """Check that attributes will be added to the batch and Autoload scheduled after they are set"""
+        attributes_batcher = mock.MagicMock()
+        autoload_scheduler = mock.MagicMock()
+        self.tested_instance.attributes_batcher = attributes_batcher
+        self.tested_instance.autoload_scheduler = autoload_scheduler
+        self.tested_instance._create_cs_resource = mock.MagicMock(return_value="resource name")
+        self.tested_instance._add_resource_driver = mock.MagicMock()
+        entry = mock.MagicMock(folder_path="", attributes={"User": "admin"})
+        # act
+        self.tested_instance._upload_resource(cs_session=self.cs_session,
+                                              entry=entry,
+                                              resource_family="family",
+                                              resource_model="model",
+                                              driver_name="driver")
+        # verify
+        self.cs_session.SetAttributesValues.assert_not_called()
+        attributes_batcher.add.assert_called_once()
+        add_kwargs = attributes_batcher.add.call_args[1]
+        self.assertEqual(add_kwargs["request"].ResourceFullName, "resource name")
+        self.assertEqual(add_kwargs["entry"], entry)
+        autoload_scheduler.schedule.assert_not_called()
+        add_kwargs["on_success"]()
+        autoload_scheduler.schedule.assert_called_once_with(cs_domain=self.cs_session.domain,
+                                                            resource_name="resource name",
+                                                            entry=entry)
+
+    def test_upload_resource_does_not_batch_attributes_before_autoload(self):
+        """Check that attributes will be set right away if Autoload is run right after the upload"""
+        self.tested_instance.attributes_batcher = mock.MagicMock()
+        self.tested_instance._create_cs_resource = mock.MagicMock(return_value="resource name")
+        self.tested_instance._add_resource_driver = mock.MagicMock()
+        entry = mock.MagicMock(folder_path="", attributes={})
+        # act
+        self.tested_instance._upload_resource(cs_session=self.cs_session,
+                                              entry=entry,
+                                              resource_family="family",
+                                              resource_model="model",
+                                              driver_name="driver")
+        # verify
+        self.tested_instance.attributes_batcher.add.assert_not_called()
+        self.cs_session.SetAttributesValues.assert_called_once()
+        self.cs_session.AutoLoad.assert_called_once_with("resource name")
@@ -4,6 +4,7 @@ import mock
 from cloudshell.api.common_cloudshell_api import CloudShellAPIError
 
 from autodiscovery.common.consts import CloudshellAPIErrorCodes
+from autodiscovery.common.consts import ExistingResourceActions
 from autodiscovery.common.consts import ResourceModelsAttributes
 from autodiscovery.handlers import NetworkingTypeHandler
 
@@ -151,3 +152,24 @@ class TestNetworkingTypeHandler(unittest.TestCase):
                                                                  resource_family=first_gen["family_name"],
                                                                  resource_model=first_gen["model_name"],
                                                                  driver_name=first_gen["driver_name"])
+
+    def test_upload_updates_existing_1_generation_resource(self):
+        """Check that existing resource of the 1-st generation model will be updated if 2-nd generation is preferred"""
+        self.networking_handler.existing_resource_action = ExistingResourceActions.UPDATE
+        entry = mock.MagicMock(ip="10.0.0.1", folder_path="", attributes={})
+        device_os = mock.MagicMock()
+        device_os.families.get.return_value = {
+            "first_gen": {"family_name": "Switch", "model_name": "Cisco IOS Switch", "driver_name": "IOS Driver"},
+            "second_gen": {"family_name": "CS_Switch", "model_name": "Cisco IOS Switch 2G",
+                           "driver_name": "IOS Driver 2G"}}
+        vendor = mock.MagicMock(get_device_os=mock.MagicMock(return_value=device_os))
+        cs_session = mock.MagicMock()
+        cs_session.GetResourceList.return_value.Resources = [
+            mock.MagicMock(Name="existing", Address="10.0.0.1", FullAddress="10.0.0.1",
+                           ResourceModelName="Cisco IOS Switch")]
+        # act
+        self.networking_handler.upload(entry=entry, vendor=vendor, cs_session=cs_session)
+        # verify
+        cs_session.CreateResource.assert_not_called()
+        cs_session.UpdateResourceDriver.assert_called_once_with(resourceFullPath="existing",
+                                                                driverName="IOS Driver")
@@ -0,0 +1,53 @@
+import unittest
+
+from autodiscovery.models import IPRange
+
+
+class TestIPRange(unittest.TestCase):
+    def setUp(self):
+        # 10.0.0.1-10.0.0.3, 10.0.0.10-10.0.0.11
+        self.ip_range = IPRange(intervals=[(167772161, 167772163), (167772170, 167772171)])
+
+    def test_iter(self):
+        """Check that range can be iterated several times"""
+        expected_res = ["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.10", "10.0.0.11"]
+        # act
+        result = [list(self.ip_range), list(self.ip_range)]
+        # verify
+        self.assertEqual(result, [expected_res, expected_res])
+        self.assertEqual(len(self.ip_range), 5)
+
+    def test_size_of_large_ipv6_range(self):
+        """Check that size of the range will be returned even if it is too big for len()"""
+        ip_range = IPRange(intervals=[(0, 2 ** 64 - 1)], version=6)
+        # act
+        result = ip_range.size
+        # verify
+        self.assertEqual(result, 2 ** 64)
+        self.assertIn("::1", ip_range)
+
+    def test_contains(self):
+        """Check that only addresses from the range intervals are in the range"""
+        self.assertIn("10.0.0.1", self.ip_range)
+        self.assertIn("10.0.0.11", self.ip_range)
+        self.assertNotIn("10.0.0.4", self.ip_range)
+        self.assertNotIn("10.0.0.0", self.ip_range)
+        self.assertNotIn("invalid ip", self.ip_range)
+
+    def test_difference(self):
+        """Check that addresses of the other range will be removed from the range"""
+        # 10.0.0.2, 10.0.0.9-10.0.0.10
+        other_range = IPRange(intervals=[(167772162, 167772162), (167772169, 167772170)])
+        # act
+        result = self.ip_range.difference(other_range)
+        # verify
+        self.assertEqual(list(result), ["10.0.0.1", "10.0.0.3", "10.0.0.11"])
+        self.assertEqual(list(self.ip_range), ["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.10", "10.0.0.11"])
+
+    def test_difference_other_version(self):
+        """Check that IPv6 range will not change IPv4 range"""
+        other_range = IPRange(intervals=[(167772161, 167772171)], version=6)
+        # act
+        result = self.ip_range.difference(other_range)
+        # verify
+        self.assertEqual(len(result), 5)
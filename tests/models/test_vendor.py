@@ -1,8 +1,14 @@
+import json
+import re
 import unittest
 
 import mock
 
+from autodiscovery import config
+from autodiscovery.common import utils
+from autodiscovery.data_processors import JsonDataProcessor
 from autodiscovery.models import VendorDefinitionCollection
+from autodiscovery.models import VendorEnterpriseNumbers
 from autodiscovery.models import VendorCLICredentials
 from autodiscovery.models import VendorSettingsCollection
 from autodiscovery.models import CLICredentials
@@ -11,13 +17,48 @@ from autodiscovery.models import BaseVendorDefinition
 from autodiscovery.models import OperationSystem
 
 
+class TestVendorEnterpriseNumbers(unittest.TestCase):
+    def setUp(self):
+        self.enterprise_numbers = VendorEnterpriseNumbers(enterprise_numbers={"9": "ciscoSystems",
+                                                                              "2636": "Juniper Networks, Inc.",
+                                                                              "11": "Hewlett-Packard"})
+
+    def test_get_item(self):
+        """Check that vendor name can be found both by integer and string PEN"""
+        self.assertEqual(self.enterprise_numbers[9], "ciscoSystems")
+        self.assertEqual(self.enterprise_numbers["2636"], "Juniper Networks, Inc.")
+
+    def test_get_item_no_such_number(self):
+        """Check that KeyError will be raised if there is no such PEN"""
+        with self.assertRaises(KeyError):
+            self.enterprise_numbers[10]
+
+    def test_contains(self):
+        """Check that only existing PENs are in the index"""
+        self.assertIn("11", self.enterprise_numbers)
+        self.assertNotIn(12, self.enterprise_numbers)
+        self.assertNotIn(None, self.enterprise_numbers)
+        self.assertEqual(len(self.enterprise_numbers), 3)
+
+    def test_get(self):
+        """Check that method will return default value if there is no such PEN"""
+        self.assertEqual(self.enterprise_numbers.get("9"), "ciscoSystems")
+        self.assertIsNone(self.enterprise_numbers.get("99999"))
+
+
 class TestVendorDefinitionCollection(unittest.TestCase):
     def setUp(self):
-        self.expected_vendor = mock.MagicMock(check_vendor_name=mock.MagicMock(return_value=True))
-        self.vendors = [mock.MagicMock(check_vendor_name=mock.MagicMock(return_value=False)),
-                        mock.MagicMock(check_vendor_name=mock.MagicMock(return_value=False)),
-                        self.expected_vendor,
-                        mock.MagicMock(check_vendor_name=mock.MagicMock(return_value=False))]
+        self.expected_vendor = BaseVendorDefinition(name="Expected",
+                                                    aliases=["[Tt]est_vendor"],
+                                                    vendor_type=mock.MagicMock(),
+                                                    default_prompt=mock.MagicMock(),
+                                                    enable_prompt=mock.MagicMock())
+        self.vendors = [BaseVendorDefinition(name="Vendor{}".format(i),
+                                             aliases=["vendor{}_alias".format(i)],
+                                             vendor_type=mock.MagicMock(),
+                                             default_prompt=mock.MagicMock(),
+                                             enable_prompt=mock.MagicMock()) for i in xrange(3)]
+        self.vendors.insert(2, self.expected_vendor)
         self.vendors_collection = VendorDefinitionCollection(vendors=self.vendors)
 
     def test_get_vendor(self):
@@ -28,6 +69,114 @@ class TestVendorDefinitionCollection(unittest.TestCase):
         # verify
         self.assertEqual(result, self.expected_vendor)
 
+    def test_get_vendor_by_name(self):
+        """Check that method will find vendor by its name ignoring the case"""
+        # act
+        result = self.vendors_collection.get_vendor(vendor_name="expected")
+        # verify
+        self.assertEqual(result, self.expected_vendor)
+
+    def test_get_vendor_previous_vendor_alias_matches_name(self):
+        """Check that vendor which alias matches the name has priority if it goes before the vendor with such name"""
+        self.vendors[0].aliases = ["[Ee]xpected"]
+        vendors_collection = VendorDefinitionCollection(vendors=self.vendors)
+        # act
+        result = vendors_collection.get_vendor(vendor_name="Expected")
+        # verify
+        self.assertEqual(result, self.vendors[0])
+
+    def test_get_vendor_no_such_vendor(self):
+        """Check that method will return None if there is no vendor for the given name"""
+        # act
+        result = self.vendors_collection.get_vendor(vendor_name="unknown")
+        # verify
+        self.assertIsNone(result)
+
+    def test_get_vendor_is_memoized(self):
+        """Check that vendor name will be resolved only once"""
+        self.vendors_collection._find_vendor = mock.MagicMock(return_value=self.expected_vendor)
+        # act
+        for _ in xrange(3):
+            result = self.vendors_collection.get_vendor(vendor_name="test_vendor_name")
+        # verify
+        self.assertEqual(result, self.expected_vendor)
+        self.vendors_collection._find_vendor.assert_called_once_with("test_vendor_name")
+
+
+class TestVendorMatchingParity(unittest.TestCase):
+    """Compare results of the vendor/OS/model matching with the regexp matching done on every call"""
+
+    def setUp(self):
+        with open(utils.get_full_path(config.DATA_FOLDER, config.VENDORS_CONFIG_FILE)) as vendors_file:
+            self.vendors_data = json.load(vendors_file)
+
+        data_processor = JsonDataProcessor(logger=mock.MagicMock())
+        self.vendors_collection = data_processor._build_vendor_config(additional_vendors_data=[])
+
+    def _search(self, aliases, text):
+        return bool(re.search(r"({})".format("|".join(aliases)), text, flags=re.DOTALL))
+
+    def _get_vendor_data(self, vendor_name):
+        for vendor_data in self.vendors_data:
+            if (vendor_data["name"].lower() == vendor_name.lower() or
+                    self._search(vendor_data.get("aliases", []), vendor_name)):
+                return vendor_data
+
+    def _get_model(self, os_data, system_description):
+        for model_map in os_data.get("models_map", []):
+            if self._search(model_map["aliases"], system_description):
+                return model_map["model"]
+
+        return os_data.get("default_model")
+
+    def test_get_vendor(self):
+        """Check that vendors found for all names from the PEN data file are the same"""
+        with open(utils.get_full_path(config.DATA_FOLDER, config.VENDOR_ENTERPRISE_NUMBERS_FILE)) as pen_file:
+            vendor_names = json.load(pen_file).values()
+
+        vendor_names.extend(vendor_data["name"].upper() for vendor_data in self.vendors_data)
+
+        for vendor_name in vendor_names:
+            vendor = self.vendors_collection.get_vendor(vendor_name=vendor_name)
+            vendor_data = self._get_vendor_data(vendor_name)
+            self.assertEqual(vendor and vendor.name, vendor_data and vendor_data["name"])
+
+    def test_get_device_os_and_model_type(self):
+        """Check that OS and model type found for the system descriptions are the same"""
+        descriptions = ["", "unknown device"]
+        for vendor_data in self.vendors_data:
+            for os_data in vendor_data.get("operation_systems", []):
+                descriptions.extend(os_data.get("aliases", []))
+                for model_map in os_data.get("models_map", []):
+                    descriptions.extend("{} {}".format(os_alias, alias)
+                                        for os_alias in os_data.get("aliases", [""])
+                                        for alias in model_map["aliases"])
+
+        for vendor_data in self.vendors_data:
+            if vendor_data["type"].lower() != "networking":
+                continue
+
+            vendor = self.vendors_collection.get_vendor(vendor_name=vendor_data["name"])
+
+            for description in descriptions:
+                expected_os_data = None
+                for os_data in vendor_data.get("operation_systems", []):
+                    if os_data.get("aliases") and self._search(os_data["aliases"], description):
+                        expected_os_data = os_data
+                        break
+                else:
+                    for os_data in vendor_data.get("operation_systems", []):
+                        if os_data["name"] == vendor_data.get("default_os"):
+                            expected_os_data = os_data
+                            break
+
+                device_os = vendor.get_device_os(description)
+                self.assertEqual(device_os and device_os.name, expected_os_data and expected_os_data["name"])
+
+                if device_os is not None:
+                    self.assertEqual(device_os.get_device_model_type(description),
+                                     self._get_model(expected_os_data, description))
+
 
 class TestBaseVendorDefinition(unittest.TestCase):
     def setUp(self):
@@ -101,9 +250,17 @@ class TestNetworkingVendorDefinition(unittest.TestCase):
 
     def test_get_device_os_find_os_by_aliases(self):
         """Check that method will return OS from the list if system description matches one of the aliases"""
-        expected_os = mock.MagicMock(aliases=["Test OS"])
+        expected_os = OperationSystem(name="expected OS",
+                                      aliases=["Test OS"],
+                                      default_model=mock.MagicMock(),
+                                      models_map=[],
+                                      families=mock.MagicMock())
         system_description = "description for Test OS."
-        self.vendor_definition.operation_systems = [mock.MagicMock(aliases=["test alias"]),
+        self.vendor_definition.operation_systems = [OperationSystem(name="OS",
+                                                                    aliases=["test alias"],
+                                                                    default_model=mock.MagicMock(),
+                                                                    models_map=[],
+                                                                    families=mock.MagicMock()),
                                                     mock.MagicMock(aliases=[]),
                                                     expected_os]
         # act
@@ -2,6 +2,7 @@ import unittest
 
 import mock
 
+from autodiscovery import models
 from autodiscovery.exceptions import AutoDiscoveryException
 from autodiscovery.parsers.input_data_parsers import AbstractInputDataParser
 from autodiscovery.parsers.input_data_parsers import JSONInputDataParser
@@ -44,14 +45,30 @@ class TestAbstractInputDataParser(unittest.TestCase):
         # act
         result = self.tested_instance._find_ips(start_ip=u"10.0.0.1", last_ip=u"10.0.0.4")
         # verify
-        self.assertEqual(result, expected_res)
+        self.assertIsInstance(result, models.IPRange)
+        self.assertEqual(list(result), expected_res)
+        self.assertEqual(len(result), 4)
+
+    def test_find_network_ips(self):
+        """Check that method will return host IPs of the network without network and broadcast addresses"""
+        # act
+        result = self.tested_instance._find_network_ips(network=u"10.0.0.5/29")
+        # verify
+        self.assertEqual(list(result), ["10.0.0.1", "10.0.0.2", "10.0.0.3", "10.0.0.4", "10.0.0.5", "10.0.0.6"])
+
+    def test_find_network_ips_large_network(self):
+        """Check that addresses of the large network will not be generated up front"""
+        # act
+        result = self.tested_instance._find_network_ips(network=u"10.0.0.0/8")
+        # verify
+        self.assertEqual(result.intervals, [(167772161, 184549374)])
+        self.assertEqual(len(result), 2 ** 24 - 2)
+        self.assertIn("10.200.0.1", result)
+        self.assertNotIn("11.0.0.1", result)
 
     @mock.patch("autodiscovery.parsers.input_data_parsers.models.DeviceIPRange")
     def test_parse_devices_ips(self, device_ip_range_class):
         """Check that method will return list of DeviceIPRange models"""
-        first_parsed_ips = mock.MagicMock()
-        second_parsed_ips = mock.MagicMock()
-        self.tested_instance._find_ips = mock.MagicMock(side_effect=[first_parsed_ips, second_parsed_ips])
         device_ip_range = mock.MagicMock()
         device_ip_range_class.return_value = device_ip_range
         expected_res = [device_ip_range, device_ip_range, device_ip_range]
@@ -62,7 +79,7 @@ class TestAbstractInputDataParser(unittest.TestCase):
                 "domain": "Test Domain"
             },
             {
-                "range": "192.168.8.1-9.10"
+                "range": "192.168.8.254-9.1"
             },
             "192.168.42.235"]
 
@@ -70,14 +87,65 @@ class TestAbstractInputDataParser(unittest.TestCase):
         result = self.tested_instance._parse_devices_ips(devices_ips)
         # verify
         self.assertEqual(result, expected_res)
-        device_ip_range_class.assert_any_call(ip_range=first_parsed_ips, domain="Test Domain")
-        device_ip_range_class.assert_any_call(ip_range=second_parsed_ips, domain=None)
-        device_ip_range_class.assert_any_call(ip_range=["192.168.42.235"], domain=None)
-
-        self.tested_instance._find_ips.assert_any_call(start_ip=u"192.168.10.3",
-                                                       last_ip=u"192.168.10.45")
-        self.tested_instance._find_ips.assert_any_call(start_ip=u"192.168.8.1",
-                                                       last_ip=u"192.168.9.10")
+        self.assertEqual([(list(call[1]["ip_range"]), call[1]["domain"])
+                          for call in device_ip_range_class.call_args_list],
+                         [(["192.168.10.{}".format(i) for i in range(3, 46)], "Test Domain"),
+                          (["192.168.8.254", "192.168.8.255", "192.168.9.0", "192.168.9.1"], None),
+                          (["192.168.42.235"], None)])
+
+    def test_parse_devices_ips_excludes_ips(self):
+        """Check that excluded IPs and IPs from the previous ranges will be removed from the range"""
+        devices_ips = [
+            {
+                "range": "10.0.0.0/29",
+                "exclude": ["10.0.0.2", "10.0.0.4-5"],
+                "domain": "Test Domain"
+            },
+            {
+                "range": "10.0.0.1-10",
+                "exclude": "10.0.0.9"
+            },
+            "10.0.0.3"]
+
+        # act
+        result = self.tested_instance._parse_devices_ips(devices_ips)
+        # verify
+        self.assertEqual([(list(ip_range.ip_range), ip_range.domain) for ip_range in result],
+                         [(["10.0.0.1", "10.0.0.3", "10.0.0.6"], "Test Domain"),
+                          (["10.0.0.2", "10.0.0.4", "10.0.0.5", "10.0.0.7", "10.0.0.8", "10.0.0.10"], "Global"),
+                          ([], "Global")])
+
+    def test_parse_devices_ips_invalid_ip(self):
+        """Check that method will raise AutoDiscoveryException if the IP range is invalid"""
+        with self.assertRaisesRegexp(AutoDiscoveryException, "Invalid devices IPs '10.0.0.1-x'"):
+            self.tested_instance._parse_devices_ips(["10.0.0.1-x"])
+
+    def test_parse_devices_ips_ipv6_range(self):
+        """Check that method will raise AutoDiscoveryException for the IPv6 range"""
+        with self.assertRaisesRegexp(AutoDiscoveryException, "IPv6 ranges aren't supported"):
+            self.tested_instance._parse_devices_ips(["2001:db8::1-2001:db8::5"])
+
+    def test_parse_devices_ips_ipv6_network(self):
+        """Check that method will parse small IPv6 network"""
+        # act
+        result = self.tested_instance._parse_devices_ips(["2001:db8::/126"])
+        # verify
+        self.assertEqual(list(result[0].ip_range), ["2001:db8::", "2001:db8::1", "2001:db8::2", "2001:db8::3"])
+
+    def test_parse_devices_ips_too_large_range(self):
+        """Check that method will raise AutoDiscoveryException if the range has too many addresses"""
+        with self.assertRaisesRegexp(AutoDiscoveryException, "Devices IPs '2001:db8::/64' contain 18446744073709551616 "
+                                                             "addresses"):
+            self.tested_instance._parse_devices_ips(["2001:db8::/64"])
+
+    @mock.patch("autodiscovery.parsers.input_data_parsers.config")
+    def test_parse_devices_ips_range_size_after_exclusions(self, config):
+        """Check that excluded IPs will not be counted in the range size"""
+        config.MAX_DEVICES_IP_RANGE_SIZE = 2
+        # act
+        result = self.tested_instance._parse_devices_ips([{"range": "10.0.0.1-4", "exclude": "10.0.0.2-3"}])
+        # verify
+        self.assertEqual(list(result[0].ip_range), ["10.0.0.1", "10.0.0.4"])
 
     def test_parse_method_raises_exception_if_it_was_not_implemented(self):
         """Check that method will raise exception if it wasn't implemented in the child class"""
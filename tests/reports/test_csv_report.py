@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import collections
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from autodiscovery.reports.csv_report import AbstractCSVReport
+
+
+class TestCSVReport(unittest.TestCase):
+    def setUp(self):
+        with mock.patch("autodiscovery.reports.base.AbstractEntry") as entry_class:
+            class TestedClass(AbstractCSVReport):
+                @property
+                def _header_entry_map(self):
+                    return collections.OrderedDict([("IP", "ip"), ("COMMENT", "comment")])
+
+                @property
+                def entry_class(self):
+                    return entry_class
+
+        self.entry_class = entry_class
+        report_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, report_dir)
+        self.file_name = os.path.join(report_dir, "report.csv")
+        self.csv_report = TestedClass(file_name=self.file_name)
+
+    def _read_file(self):
+        with open(self.file_name) as report_file:
+            return report_file.read()
+
+    def test_finish_entry(self):
+        """Check that finished entry will be written to the file before the report is generated"""
+        entry = self.csv_report.edit_entry(mock.MagicMock(ip="10.0.0.1", comment=u"Device is unreachable, ©"))
+        # act
+        self.csv_report.finish_entry(entry)
+        # verify
+        self.assertEqual(self._read_file(), "IP,COMMENT\r\n10.0.0.1,\"Device is unreachable, \xc2\xa9\"\r\n")
+
+    def test_parse_entries_from_file(self):
+        """Check that entries will be parsed from the generated file"""
+        self.csv_report.edit_entry(mock.MagicMock(ip="10.0.0.1", comment="comment, with comma"))
+        self.csv_report.edit_entry(mock.MagicMock(ip="10.0.0.2", comment=""))
+        self.csv_report.generate()
+        # act
+        result = self.csv_report.parse_entries_from_file(report_file=self.file_name)
+        # verify
+        self.assertEqual(len(result), 2)
+        self.assertEqual(self.entry_class.call_args_list, [mock.call(ip="10.0.0.1", comment="comment, with comma"),
+                                                           mock.call(ip="10.0.0.2", comment="")])
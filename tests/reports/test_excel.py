@@ -4,6 +4,7 @@ import unittest
 import mock
 
 from autodiscovery.reports.excel import AbstractExcelReport
+from autodiscovery.reports.excel import AbstractStreamExcelReport
 
 
 class TestExcelReport(unittest.TestCase):
@@ -50,3 +51,33 @@ class TestExcelReport(unittest.TestCase):
         self.assertIsInstance(result, list)
         self.assertEqual(result[0], entry)
         load_workbook.assert_called_once_with(self.file_name)
+
+
+class TestStreamExcelReport(unittest.TestCase):
+    def setUp(self):
+        class TestedClass(AbstractStreamExcelReport, AbstractExcelReport):
+            @property
+            def _header_entry_map(self):
+                return collections.OrderedDict([("IP", "ip"), ("COMMENT", "comment")])
+
+        self.file_name = "test_file_name.xlsx"
+        self.excel_report = TestedClass(file_name=self.file_name)
+
+    @mock.patch("autodiscovery.reports.excel.xlsxwriter")
+    def test_generate(self, xlsxwriter):
+        """Check that finished entries will be written in the constant memory mode before the report is generated"""
+        workbook = xlsxwriter.Workbook.return_value
+        worksheet = workbook.add_worksheet.return_value
+        entry = self.excel_report.edit_entry(mock.MagicMock(ip="10.0.0.1", comment=""))
+        self.excel_report.edit_entry(mock.MagicMock(ip="10.0.0.2", comment="comment"))
+        # act
+        self.excel_report.finish_entry(entry)
+        workbook.close.assert_not_called()
+        self.excel_report.generate()
+        # verify
+        xlsxwriter.Workbook.assert_called_once_with(self.file_name, {"constant_memory": True})
+        self.assertEqual(worksheet.write_row.call_args_list, [
+            mock.call(0, 0, ["IP", "COMMENT"], workbook.add_format.return_value),
+            mock.call(1, 0, ["10.0.0.1", ""]),
+            mock.call(2, 0, ["10.0.0.2", "comment"])])
+        workbook.close.assert_called_once_with()
@@ -0,0 +1,47 @@
+import collections
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from autodiscovery.reports.jsonl import AbstractJSONLReport
+
+
+class TestJSONLReport(unittest.TestCase):
+    def setUp(self):
+        with mock.patch("autodiscovery.reports.base.AbstractEntry") as entry_class:
+            class TestedClass(AbstractJSONLReport):
+                @property
+                def _header_entry_map(self):
+                    return collections.OrderedDict([("IP", "ip"), ("COMMENT", "comment")])
+
+                @property
+                def entry_class(self):
+                    return entry_class
+
+        self.entry_class = entry_class
+        report_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, report_dir)
+        self.file_name = os.path.join(report_dir, "report")
+        self.jsonl_report = TestedClass(file_name=self.file_name)
+
+    def test_finish_entry(self):
+        """Check that finished entry will be written to the file as a JSON line before the report is generated"""
+        entry = self.jsonl_report.edit_entry(mock.MagicMock(ip="10.0.0.1", comment="Device is unreachable"))
+        # act
+        self.jsonl_report.finish_entry(entry)
+        # verify
+        with open(self.jsonl_report.file_name) as report_file:
+            self.assertEqual(report_file.read(), '{"IP": "10.0.0.1", "COMMENT": "Device is unreachable"}\n')
+
+    def test_parse_entries_from_file(self):
+        """Check that entries will be parsed from the generated file"""
+        self.jsonl_report.edit_entry(mock.MagicMock(ip="10.0.0.1", comment="comment"))
+        self.jsonl_report.generate()
+        # act
+        result = self.jsonl_report.parse_entries_from_file(report_file=self.file_name + ".jsonl")
+        # verify
+        self.assertEqual(len(result), 1)
+        self.entry_class.assert_called_once_with(ip="10.0.0.1", comment="comment")
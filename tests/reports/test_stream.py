@@ -0,0 +1,83 @@
+import collections
+import unittest
+
+import mock
+
+from autodiscovery.reports.stream import AbstractStreamReport
+
+
+class TestStreamReport(unittest.TestCase):
+    def setUp(self):
+        class TestedClass(AbstractStreamReport):
+            FILE_EXTENSION = ".txt"
+            DEFAULT_REPORT_FILE = "report.txt"
+
+            @property
+            def _header_entry_map(self):
+                return collections.OrderedDict([("IP", "ip"), ("STATUS", "status")])
+
+            @property
+            def entry_class(self):
+                return mock.MagicMock
+
+        self.report = TestedClass(file_name="test_report")
+        self.report._start = mock.MagicMock()
+        self.report._write_row = mock.MagicMock()
+        self.report._finish = mock.MagicMock()
+
+    def test_file_name_extension(self):
+        """Check that file extension will be added to the file name"""
+        self.assertEqual(self.report.file_name, "test_report.txt")
+
+    def test_finish_entry(self):
+        """Check that finished entry will be written right away and removed from the memory"""
+        entry = self.report.add_entry(ip="10.0.0.1", status="Success")
+        # act
+        self.report.finish_entry(entry)
+        self.report.finish_entry(entry)
+        # verify
+        self.report._start.assert_called_once_with()
+        self.report._write_row.assert_called_once_with(["10.0.0.1", "Success"])
+        self.assertEqual(len(self.report._entries), 0)
+        self.assertEqual(self.report.get_current_entry(), entry)
+
+    def test_finish_entry_keeps_order(self):
+        """Check that finished entry will wait until all entries added before it are finished"""
+        first_entry = self.report.add_entry(ip="10.0.0.1", status="Success")
+        second_entry = self.report.add_entry(ip="10.0.0.2", status="Failed")
+        third_entry = self.report.add_entry(ip="10.0.0.3", status="Success")
+        # act
+        self.report.finish_entry(third_entry)
+        self.report.finish_entry(second_entry)
+        self.report._write_row.assert_not_called()
+        self.report.finish_entry(first_entry)
+        # verify
+        self.assertEqual(self.report._write_row.call_args_list, [mock.call(["10.0.0.1", "Success"]),
+                                                                 mock.call(["10.0.0.2", "Failed"]),
+                                                                 mock.call(["10.0.0.3", "Success"])])
+        self.assertEqual(len(self.report._entries), 0)
+
+    def test_generate(self):
+        """Check that not written entries will be written in the order they were added and file will be closed"""
+        self.report.add_entry(ip="10.0.0.1", status="Success")
+        finished_entry = self.report.add_entry(ip="10.0.0.2", status="Failed")
+        last_entry = self.report.edit_entry(mock.MagicMock(ip="10.0.0.3", status="Success"))
+        self.report.finish_entry(finished_entry)
+        # act
+        self.report.generate()
+        # verify
+        self.report._start.assert_called_once_with()
+        self.assertEqual(self.report._write_row.call_args_list, [mock.call(["10.0.0.1", "Success"]),
+                                                                 mock.call(["10.0.0.2", "Failed"]),
+                                                                 mock.call(["10.0.0.3", "Success"])])
+        self.report._finish.assert_called_once_with()
+        self.assertEqual(self.report.get_current_entry(), last_entry)
+
+    def test_generate_no_entries(self):
+        """Check that file with only the header will be created if there are no entries"""
+        # act
+        self.report.generate()
+        # verify
+        self.report._start.assert_called_once_with()
+        self.report._write_row.assert_not_called()
+        self.report._finish.assert_called_once_with()
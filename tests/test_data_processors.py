@@ -1,3 +1,6 @@
+import os
+import shutil
+import tempfile
 import unittest
 
 import mock
@@ -10,6 +13,7 @@ class TestJsonDataProcessor(unittest.TestCase):
         self.filename = "example.json"
         self.logger = mock.MagicMock()
         self.json_data_processor = JsonDataProcessor(logger=self.logger)
+        JsonDataProcessor._vendor_enterprise_numbers = None
 
     @mock.patch("autodiscovery.data_processors.config")
     @mock.patch("autodiscovery.data_processors.utils")
@@ -57,22 +61,100 @@ class TestJsonDataProcessor(unittest.TestCase):
     def test_save_vendor_enterprise_numbers(self, config):
         data = mock.MagicMock()
         self.json_data_processor._save = mock.MagicMock()
+        JsonDataProcessor._vendor_enterprise_numbers = mock.MagicMock()
         # act
         self.json_data_processor.save_vendor_enterprise_numbers(data=data)
         # verify
         self.json_data_processor._save.assert_called_once_with(data=data,
                                                                filename=config.VENDOR_ENTERPRISE_NUMBERS_FILE)
+        self.assertIsNone(JsonDataProcessor._vendor_enterprise_numbers)
 
     @mock.patch("autodiscovery.data_processors.config")
-    def test_load_vendor_enterprise_numbers(self, config):
-        """Check that method will properly merge initial vendors config with the additional one"""
+    @mock.patch("autodiscovery.data_processors.models")
+    def test_load_vendor_enterprise_numbers(self, models, config):
+        """Check that method will parse PEN file into the index and save it to the cache file"""
         data = mock.MagicMock()
+        fingerprint = "test fingerprint"
         self.json_data_processor._load = mock.MagicMock(return_value=data)
+        self.json_data_processor._get_vendor_enterprise_numbers_fingerprint = mock.MagicMock(return_value=fingerprint)
+        self.json_data_processor._load_vendor_enterprise_numbers_cache = mock.MagicMock(return_value=None)
+        self.json_data_processor._save_vendor_enterprise_numbers_cache = mock.MagicMock()
         # act
         result = self.json_data_processor.load_vendor_enterprise_numbers()
         # verify
-        self.assertEqual(result, data)
+        self.assertEqual(result, models.VendorEnterpriseNumbers.return_value)
         self.json_data_processor._load.assert_called_once_with(filename=config.VENDOR_ENTERPRISE_NUMBERS_FILE)
+        models.VendorEnterpriseNumbers.assert_called_once_with(enterprise_numbers=data)
+        self.json_data_processor._load_vendor_enterprise_numbers_cache.assert_called_once_with(fingerprint)
+        self.json_data_processor._save_vendor_enterprise_numbers_cache.assert_called_once_with(fingerprint, result)
+
+    def test_load_vendor_enterprise_numbers_from_cache(self):
+        """Check that method will use PEN index from the cache file without parsing JSON file"""
+        vendor_enterprise_numbers = mock.MagicMock()
+        self.json_data_processor._load = mock.MagicMock()
+        self.json_data_processor._get_vendor_enterprise_numbers_fingerprint = mock.MagicMock()
+        self.json_data_processor._load_vendor_enterprise_numbers_cache = mock.MagicMock(
+            return_value=vendor_enterprise_numbers)
+        # act
+        result = self.json_data_processor.load_vendor_enterprise_numbers()
+        # verify
+        self.assertEqual(result, vendor_enterprise_numbers)
+        self.json_data_processor._load.assert_not_called()
+
+    def test_load_vendor_enterprise_numbers_only_once(self):
+        """Check that PEN data will be loaded only once and shared between all data processors"""
+        self.json_data_processor._get_vendor_enterprise_numbers_fingerprint = mock.MagicMock()
+        self.json_data_processor._load_vendor_enterprise_numbers_cache = mock.MagicMock()
+        other_data_processor = JsonDataProcessor(logger=self.logger)
+        other_data_processor._get_vendor_enterprise_numbers_fingerprint = mock.MagicMock()
+        other_data_processor._load_vendor_enterprise_numbers_cache = mock.MagicMock()
+        # act
+        result = self.json_data_processor.load_vendor_enterprise_numbers()
+        other_result = other_data_processor.load_vendor_enterprise_numbers()
+        # verify
+        self.assertEqual(result, other_result)
+        self.json_data_processor._load_vendor_enterprise_numbers_cache.assert_called_once_with(
+            self.json_data_processor._get_vendor_enterprise_numbers_fingerprint.return_value)
+        other_data_processor._load_vendor_enterprise_numbers_cache.assert_not_called()
+
+    def test_get_vendor_enterprise_numbers_fingerprint(self):
+        """Check that fingerprint depends on the PEN file content and the PEN model version"""
+        self.json_data_processor._prepare_file_path = mock.MagicMock(return_value=__file__)
+        result = self.json_data_processor._get_vendor_enterprise_numbers_fingerprint()
+
+        with mock.patch("autodiscovery.data_processors.config") as config:
+            config.VENDOR_ENTERPRISE_NUMBERS_CACHE_VERSION = 1000
+            # act
+            new_result = self.json_data_processor._get_vendor_enterprise_numbers_fingerprint()
+        # verify
+        self.assertEqual(result, self.json_data_processor._get_vendor_enterprise_numbers_fingerprint())
+        self.assertNotEqual(result, new_result)
+
+    def test_vendor_enterprise_numbers_cache(self):
+        """Check that PEN index will be loaded from the cache file only for the same fingerprint"""
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.json_data_processor._prepare_cache_file_path = mock.MagicMock(
+            side_effect=lambda filename: os.path.join(cache_dir, filename))
+        self.json_data_processor._save_vendor_enterprise_numbers_cache("old", {"9": "ciscoSystems"})
+        # act
+        result = self.json_data_processor._load_vendor_enterprise_numbers_cache("old")
+        other_result = self.json_data_processor._load_vendor_enterprise_numbers_cache("new")
+        # verify
+        self.assertEqual(result, {"9": "ciscoSystems"})
+        self.assertIsNone(other_result)
+
+    @mock.patch("autodiscovery.data_processors.cPickle")
+    @mock.patch("autodiscovery.data_processors.open")
+    def test_save_vendor_enterprise_numbers_cache_handles_io_error(self, open, cPickle):
+        """Check that method will only log warning if it is unable to write the cache file"""
+        self.json_data_processor._prepare_cache_file_path = mock.MagicMock(return_value=__file__)
+        open.side_effect = IOError()
+        # act
+        self.json_data_processor._save_vendor_enterprise_numbers_cache("test fingerprint", mock.MagicMock())
+        # verify
+        self.logger.warning.assert_called_once()
+        cPickle.dump.assert_not_called()
 
     def test_merge_vendors_data(self):
         """Check that method will properly merge initial vendors config with the additional one"""
@@ -167,9 +249,107 @@ class TestJsonDataProcessor(unittest.TestCase):
         # verify
         self.assertEqual(result, expected_data)
 
+    def test_merge_vendors_data_without_additional_data(self):
+        """Check that method will keep initial vendors config order if there is no additional data"""
+        conf_data = [{"name": "Cisco"}, {"name": "Juniper"}, {"name": "Raritan"}]
+        # act
+        result = self.json_data_processor._merge_vendors_data(conf_data, [])
+        # verify
+        self.assertEqual(result, conf_data)
+
+    def test_get_vendor_config_fingerprint(self):
+        """Check that fingerprint depends on the additional vendors config data"""
+        self.json_data_processor._prepare_file_path = mock.MagicMock(return_value=__file__)
+        # act
+        result = self.json_data_processor._get_vendor_config_fingerprint([{"name": "Cisco"}])
+        # verify
+        self.assertEqual(result, self.json_data_processor._get_vendor_config_fingerprint([{"name": "Cisco"}]))
+        self.assertNotEqual(result, self.json_data_processor._get_vendor_config_fingerprint([]))
+
+    @mock.patch("autodiscovery.data_processors.config")
+    def test_get_vendor_config_fingerprint_depends_on_cache_version(self, config):
+        """Check that fingerprint depends on the vendors models version"""
+        self.json_data_processor._prepare_file_path = mock.MagicMock(return_value=__file__)
+        config.VENDORS_CONFIG_CACHE_VERSION = 1
+        result = self.json_data_processor._get_vendor_config_fingerprint([])
+        config.VENDORS_CONFIG_CACHE_VERSION = 2
+        # act
+        new_result = self.json_data_processor._get_vendor_config_fingerprint([])
+        # verify
+        self.assertNotEqual(result, new_result)
+
+    def test_load_vendor_config(self):
+        """Check that method will build vendors models and save them to the cache file"""
+        vendor_config = mock.MagicMock()
+        fingerprint = "test fingerprint"
+        additional_vendors_data = mock.MagicMock()
+        self.json_data_processor._get_vendor_config_fingerprint = mock.MagicMock(return_value=fingerprint)
+        self.json_data_processor._load_vendor_config_cache = mock.MagicMock(return_value=None)
+        self.json_data_processor._save_vendor_config_cache = mock.MagicMock()
+        self.json_data_processor._build_vendor_config = mock.MagicMock(return_value=vendor_config)
+        # act
+        result = self.json_data_processor.load_vendor_config(additional_vendors_data=additional_vendors_data)
+        # verify
+        self.assertEqual(result, vendor_config)
+        self.json_data_processor._get_vendor_config_fingerprint.assert_called_once_with(additional_vendors_data)
+        self.json_data_processor._build_vendor_config.assert_called_once_with(additional_vendors_data)
+        self.json_data_processor._save_vendor_config_cache.assert_called_once_with(fingerprint, vendor_config)
+
+    def test_load_vendor_config_from_cache(self):
+        """Check that method will use vendors models from the cache file without parsing JSON file"""
+        vendor_config = mock.MagicMock()
+        self.json_data_processor._get_vendor_config_fingerprint = mock.MagicMock()
+        self.json_data_processor._load_vendor_config_cache = mock.MagicMock(return_value=vendor_config)
+        self.json_data_processor._build_vendor_config = mock.MagicMock()
+        # act
+        result = self.json_data_processor.load_vendor_config()
+        # verify
+        self.assertEqual(result, vendor_config)
+        self.json_data_processor._get_vendor_config_fingerprint.assert_called_once_with([])
+        self.json_data_processor._build_vendor_config.assert_not_called()
+
+    @mock.patch("autodiscovery.data_processors.os")
+    @mock.patch("autodiscovery.data_processors.open")
+    def test_load_vendor_config_cache_no_file(self, open, os):
+        """Check that method will return None if there is no cache file"""
+        self.json_data_processor._prepare_cache_file_path = mock.MagicMock()
+        os.path.exists.return_value = False
+        # act
+        result = self.json_data_processor._load_vendor_config_cache("test fingerprint")
+        # verify
+        self.assertIsNone(result)
+        open.assert_not_called()
+
+    def test_vendor_config_cache(self):
+        """Check that vendors models loaded from the cache file are the same as the built ones"""
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.json_data_processor._prepare_cache_file_path = mock.MagicMock(
+            side_effect=lambda filename: os.path.join(cache_dir, filename))
+        vendor_config = JsonDataProcessor(logger=self.logger)._build_vendor_config(additional_vendors_data=[])
+        # act
+        self.json_data_processor._save_vendor_config_cache("test", vendor_config)
+        result = self.json_data_processor._load_vendor_config_cache("test")
+        # verify
+        self.assertEqual(result.get_vendor("ciscoSystems").name, vendor_config.get_vendor("ciscoSystems").name)
+        self.assertEqual(result.get_vendor("ciscoSystems").get_device_os("Cisco IOS Software").name, "IOS")
+
+    def test_vendor_config_cache_other_fingerprint(self):
+        """Check that vendors models built for another config fingerprint will not be loaded from the cache"""
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.json_data_processor._prepare_cache_file_path = mock.MagicMock(
+            side_effect=lambda filename: os.path.join(cache_dir, filename))
+        self.json_data_processor._save_vendor_config_cache("old", mock.sentinel.vendor_config)
+        # act
+        result = self.json_data_processor._load_vendor_config_cache("new")
+        # verify
+        self.assertIsNone(result)
+        self.assertEqual(os.listdir(cache_dir), ["vendors_config.pickle"])
+
     @mock.patch("autodiscovery.data_processors.config")
     @mock.patch("autodiscovery.data_processors.models")
-    def test_load_vendor_config(self, models, config):
+    def test_build_vendor_config(self, models, config):
         """Check that method will return VendorDefinitionCollection model"""
         vendors_collection = mock.MagicMock()
         models.VendorDefinitionCollection.return_value = vendors_collection
@@ -178,7 +358,7 @@ class TestJsonDataProcessor(unittest.TestCase):
         self.json_data_processor._merge_vendors_data = mock.MagicMock()
         self.json_data_processor._load = mock.MagicMock(return_value=vendors_data)
         # act
-        result = self.json_data_processor.load_vendor_config(additional_vendors_data=additional_vendors_data)
+        result = self.json_data_processor._build_vendor_config(additional_vendors_data=additional_vendors_data)
         # verify
         self.assertEqual(result, vendors_collection)
         self.json_data_processor._load.assert_called_once_with(filename=config.VENDORS_CONFIG_FILE)